@@ -0,0 +1,338 @@
+import atexit
+import contextlib
+import csv
+import glob
+import io
+import os
+import queue
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # Windows (baslat.bat): fcntl yok, kilit msvcrt ile alınır.
+    fcntl = None
+    import msvcrt
+
+# --- Kullanıcı Aktivite Günlüğü ---
+# Olaylar bellekteki bir kuyruğa atılır ve arka plandaki tek bir yazıcı iş parçacığı tarafından
+# toplu halde diske yazılır; sayfa geçişleri disk G/Ç'sini hiç beklemez.
+# Kayıtlar 'loglar/' altında yalnızca sona eklenen CSV parçalarında tutulur. Her gün yeni bir
+# parça açılır, parça boyut sınırını aşınca sıradaki numaraya geçilir:
+#   loglar/aktivite-20250825-000.csv, loglar/aktivite-20250825-001.csv, ...
+# Parçalarda başlık satırı yoktur; sütun sırası LOG_SUTUNLARI ile sabittir. Böylece aynı parçaya
+# yazan birden fazla süreç başlık yazmak için yarışmaz.
+# Aynı klasöre birden fazla süreç yazabilir. O_APPEND tek başına yeterli değildir: Windows'ta
+# sona ekleme, konumlama ve yazma olarak iki adımda yapılır. Bu yüzden parça seçimi ve yazma,
+# klasördeki kilit dosyası üzerinden süreçler arası bir kilitle sıraya sokulur.
+LOG_SUTUNLARI = ['Zaman Damgası', 'Kullanıcı Adı', 'IP Adresi', 'Sayfa Adı', 'Aktivite']
+LOG_KLASORU = 'loglar'
+ESKI_LOG_DOSYASI = 'loglar.csv'
+PARCA_DESENI = 'aktivite-*.csv'
+KILIT_DOSYASI = '.yazma.kilit'
+MAKSIMUM_PARCA_BOYUTU = 5 * 1024 * 1024
+YAZMA_ARALIGI = 1.0
+
+@contextlib.contextmanager
+def _dosya_kilidi(yol):
+    # Süreçler arası özel kilit: POSIX'te flock, Windows'ta dosyanın ilk baytı üzerinde
+    # msvcrt.locking. Kilit alınamazsa OSError yükselir; yazıcı kayıtları sonraki turda yeniden dener.
+    fd = os.open(yol, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+class AktiviteGunlugu:
+    def __init__(self, klasor=LOG_KLASORU, maksimum_parca_boyutu=MAKSIMUM_PARCA_BOYUTU, yazma_araligi=YAZMA_ARALIGI):
+        self.klasor = klasor
+        self.maksimum_parca_boyutu = maksimum_parca_boyutu
+        self.yazma_araligi = yazma_araligi
+        self._kuyruk = queue.Queue()
+        self._yazma_kilidi = threading.Lock()
+        self._durdur = threading.Event()
+        os.makedirs(self.klasor, exist_ok=True)
+        self._is_parcacigi = threading.Thread(target=self._yaz_dongusu, name="aktivite-yazici", daemon=True)
+        self._is_parcacigi.start()
+        atexit.register(self.kapat)
+
+    def kaydet(self, kullanici, aktivite, sayfa_adi="N/A", ip_adresi="N/A"):
+        # Engellemez: kayıt kuyruğa atılır, yazıcı iş parçacığı en geç 'yazma_araligi' sonra yazar.
+        zaman = datetime.now()
+        self._kuyruk.put((zaman, [zaman.strftime('%Y-%m-%d %H:%M:%S'), kullanici, ip_adresi, sayfa_adi, aktivite]))
+
+    def _kuyruktan_al(self):
+        kayitlar = []
+        while True:
+            try:
+                kayitlar.append(self._kuyruk.get_nowait())
+            except queue.Empty:
+                return kayitlar
+
+    def bosalt(self):
+        # Kuyrukta bekleyen tüm kayıtları hemen yazar.
+        kayitlar = self._kuyruktan_al()
+        if kayitlar:
+            self._yaz(kayitlar)
+
+    def kapat(self):
+        self._durdur.set()
+        self.bosalt()
+
+    def parcalar(self):
+        # Parça adları tarih ve sıra numarası içerdiğinden alfabetik sıra kronolojik sıradır.
+        return sorted(glob.glob(os.path.join(self.klasor, PARCA_DESENI)))
+
+    def _parca_yolu(self, gun):
+        gun_eki = gun.strftime('%Y%m%d')
+        mevcut = sorted(glob.glob(os.path.join(self.klasor, f"aktivite-{gun_eki}-*.csv")))
+        if mevcut and os.path.getsize(mevcut[-1]) < self.maksimum_parca_boyutu:
+            return mevcut[-1]
+        sira = int(os.path.splitext(mevcut[-1])[0].rsplit('-', 1)[1]) + 1 if mevcut else 0
+        return os.path.join(self.klasor, f"aktivite-{gun_eki}-{sira:03d}.csv")
+
+    def _yaz(self, kayitlar):
+        # Aynı güne ait kayıtlar tek bir tamponda toplanır ve tek write çağrısıyla eklenir. İş
+        # parçacıkları _yazma_kilidi ile, süreçler kilit dosyasıyla sıraya girer; parça seçimi de
+        # kilit altında yapıldığından eşzamanlı yazan süreçlerin satırları birbirinin ortasına girmez.
+        gunlere_gore = {}
+        for zaman, satir in kayitlar:
+            gunlere_gore.setdefault(zaman.date(), []).append(satir)
+        with self._yazma_kilidi, _dosya_kilidi(os.path.join(self.klasor, KILIT_DOSYASI)):
+            for gun, satirlar in gunlere_gore.items():
+                tampon = io.StringIO()
+                csv.writer(tampon, lineterminator='\n').writerows(satirlar)
+                fd = os.open(self._parca_yolu(gun), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, tampon.getvalue().encode('utf-8'))
+                finally:
+                    os.close(fd)
+
+    def _yaz_dongusu(self):
+        # Her turda o ana kadar biriken kayıtların tamamı tek seferde yazılır.
+        while not self._durdur.wait(self.yazma_araligi):
+            kayitlar = self._kuyruktan_al()
+            if not kayitlar:
+                continue
+            try:
+                self._yaz(kayitlar)
+            except OSError:
+                # Disk hatası uygulamayı durdurmamalı; kayıtlar bir sonraki turda yeniden denenir.
+                for kayit in kayitlar:
+                    self._kuyruk.put(kayit)
+
+    def tum_kayitlar(self):
+        # Eski tek dosyalık log (loglar.csv) ve tüm parçalar tek tabloda.
+        tablolar = []
+        if os.path.exists(ESKI_LOG_DOSYASI):
+            tablolar.append(pd.read_csv(ESKI_LOG_DOSYASI, dtype=str, keep_default_na=False))
+        for parca in self.parcalar():
+            tablolar.append(pd.read_csv(parca, header=None, names=LOG_SUTUNLARI, dtype=str, keep_default_na=False))
+        if not tablolar:
+            return pd.DataFrame(columns=LOG_SUTUNLARI)
+        return pd.concat(tablolar, ignore_index=True)
+
+# --- Log Sorgu Motoru ---
+# Parçalar yalnızca sona eklendiğinden her dosyanın okunan bayt konumu saklanır ve her
+# yenilemede sadece yeni satırlar okunur. Satırlar zaman sırasıyla numaralanır; zaman dizisi
+# sıralı olduğu için tarih aralığı ikili aramayla, kullanıcı/sayfa/aktivite filtreleri ise her
+# değer için tutulan satır numarası listeleriyle (posting list) çözülür. Açılış maliyeti
+# toplam geçmişe değil sayfa boyutuna bağlıdır.
+class _BuyuyenDizi:
+    def __init__(self, dtype, kapasite=1024):
+        self._veri = np.empty(kapasite, dtype=dtype)
+        self.uzunluk = 0
+
+    def ekle(self, degerler):
+        gerekli = self.uzunluk + len(degerler)
+        if gerekli > len(self._veri):
+            yeni = np.empty(max(gerekli, 2 * len(self._veri)), dtype=self._veri.dtype)
+            yeni[:self.uzunluk] = self._veri[:self.uzunluk]
+            self._veri = yeni
+        self._veri[self.uzunluk:gerekli] = degerler
+        self.uzunluk = gerekli
+
+    def gorunum(self):
+        return self._veri[:self.uzunluk]
+
+class _Sozluk:
+    # Metin değerleri küçük tamsayı kodlarına çevirir.
+    def __init__(self):
+        self.kodlar = {}
+        self.degerler = []
+
+    def kodla(self, deger):
+        kod = self.kodlar.get(deger)
+        if kod is None:
+            kod = self.kodlar[deger] = len(self.degerler)
+            self.degerler.append(deger)
+        return kod
+
+def aktivite_turu(aktivite):
+    # "Sayfa ziyareti: Stok" -> "Sayfa ziyareti"; "Giriş Yaptı" olduğu gibi kalır.
+    return aktivite.split(':', 1)[0].strip()
+
+class LogSorguMotoru:
+    def __init__(self, gunluk):
+        self.gunluk = gunluk
+        self._kilit = threading.Lock()
+        self._sifirla()
+
+    def _sifirla(self):
+        self._okunan_konumlar = {}
+        self._zaman = _BuyuyenDizi('datetime64[s]')
+        self._ip = _BuyuyenDizi(object)
+        self._aktivite = _BuyuyenDizi(object)
+        self._sozlukler = {'kullanici': _Sozluk(), 'sayfa': _Sozluk(), 'tur': _Sozluk()}
+        self._kod_dizileri = {ad: _BuyuyenDizi(np.int32) for ad in self._sozlukler}
+        self._listeler = {ad: {} for ad in self._sozlukler}
+        self._gunluk_ziyaretler = {}
+        self._girisler = {}
+
+    def _yeni_satirlar(self, yol, baslikli):
+        # Dosyanın son okunan konumundan itibaren yalnızca tamamlanmış satırları döner.
+        konum = self._okunan_konumlar.get(yol, 0)
+        with open(yol, 'rb') as f:
+            f.seek(konum)
+            veri = f.read()
+        son_satir_sonu = veri.rfind(b'\n')
+        if son_satir_sonu < 0:
+            return []
+        self._okunan_konumlar[yol] = konum + son_satir_sonu + 1
+        satirlar = list(csv.reader(io.StringIO(veri[:son_satir_sonu + 1].decode('utf-8'))))
+        if baslikli and konum == 0 and satirlar:
+            satirlar = satirlar[1:]
+        return [satir for satir in satirlar if len(satir) == len(LOG_SUTUNLARI)]
+
+    def _satirlari_ekle(self, satirlar):
+        if not satirlar:
+            return
+        zamanlar = np.array([satir[0] for satir in satirlar], dtype='datetime64[s]')
+        if self._zaman.uzunluk and zamanlar.min() < self._zaman.gorunum()[-1]:
+            raise ValueError("sırasız log kaydı")
+        if np.any(zamanlar[1:] < zamanlar[:-1]):
+            raise ValueError("sırasız log kaydı")
+        baslangic = self._zaman.uzunluk
+        self._zaman.ekle(zamanlar)
+        self._ip.ekle([satir[2] for satir in satirlar])
+        self._aktivite.ekle([satir[4] for satir in satirlar])
+        alanlar = {
+            'kullanici': [satir[1] for satir in satirlar],
+            'sayfa': [satir[3] for satir in satirlar],
+            'tur': [aktivite_turu(satir[4]) for satir in satirlar],
+        }
+        for ad, degerler in alanlar.items():
+            sozluk = self._sozlukler[ad]
+            kodlar = np.fromiter((sozluk.kodla(deger) for deger in degerler), dtype=np.int32, count=len(degerler))
+            self._kod_dizileri[ad].ekle(kodlar)
+            listeler = self._listeler[ad]
+            for kod in np.unique(kodlar):
+                if kod not in listeler:
+                    listeler[kod] = _BuyuyenDizi(np.int64)
+                listeler[kod].ekle(baslangic + np.flatnonzero(kodlar == kod))
+        # Ön toplamlar: gün x sayfa ziyaretleri ve kullanıcı başına girişler.
+        for satir, tur, gun in zip(satirlar, alanlar['tur'], zamanlar.astype('datetime64[D]')):
+            if tur == 'Sayfa ziyareti':
+                anahtar = (gun, satir[3])
+                self._gunluk_ziyaretler[anahtar] = self._gunluk_ziyaretler.get(anahtar, 0) + 1
+            elif tur == 'Giriş Yaptı':
+                self._girisler[satir[1]] = self._girisler.get(satir[1], 0) + 1
+
+    def _kaynaklar(self):
+        kaynaklar = [(ESKI_LOG_DOSYASI, True)] if os.path.exists(ESKI_LOG_DOSYASI) else []
+        return kaynaklar + [(parca, False) for parca in self.gunluk.parcalar()]
+
+    def _yenile(self):
+        for yol, baslikli in self._kaynaklar():
+            self._satirlari_ekle(self._yeni_satirlar(yol, baslikli))
+
+    def yenile(self):
+        with self._kilit:
+            try:
+                self._yenile()
+            except ValueError:
+                # Saatler geri alınmış veya dosyalar elle düzenlenmiş olabilir: baştan kurulur.
+                self._sifirla()
+                self._yeniden_kur_sirali()
+
+    def _yeniden_kur_sirali(self):
+        # Dosyalar artımlı okumayla aynı yoldan okunur: her dosyanın konumu gerçekten okunan son tam
+        # satırın sonudur. Okuma sırasında eklenen satırlar kaybolmaz, bir sonraki yenilemede gelir.
+        satirlar = []
+        for yol, baslikli in self._kaynaklar():
+            satirlar += self._yeni_satirlar(yol, baslikli)
+        satirlar.sort(key=lambda satir: satir[0])
+        self._satirlari_ekle(satirlar)
+
+    def zaman_araligi(self):
+        # (ilk, son) kayıt zamanı; hiç kayıt yoksa None.
+        zaman = self._zaman.gorunum()
+        if not len(zaman):
+            return None
+        return pd.Timestamp(zaman[0]), pd.Timestamp(zaman[-1])
+
+    def secenekler(self, alan):
+        # alan: 'kullanici', 'sayfa' veya 'tur'
+        return sorted(self._sozlukler[alan].degerler)
+
+    def sorgula(self, kullanici=None, sayfa=None, tur=None, baslangic=None, bitis=None, sayfa_no=0, sayfa_boyutu=50):
+        # En yeni kayıt en üstte olacak şekilde istenen sayfayı ve toplam eşleşen kayıt sayısını döner.
+        with self._kilit:
+            zaman = self._zaman.gorunum()
+            alt = 0 if baslangic is None else int(np.searchsorted(zaman, np.datetime64(baslangic, 's'), side='left'))
+            ust = len(zaman) if bitis is None else int(np.searchsorted(zaman, np.datetime64(bitis, 's'), side='left'))
+            listeler = []
+            for alan, deger in (('kullanici', kullanici), ('sayfa', sayfa), ('tur', tur)):
+                if deger is None:
+                    continue
+                kod = self._sozlukler[alan].kodlar.get(deger)
+                if kod is None:
+                    return pd.DataFrame(columns=LOG_SUTUNLARI), 0
+                liste = self._listeler[alan][kod].gorunum()
+                listeler.append(liste[np.searchsorted(liste, alt):np.searchsorted(liste, ust)])
+            if not listeler:
+                toplam = max(ust - alt, 0)
+                bas, son = max(ust - (sayfa_no + 1) * sayfa_boyutu, alt), ust - sayfa_no * sayfa_boyutu
+                satir_nolari = np.arange(son - 1, bas - 1, -1) if son > bas else np.array([], dtype=np.int64)
+            else:
+                eslesenler = listeler[0]
+                for liste in listeler[1:]:
+                    eslesenler = np.intersect1d(eslesenler, liste, assume_unique=True)
+                toplam = len(eslesenler)
+                bas, son = max(toplam - (sayfa_no + 1) * sayfa_boyutu, 0), max(toplam - sayfa_no * sayfa_boyutu, 0)
+                satir_nolari = eslesenler[bas:son][::-1]
+            kullanicilar = np.array(self._sozlukler['kullanici'].degerler, dtype=object)
+            sayfalar = np.array(self._sozlukler['sayfa'].degerler, dtype=object)
+            sonuc = pd.DataFrame({
+                'Zaman Damgası': pd.to_datetime(zaman[satir_nolari]),
+                'Kullanıcı Adı': kullanicilar[self._kod_dizileri['kullanici'].gorunum()[satir_nolari]],
+                'IP Adresi': self._ip.gorunum()[satir_nolari],
+                'Sayfa Adı': sayfalar[self._kod_dizileri['sayfa'].gorunum()[satir_nolari]],
+                'Aktivite': self._aktivite.gorunum()[satir_nolari],
+            })
+            return sonuc, toplam
+
+    def gunluk_sayfa_ziyaretleri(self):
+        with self._kilit:
+            kayitlar = [(pd.Timestamp(gun), sayfa, adet) for (gun, sayfa), adet in self._gunluk_ziyaretler.items()]
+        return pd.DataFrame(kayitlar, columns=['Gün', 'Sayfa Adı', 'Ziyaret Sayısı']).sort_values(by=['Gün', 'Sayfa Adı'])
+
+    def kullanici_girisleri(self):
+        with self._kilit:
+            kayitlar = list(self._girisler.items())
+        return pd.DataFrame(kayitlar, columns=['Kullanıcı Adı', 'Giriş Sayısı']).sort_values(by='Giriş Sayısı', ascending=False)
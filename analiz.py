@@ -0,0 +1,449 @@
+import numpy as np
+import pandas as pd
+
+from isimler import isimleri_normallestir
+
+# --- Borç Yaşlandırma Küpü ---
+# Vadesi geçmiş alacaklar (Gün > 0 ve Kalan Tutar Total > 0) veri yüklemesi başına bir kez
+# kovalara ayrılır. Sınırlar kovaların üst uçlarıdır: (35, 45, 60) -> 1-35, 36-45, 46-60, 60+.
+YASLANDIRMA_SINIRLARI = (35, 45, 60)
+
+class YaslandirmaKupu:
+    def __init__(self, satis_df, sinirlar=YASLANDIRMA_SINIRLARI):
+        self.sinirlar = tuple(sinirlar)
+        # ustu(esik) sorguları için eşik -> kova sırası; 0 eşiği tüm vadesi geçmiş alacaktır.
+        self.esikler = {esik: i for i, esik in enumerate((0,) + self.sinirlar)}
+        kova_sayisi = len(self.sinirlar) + 1
+        gecikmis = satis_df[(satis_df['Gün'] > 0) & (satis_df['Kalan Tutar Total'] > 0)]
+        kova = pd.Series(np.searchsorted(self.sinirlar, gecikmis['Gün'].to_numpy(), side='left'), index=gecikmis.index, name='Kova')
+        tutar = gecikmis['Kalan Tutar Total']
+        self._bos = np.zeros(kova_sayisi)
+        self._genel = self._kumulatif(np.bincount(kova, weights=tutar, minlength=kova_sayisi))
+        self._boyutlar = {
+            'ST': self._boyut_toplamlari(tutar, gecikmis['ST'], kova, kova_sayisi),
+            'Müşteri': self._boyut_toplamlari(tutar, gecikmis['Müşteri'], kova, kova_sayisi),
+        }
+
+    @staticmethod
+    def _kumulatif(kova_toplamlari):
+        # i. eleman, i. kovadan itibaren (esikten büyük günler) toplamdır.
+        return np.cumsum(kova_toplamlari[::-1])[::-1]
+
+    def _boyut_toplamlari(self, tutar, anahtar, kova, kova_sayisi):
+        tablo = tutar.groupby([anahtar, kova], observed=True).sum().unstack(fill_value=0)
+        tablo = tablo.reindex(columns=range(kova_sayisi), fill_value=0)
+        return {deger: self._kumulatif(satir) for deger, satir in zip(tablo.index, tablo.to_numpy())}
+
+    def _satir(self, temsilci=None, musteri=None):
+        if temsilci is not None:
+            return self._boyutlar['ST'].get(temsilci, self._bos)
+        if musteri is not None:
+            return self._boyutlar['Müşteri'].get(musteri, self._bos)
+        return self._genel
+
+    def ustu(self, gun, temsilci=None, musteri=None):
+        # gun bir kova sınırı (veya 0) olmalıdır; 'gun' günden fazla gecikmiş toplamı döner.
+        return float(self._satir(temsilci, musteri)[self.esikler[gun]])
+
+    def aralik(self, alt, ust, temsilci=None, musteri=None):
+        return self.ustu(alt, temsilci, musteri) - self.ustu(ust, temsilci, musteri)
+
+def yaslandirma_kupu_olustur(satis_df):
+    if satis_df is None:
+        return None
+    return YaslandirmaKupu(satis_df)
+
+# --- Akışlı Satış Özeti ---
+# Genel Bakış göstergeleri satış defteri parça parça okunurken biriktirilir: toplam bakiye,
+# yaşlandırma kovaları ve temsilci bazında pozitif bakiye. Her parça bir kez eklenir ve atılır;
+# ara sonuçlar kopya() ile yayınlanır, yani yayınlanan bir özet sonradan değişmez.
+class SatisOzeti:
+    def __init__(self, sinirlar=YASLANDIRMA_SINIRLARI):
+        self.sinirlar = tuple(sinirlar)
+        self.esikler = {esik: i for i, esik in enumerate((0,) + self.sinirlar)}
+        self.satir_sayisi = 0
+        self.toplam_bakiye = 0.0
+        self._kovalar = np.zeros(len(self.sinirlar) + 1)
+        self._temsilci_bakiyeleri = pd.Series(dtype=float)
+
+    def ekle(self, parca):
+        tutar = parca['Kalan Tutar Total']
+        self.satir_sayisi += len(parca)
+        self.toplam_bakiye += float(tutar.sum())
+        gecikmis = parca[(parca['Gün'] > 0) & (tutar > 0)]
+        kova = np.searchsorted(self.sinirlar, gecikmis['Gün'].to_numpy(), side='left')
+        self._kovalar += np.bincount(kova, weights=gecikmis['Kalan Tutar Total'].to_numpy(), minlength=len(self._kovalar))
+        pozitif = parca[tutar > 0]
+        parca_toplamlari = pozitif['Kalan Tutar Total'].groupby(pozitif['ST'].astype(str)).sum()
+        self._temsilci_bakiyeleri = self._temsilci_bakiyeleri.add(parca_toplamlari, fill_value=0)
+
+    def kopya(self):
+        yeni = SatisOzeti(self.sinirlar)
+        yeni.satir_sayisi, yeni.toplam_bakiye = self.satir_sayisi, self.toplam_bakiye
+        yeni._kovalar = self._kovalar.copy()
+        yeni._temsilci_bakiyeleri = self._temsilci_bakiyeleri.copy()
+        return yeni
+
+    def ustu(self, gun):
+        # YaslandirmaKupu.ustu ile aynı anlam: 'gun' günden fazla gecikmiş toplam.
+        return float(YaslandirmaKupu._kumulatif(self._kovalar)[self.esikler[gun]])
+
+    def aralik(self, alt, ust):
+        return self.ustu(alt) - self.ustu(ust)
+
+    def temsilci_bakiyeleri(self):
+        return self._temsilci_bakiyeleri.sort_index()
+
+# --- Temsilci Bazında Gecikme İndeksi ---
+# Vadesi geçmiş satırlar tek seferde (ST, Gün azalan) sıralanır; her temsilci ardışık bir
+# dilimdir. Eşik sorgusu ikili arama + dilimdir, toplam ise kümülatif toplamdan okunur.
+class GecikmeIndeksi:
+    def __init__(self, satis_df):
+        gecikmis = satis_df[(satis_df['Gün'] > 0) & (satis_df['Kalan Tutar Total'] > 0)]
+        self.tablo = gecikmis.sort_values(by=['ST', 'Gün'], ascending=[True, False], kind='mergesort').reset_index(drop=True)
+        self._eksi_gun = -self.tablo['Gün'].to_numpy()
+        self._kumulatif = np.concatenate(([0.0], np.cumsum(self.tablo['Kalan Tutar Total'].to_numpy())))
+        temsilciler = self.tablo['ST'].to_numpy()
+        sinirlar = np.flatnonzero(temsilciler[1:] != temsilciler[:-1]) + 1
+        baslangiclar = np.concatenate(([0], sinirlar)) if len(temsilciler) else np.array([], dtype=int)
+        bitisler = np.concatenate((sinirlar, [len(temsilciler)])) if len(temsilciler) else np.array([], dtype=int)
+        self._dilimler = {temsilciler[b]: (int(b), int(e)) for b, e in zip(baslangiclar, bitisler)}
+
+    def gun_araligi(self, temsilci):
+        # (en küçük, en büyük) gecikme günü; temsilcinin gecikmiş alacağı yoksa None.
+        if temsilci not in self._dilimler:
+            return None
+        b, e = self._dilimler[temsilci]
+        return int(-self._eksi_gun[e - 1]), int(-self._eksi_gun[b])
+
+    def sorgu(self, temsilci, esik_gun):
+        # 'esik_gun' ve üzeri gecikmiş satırlar: (toplam bakiye, Gün'e göre azalan sıralı tablo dilimi).
+        b, e = self._dilimler.get(temsilci, (0, 0))
+        son = b + int(np.searchsorted(self._eksi_gun[b:e], -esik_gun, side='right'))
+        return float(self._kumulatif[son] - self._kumulatif[b]), self.tablo.iloc[b:son]
+
+def gecikme_indeksi_olustur(satis_df):
+    if satis_df is None:
+        return None
+    return GecikmeIndeksi(satis_df)
+
+# --- İlçe Metrikleri ---
+# adana_ilce_ciro.xlsx veri yüklemesi başına tek bir groupby ile ilçe bazında ciro ve müşteri
+# sayısına indirgenir. Harita katmanındaki (GeoJSON) ilçelerle eşleştirme normalleştirilmiş
+# isimlerle ve tek bir reindex ile yapılır; hangi ilçelerin gösterileceğini GeoJSON belirler.
+class IlceMetrikleri:
+    def __init__(self, ilce_df):
+        self.ozet = ilce_df.groupby('İlçe').agg(**{
+            'Brüt Fiyat': ('Brüt Fiyat', 'sum'),
+            'Müşteri Sayısı': ('Müşteri Ünvanı', 'nunique'),
+        })
+        self.ozet.index = isimleri_normallestir(self.ozet.index.to_series()).astype(str)
+        # Aynı ilçenin farklı yazımları (ör. KARAISALI / KARAİSALI) tek satırda toplanır.
+        self.ozet = self.ozet.groupby(level=0).sum()
+        # En değerli müşteriler: dosyadaki ünvanlarla, yıllık ciroya göre azalan; top-N bir dilimdir.
+        self.musteri_cirolari = ilce_df.groupby('Müşteri Ünvanı')['Brüt Fiyat'].sum().sort_values(ascending=False).reset_index()
+
+    def en_degerli_musteriler(self, n):
+        return self.musteri_cirolari.head(n)
+
+    def katmana_uygula(self, geojson, renk_paleti, isim_alani='name'):
+        # GeoJSON'un değiştirilmiş bir kopyasını, haritadaki ilçelerin özetini ve renk ölçeğinin
+        # (en küçük, en büyük) ciro aralığını döner. Ölçek yalnızca haritadaki ilçelere göre kurulur;
+        # her özelliğe ciro, müşteri sayısı ve önceden hesaplanmış dolgu rengi yazılır.
+        ozellikler = geojson['features']
+        isimler = pd.Series([ozellik['properties'][isim_alani] for ozellik in ozellikler])
+        eslesen = self.ozet.reindex(isimleri_normallestir(isimler).astype(str).to_numpy())
+        veri_var = eslesen['Brüt Fiyat'].notna().to_numpy()
+        cirolar = eslesen['Brüt Fiyat'].fillna(0).to_numpy()
+        musteri_sayilari = eslesen['Müşteri Sayısı'].fillna(0).astype(int).to_numpy()
+        ciro_araligi = (float(cirolar[veri_var].min()), float(cirolar[veri_var].max())) if veri_var.any() else (0.0, 0.0)
+        renkler = dogrusal_renk_skalasi(renk_paleti, *ciro_araligi)(cirolar)
+        yeni_ozellikler = [
+            {**ozellik, 'properties': {**ozellik['properties'], 'Brüt Fiyat': float(ciro), 'Müşteri Sayısı': int(adet), 'fillColor': renk}}
+            for ozellik, ciro, adet, renk in zip(ozellikler, cirolar, musteri_sayilari, renkler)
+        ]
+        haritadaki = pd.DataFrame({'İlçe': isimler.to_numpy(), 'Brüt Fiyat': cirolar, 'Müşteri Sayısı': musteri_sayilari})[veri_var]
+        return {**geojson, 'features': yeni_ozellikler}, haritadaki.reset_index(drop=True), ciro_araligi
+
+def dogrusal_renk_skalasi(renkler, en_kucuk, en_buyuk):
+    # Renk listesi [en_kucuk, en_buyuk] aralığına eşit aralıklarla yayılır; değer dizisi için
+    # her kanal np.interp ile tek seferde hesaplanır ve '#rrggbb' dizisi döner.
+    renkler = np.asarray(renkler, dtype=float)
+    duraklar = np.linspace(en_kucuk, en_buyuk if en_buyuk > en_kucuk else en_kucuk + 1, len(renkler))
+    def skala(degerler):
+        degerler = np.asarray(degerler, dtype=float)
+        kanallar = np.stack([np.interp(degerler, duraklar, renkler[:, i]) for i in range(3)], axis=1)
+        kanallar = np.clip(np.rint(kanallar * 255), 0, 255).astype(int)
+        return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in kanallar]
+    return skala
+
+def ilce_metrikleri_olustur(ilce_df):
+    if ilce_df is None or ilce_df.empty or 'İlçe' not in ilce_df.columns:
+        return None
+    return IlceMetrikleri(ilce_df)
+
+# --- Stok Modeli ---
+# stok.xls veri yüklemesi başına bir kez depo bazında ve tüm depolar toplamında ürün tablolarına
+# indirgenir. Kritik işareti eşiğe göre önceden hesaplanır; depo seçimi ve "sadece kritik" anahtarı
+# sözlükten okuma olur. Tablolar ürün adına göre sıralı tutulur.
+STOK_KRITIK_SEVIYESI = 40
+
+class StokModeli:
+    def __init__(self, stok_df, kritik_seviye=STOK_KRITIK_SEVIYESI):
+        self.kritik_seviye = kritik_seviye
+        aktif = stok_df[stok_df['Miktar'] > 0]
+        depo_tablosu = aktif[['Depo Adı', 'Ürün Kodu', 'Ürün', 'Miktar', 'Fiyat', 'Brüt Tutar']]
+        tum_depolar = aktif.groupby(['Ürün Kodu', 'Ürün', 'Fiyat']).agg(Miktar=('Miktar', 'sum'), **{'Brüt Tutar': ('Brüt Tutar', 'sum')}).reset_index()
+        self.depolar = sorted(depo_tablosu['Depo Adı'].unique())
+        # Anahtar: depo adı; None tüm depoların toplamıdır.
+        self._tablolar = {None: self._hazirla(tum_depolar[['Ürün Kodu', 'Ürün', 'Miktar', 'Fiyat', 'Brüt Tutar']])}
+        for depo, tablo in depo_tablosu.groupby('Depo Adı', sort=False):
+            self._tablolar[depo] = self._hazirla(tablo)
+        self._kritikler = {depo: tablo[tablo['Kritik']].reset_index(drop=True) for depo, tablo in self._tablolar.items()}
+        self._ozetler = {
+            depo: {
+                'toplam_deger': float(tablo['Brüt Tutar'].sum()),
+                'urun_cesidi': int(tablo['Ürün'].nunique()),
+                'kritik_sayisi': len(self._kritikler[depo]),
+            }
+            for depo, tablo in self._tablolar.items()
+        }
+
+    def _hazirla(self, tablo):
+        tablo = tablo.sort_values(by='Ürün', kind='mergesort').reset_index(drop=True)
+        return tablo.assign(Kritik=tablo['Miktar'].to_numpy() < self.kritik_seviye)
+
+    def tablo(self, depo=None, sadece_kritik=False):
+        return (self._kritikler if sadece_kritik else self._tablolar)[depo]
+
+    def ozet(self, depo=None):
+        return self._ozetler[depo]
+
+def stok_modeli_olustur(stok_df):
+    if stok_df is None or any(sutun not in stok_df.columns for sutun in ('Depo Adı', 'Ürün Kodu', 'Ürün', 'Fiyat', 'Miktar', 'Brüt Tutar')):
+        return None
+    return StokModeli(stok_df)
+
+# --- Tablo Penceresi ---
+# Büyük tablolar tarayıcıya bütün olarak gönderilmez: arama ve sıralama sunucuda yapılır, yalnızca
+# istenen sayfa (pencere) döner. Kategorik sütunlarda arama satırlar yerine kategoriler üzerinde
+# yapılır ve sonuç kodlarla eşlenir; sıralamada tüm tablo yerine satır sırası (argsort) hesaplanır.
+def _arama_maskesi(seri, arama):
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        eslesen = np.flatnonzero(seri.cat.categories.astype(str).str.contains(arama, case=False, regex=False))
+        return np.isin(seri.cat.codes.to_numpy(), eslesen)
+    if pd.api.types.is_object_dtype(seri.dtype) or pd.api.types.is_string_dtype(seri.dtype):
+        return seri.astype(str).str.contains(arama, case=False, regex=False).to_numpy()
+    return np.zeros(len(seri), dtype=bool)
+
+def tablo_penceresi(df, arama=None, sirala=None, artan=True, baslangic=0, uzunluk=50):
+    # (pencere, filtre sonrası toplam satır sayısı) döner. Arama metin sütunlarının herhangi
+    # birinde geçen satırları tutar; büyük/küçük harf ayrımı yapılmaz.
+    satirlar = np.arange(len(df))
+    if arama:
+        maske = np.zeros(len(df), dtype=bool)
+        for sutun in df.columns:
+            maske |= _arama_maskesi(df[sutun], arama)
+        satirlar = satirlar[maske]
+    if sirala is not None:
+        degerler = df[sirala].iloc[satirlar]
+        sira = degerler.reset_index(drop=True).sort_values(ascending=artan, kind='mergesort', na_position='last').index.to_numpy()
+        satirlar = satirlar[sira]
+    return df.iloc[satirlar[baslangic:baslangic + uzunluk]], len(satirlar)
+
+# --- Senaryo Motoru ---
+# Senaryo analizinin dayandığı mevcut durum (ciro, bakiye, vadesi geçmiş alacak, stok değeri)
+# veri yüklemesi başına bir kez, toplam ve temsilci / depo kırılımlarıyla hesaplanır. Bir senaryo
+# bu değerler üzerinde yalnızca aritmetiktir; oranlar skaler ya da numpy dizisi olabildiğinden
+# aynı formüller bir oran ızgarasının tamamını tek seferde değerlendirir. Oranlar 0-1 arasıdır.
+SENARYO_SONUCLARI = ['Ciro', 'Ciro Farkı', 'Tahsil Edilen', 'Bakiye', 'İskontolu Ciro', 'Toplam Maliyet', 'Brüt Kâr', 'Nakit Girişi']
+
+def senaryo_hesapla(ciro, bakiye, vadesi_gecmis, satis_degisim=0.0, tahsilat=0.0, iskonto=0.0, maliyet=0.0):
+    simulasyon_ciro = ciro * (1 + satis_degisim)
+    tahsil_edilen = vadesi_gecmis * tahsilat
+    iskontolu_ciro = simulasyon_ciro * (1 - iskonto)
+    toplam_maliyet = iskontolu_ciro * maliyet
+    brut_kar = iskontolu_ciro - toplam_maliyet
+    return dict(zip(SENARYO_SONUCLARI, (
+        simulasyon_ciro, simulasyon_ciro - ciro, tahsil_edilen, bakiye - tahsil_edilen,
+        iskontolu_ciro, toplam_maliyet, brut_kar, tahsil_edilen + brut_kar,
+    )))
+
+class SenaryoMotoru:
+    def __init__(self, satis_df, stok_df, satis_hedef_df, yaslandirma_kupu, temsilci_satislari):
+        toplam_satirlari = satis_hedef_df[satis_hedef_df['Satış Temsilcisi'].str.strip() == 'TOPLAM']
+        self.ciro = float(toplam_satirlari['SATIŞ'].sum())
+        self.bakiye = float(satis_df['Kalan Tutar Total'].sum())
+        self.vadesi_gecmis = yaslandirma_kupu.ustu(0)
+        self.stok_degeri = float(stok_df['Brüt Tutar'].sum())
+        temsilciler = satis_df['ST'].cat.categories
+        self.temsilciler = pd.DataFrame({
+            'Ciro': temsilci_satislari.reindex(temsilciler, fill_value=0.0).to_numpy(dtype=float) if temsilci_satislari is not None else 0.0,
+            'Bakiye': satis_df.groupby('ST', observed=False)['Kalan Tutar Total'].sum().reindex(temsilciler).to_numpy(),
+            'Vadesi Geçmiş': [yaslandirma_kupu.ustu(0, temsilci=temsilci) for temsilci in temsilciler],
+        }, index=pd.Index(temsilciler, name='Temsilci'))
+        self.depolar = stok_df.groupby('Depo Adı')['Brüt Tutar'].sum().rename('Stok Değeri').rename_axis('Depo').to_frame()
+
+    def degerlendir(self, satis_degisim=0.0, tahsilat=0.0, iskonto=0.0, maliyet=0.0, stok_zam=0.0):
+        sonuc = senaryo_hesapla(self.ciro, self.bakiye, self.vadesi_gecmis, satis_degisim, tahsilat, iskonto, maliyet)
+        sonuc['Stok Değeri'] = self.stok_degeri * (1 + np.asarray(stok_zam))
+        return sonuc
+
+    def izgara(self, tahsilat_oranlari, iskonto_oranlari, maliyet_oranlari, satis_degisim=0.0):
+        # Sonuç dizilerinin eksenleri (tahsilat, iskonto, maliyet) sırasındadır.
+        tahsilat, iskonto, maliyet = np.meshgrid(tahsilat_oranlari, iskonto_oranlari, maliyet_oranlari, indexing='ij')
+        return senaryo_hesapla(self.ciro, self.bakiye, self.vadesi_gecmis, satis_degisim, tahsilat, iskonto, maliyet)
+
+    def temsilci_kirilimi(self, satis_degisim=0.0, tahsilat=0.0, iskonto=0.0, maliyet=0.0):
+        t = self.temsilciler
+        sonuc = senaryo_hesapla(t['Ciro'].to_numpy(), t['Bakiye'].to_numpy(), t['Vadesi Geçmiş'].to_numpy(), satis_degisim, tahsilat, iskonto, maliyet)
+        return t.assign(**sonuc).reset_index()
+
+    def depo_kirilimi(self, stok_zam=0.0):
+        return self.depolar.assign(**{'Zam Sonrası': self.depolar['Stok Değeri'] * (1 + stok_zam)}).reset_index()
+
+def senaryo_motoru_olustur(satis_df, stok_df, satis_hedef_df, yaslandirma_kupu, temsilci_satislari):
+    if satis_df is None or stok_df is None or satis_hedef_df is None or satis_hedef_df.empty or yaslandirma_kupu is None:
+        return None
+    return SenaryoMotoru(satis_df, stok_df, satis_hedef_df, yaslandirma_kupu, temsilci_satislari)
+
+# --- Monte Carlo Tahsilat Tahmini ---
+# Açık satırlar (Kalan Tutar Total > 0) veri yüklemesi başına bir kez (temsilci, yaşlandırma kovası)
+# hücrelerine indirgenir: her hücre için tutar toplamı ve tutar kareleri toplamı. Bir koşuda her
+# temsilcinin tahsilat olasılığı kova olasılığının rastgele bir temsilci çarpanıyla ölçeklenmiş
+# halidir; hücre içindeki satırların bağımsız tahsil edilmesinin toplamı bu iki momentle (normal
+# yaklaşım) çekilir. Böylece koşu maliyeti satır sayısından bağımsızdır ve tüm koşular tek
+# (koşu, temsilci, kova) dizisinde hesaplanır. Kova 0 vadesi gelmemiş alacaktır.
+TAHSILAT_KOVALARI = ['Vadesi Gelmemiş', '1-35 Gün', '36-45 Gün', '46-60 Gün', '60+ Gün']
+TAHSILAT_OLASILIKLARI = (0.90, 0.70, 0.50, 0.35, 0.15)
+TAHMIN_YUZDELIKLERI = (10, 50, 90)
+
+class TahsilatSimulasyonu:
+    def __init__(self, satis_df, sinirlar=YASLANDIRMA_SINIRLARI):
+        acik = satis_df[satis_df['Kalan Tutar Total'] > 0]
+        gun = acik['Gün'].to_numpy()
+        # NaN günler vadesi gelmemiş sayılır (karşılaştırmalar False döner).
+        kova = np.where(gun > 0, np.searchsorted(sinirlar, gun, side='left') + 1, 0)
+        tutar = acik['Kalan Tutar Total'].to_numpy(dtype=float)
+        self.temsilciler = acik['ST'].cat.remove_unused_categories().cat.categories
+        temsilci = acik['ST'].cat.set_categories(self.temsilciler).cat.codes.to_numpy()
+        hucre = temsilci.astype(np.int64) * len(TAHSILAT_KOVALARI) + kova
+        boyut = (len(self.temsilciler), len(TAHSILAT_KOVALARI))
+        self.toplamlar = np.bincount(hucre, weights=tutar, minlength=boyut[0] * boyut[1]).reshape(boyut)
+        self._kareler = np.bincount(hucre, weights=tutar ** 2, minlength=boyut[0] * boyut[1]).reshape(boyut)
+        self.satir_sayisi = len(acik)
+
+    def simule_et(self, kova_olasiliklari=TAHSILAT_OLASILIKLARI, temsilci_oynakligi=0.25, kosu_sayisi=5000, tohum=0, parti_boyutu=2000):
+        # Koşu başına toplam tahsilat ile (koşu, temsilci, kova) bazında tahsilatların temsilci
+        # toplamlarını döner; koşular bellek için parti_boyutu'luk partilerle üretilir.
+        rng = np.random.default_rng(tohum)
+        olasilik = np.asarray(kova_olasiliklari, dtype=float)
+        toplamlar = np.empty(kosu_sayisi)
+        temsilci_toplamlari = np.empty((kosu_sayisi, len(self.temsilciler)))
+        kova_toplamlari = np.empty((kosu_sayisi, len(TAHSILAT_KOVALARI)))
+        for bas in range(0, kosu_sayisi, parti_boyutu):
+            n = min(parti_boyutu, kosu_sayisi - bas)
+            # Ortalaması 1 olan log-normal temsilci çarpanı.
+            carpan = np.exp(temsilci_oynakligi * rng.standard_normal((n, len(self.temsilciler), 1)) - temsilci_oynakligi ** 2 / 2)
+            p = np.clip(olasilik * carpan, 0.0, 1.0)
+            ortalama = p * self.toplamlar
+            sapma = np.sqrt(p * (1 - p) * self._kareler)
+            tahsilat = np.clip(ortalama + sapma * rng.standard_normal(p.shape), 0.0, self.toplamlar)
+            temsilci_toplamlari[bas:bas + n] = tahsilat.sum(axis=2)
+            kova_toplamlari[bas:bas + n] = tahsilat.sum(axis=1)
+            toplamlar[bas:bas + n] = temsilci_toplamlari[bas:bas + n].sum(axis=1)
+        return toplamlar, temsilci_toplamlari, kova_toplamlari
+
+    def tahmin(self, kova_olasiliklari=TAHSILAT_OLASILIKLARI, temsilci_oynakligi=0.25, kosu_sayisi=5000, tohum=0):
+        # P10/P50/P90 nakit girişi: toplam, temsilci ve kova bazında tablolar ile koşu toplamları.
+        toplamlar, temsilciler, kovalar = self.simule_et(kova_olasiliklari, temsilci_oynakligi, kosu_sayisi, tohum)
+        etiketler = [f'P{y}' for y in TAHMIN_YUZDELIKLERI]
+        def yuzdelik_tablosu(degerler, index, acik_bakiye):
+            tablo = pd.DataFrame(np.percentile(degerler, TAHMIN_YUZDELIKLERI, axis=0).T, index=index, columns=etiketler)
+            tablo.insert(0, 'Açık Bakiye', acik_bakiye)
+            return tablo
+        return {
+            'yuzdelikler': dict(zip(etiketler, np.percentile(toplamlar, TAHMIN_YUZDELIKLERI))),
+            'acik_bakiye': float(self.toplamlar.sum()),
+            'temsilciler': yuzdelik_tablosu(temsilciler, pd.Index(self.temsilciler, name='Temsilci'), self.toplamlar.sum(axis=1)),
+            'kovalar': yuzdelik_tablosu(kovalar, pd.Index(TAHSILAT_KOVALARI, name='Kova'), self.toplamlar.sum(axis=0)),
+            'kosular': toplamlar,
+        }
+
+def tahsilat_simulasyonu_olustur(satis_df):
+    if satis_df is None:
+        return None
+    return TahsilatSimulasyonu(satis_df)
+
+# --- Müşteri Analitiği (RFM) ---
+# Müşteri bazındaki göstergeler veri yüklemesi başına bir kez hesaplanır. rapor.xls ile
+# adana_ilce_ciro.xlsx normalleştirilmiş müşteri adı üzerinden eşleştirilir:
+#   Yakınlık (R): en yeni açık satırın günü (min Gün); küçük olan daha iyidir.
+#   Sıklık (F): rapor.xls'teki satır (işlem) sayısı.
+#   Tutar (M): yıllık ciro (Brüt Fiyat); eşleşmeyen müşterilerde 0.
+# Her gösterge sıralama yüzdeliğine göre 1-5 puanlanır. Top-N ve uyuyan müşteri sorguları önceden
+# sıralanmış tablolardan dilimle okunur; en değerli müşteriler listesi IlceMetrikleri'ndedir.
+RFM_SEGMENTLERI = ['Şampiyonlar', 'Sadık Müşteriler', 'Potansiyel Sadıklar', 'Risk Altında', 'Uyuyan', 'Diğer']
+
+def _puanla(degerler, artan=True):
+    # Sıralama yüzdeliği -> 1..5; eşit değerler aynı puanı alır.
+    yuzdelik = pd.Series(degerler).rank(method='average', pct=True, ascending=artan).to_numpy()
+    return np.clip(np.ceil(yuzdelik * 5), 1, 5).astype(np.int8)
+
+class MusteriAnalitigi:
+    def __init__(self, satis_df, ilce_df=None):
+        musteriler = satis_df.groupby('Müşteri', observed=True).agg(
+            **{'ST': ('ST', 'first'), 'İşlem Sayısı': ('Gün', 'size'), 'Son İşlem Günü': ('Gün', 'min'),
+               'Gecikme Günü': ('Gün', 'max'), 'Bakiye': ('Kalan Tutar Total', 'sum')})
+        musteriler.index = musteriler.index.astype(str)
+        anahtar = isimleri_normallestir(musteriler.index.to_series()).astype(str)
+        if ilce_df is not None and 'Müşteri Ünvanı' in ilce_df.columns:
+            ilce_anahtari = isimleri_normallestir(ilce_df['Müşteri Ünvanı']).astype(str)
+            cirolar = ilce_df.groupby(ilce_anahtari.to_numpy()).agg(**{'Ciro': ('Brüt Fiyat', 'sum')} | ({'İlçe': ('İlçe', 'first')} if 'İlçe' in ilce_df.columns else {}))
+            musteriler = musteriler.join(cirolar.reindex(anahtar.to_numpy()).set_axis(musteriler.index))
+        musteriler['Ciro'] = musteriler.get('Ciro', pd.Series(0.0, index=musteriler.index)).fillna(0.0)
+        r = _puanla(musteriler['Son İşlem Günü'].fillna(musteriler['Son İşlem Günü'].max()).to_numpy(), artan=False)
+        f = _puanla(musteriler['İşlem Sayısı'].to_numpy())
+        m = _puanla(musteriler['Ciro'].to_numpy())
+        musteriler['R'], musteriler['F'], musteriler['M'] = r, f, m
+        # Koşullar sırayla denenir; ilk tutan segment atanır.
+        kosullar = {
+            'Şampiyonlar': (r >= 4) & (f >= 4) & (m >= 4),
+            'Risk Altında': (r <= 2) & (f >= 3),
+            'Sadık Müşteriler': f >= 4,
+            'Potansiyel Sadıklar': r >= 4,
+            'Uyuyan': r <= 2,
+        }
+        segment = np.select(list(kosullar.values()), list(kosullar), 'Diğer')
+        musteriler['Segment'] = pd.Categorical(segment, categories=RFM_SEGMENTLERI)
+        self.musteriler = musteriler.rename_axis('Müşteri').reset_index()
+        # İşlem sayısına göre azalan (value_counts sırası); eşitlikte müşteri adı.
+        self.sadiklar = self.musteriler.sort_values(['İşlem Sayısı', 'Müşteri'], ascending=[False, True], kind='mergesort').reset_index(drop=True)
+        # Gecikme gününe göre azalan; günü boş olanlar dışarıda kalır. Eşik sorgusu ikili aramadır.
+        uyuyanlar = self.musteriler.dropna(subset=['Gecikme Günü'])
+        self.uyuyanlar = uyuyanlar.sort_values('Gecikme Günü', ascending=False, kind='mergesort').reset_index(drop=True)
+        self._eksi_gecikme = -self.uyuyanlar['Gecikme Günü'].to_numpy()
+
+    def en_sadiklar(self, n):
+        return self.sadiklar.head(n)
+
+    def uyuyan_musteriler(self, en_az_gun, bugun=None):
+        # Gecikme günü 'en_az_gun' ve üzeri olan müşteriler; son işlem tarihi bugünden geriye sayılır.
+        son = int(np.searchsorted(self._eksi_gecikme, -en_az_gun, side='right'))
+        dilim = self.uyuyanlar.iloc[:son]
+        bugun = pd.Timestamp(bugun or pd.Timestamp.today().normalize())
+        return dilim.assign(**{'Son İşlem Tarihi': bugun - pd.to_timedelta(dilim['Gecikme Günü'], unit='D')})
+
+    def segment_ozeti(self):
+        return self.musteriler.groupby('Segment', observed=False).agg(**{
+            'Müşteri Sayısı': ('Müşteri', 'size'), 'Toplam Ciro': ('Ciro', 'sum'), 'Toplam Bakiye': ('Bakiye', 'sum'),
+            'Ort. R': ('R', 'mean'), 'Ort. F': ('F', 'mean'), 'Ort. M': ('M', 'mean'),
+        }).reset_index()
+
+    def segment(self, segment):
+        return self.musteriler[self.musteriler['Segment'] == segment]
+
+def musteri_analitigi_olustur(satis_df, ilce_df):
+    if satis_df is None:
+        return None
+    return MusteriAnalitigi(satis_df, ilce_df)
@@ -0,0 +1,506 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+import veri_yukleme
+from aktivite_log import AktiviteGunlugu, LogSorguMotoru
+from analiz import TAHSILAT_OLASILIKLARI, GecikmeIndeksi, SatisOzeti, YaslandirmaKupu, tablo_penceresi
+from defter_gecmisi import BAKIYE_TOLERANSI, DEFTER_KLASORU, DefterGecmisi, defteri_indirge
+from isimler import isimleri_normallestir
+from para_bicimi import tl_dizisi
+from toplu_rapor import toplu_rapor_uret
+from veri_onbellek import arrow_baytlarina_cevir, arrow_baytlarindan_oku, onbellekli_oku
+from veri_yukleme import KAYNAKLAR, satis_parcalarini_birlestir, satis_parcasini_normallestir, satis_gecmisi_yukle, satis_veri_yukle, turetilmis_verileri_olustur
+
+# --- Performans Kıyaslaması ---
+# Gerçek dosyalarla aynı biçimde sentetik veri üretilir, ardından gerçek yükleyiciler, türetilmiş
+# veriler ve sayfaların kullandığı hesaplamalar Streamlit sunucusu olmadan sırayla çalıştırılır.
+# Her aşamanın süresi ve tracemalloc ile ölçülen tepe bellek kullanımı JSON olarak yazılır;
+# iki sonuç dosyası --karsilastir ile aşama aşama kıyaslanır. Üretim aynı tohumla tekrarlanabilir.
+#   python benchmark.py                          # 10k ve 100k satır
+#   python benchmark.py --satir 1000000 --cikti sonuc.json
+#   python benchmark.py --karsilastir eski.json yeni.json
+#   python benchmark.py --dogrula                # hızlandırılmış yolların eski pandas hesaplarıyla eşliği
+# Not: .xls (BIFF) biçimi 65.536 satırla sınırlı olduğundan ve yazıcısı kurulu olmadığından satış
+# defteri ve stok .xlsx olarak üretilir; yükleyiciler iki biçimi de okur (bkz. _calisma_kitabi_satirlari).
+VARSAYILAN_SATIRLAR = (10_000, 100_000)
+TOHUM = 42
+ADANA_ILCELERI = [
+    'SEYHAN', 'YÜREĞİR', 'SARIÇAM', 'ÇUKUROVA', 'KARAİSALI', 'CEYHAN', 'KOZAN', 'İMAMOĞLU', 'KARATAŞ',
+    'POZANTI', 'ALADAĞ', 'FEKE', 'SAİMBEYLİ', 'TUFANBEYLİ', 'YUMURTALIK',
+]
+DEPOLAR = ['Merkez Depo', 'Ceyhan Depo', 'Kozan Depo', 'Pozantı Depo']
+GEOJSON_DOSYASI = 'adana_ilceler.geojson'
+# Senaryo ızgarası Senaryo Analizi sayfasındaki eksenlerle aynı boyuttadır.
+SENARYO_IZGARASI = (np.arange(0, 101, 5), np.arange(0, 51, 1), np.arange(0, 101, 1))
+
+# --- Sentetik Veri Üreticileri ---
+# Satış defteri satır sayısı ölçeği belirler; müşteri, temsilci ve ürün sayıları ona göre büyür.
+# Her müşteri tek bir temsilciye bağlıdır; ilçe cirosu dosyasındaki ünvanlar defterdeki müşteri
+# adlarının bir alt kümesidir, böylece RFM eşleştirmesi gerçek veride olduğu gibi kısmi olur.
+def _boyutlar(satir):
+    return {
+        'musteri': max(50, satir // 5),
+        'temsilci': max(15, satir // 20_000),
+        'urun': max(200, satir // 20),
+    }
+
+def _temsilci_adlari(adet):
+    return [f"Temsilci {i:03d}" for i in range(1, adet + 1)]
+
+def _musteri_adlari(adet):
+    return [f"MÜŞTERİ {i:07d} GIDA" for i in range(1, adet + 1)]
+
+def _xlsx_yaz(dosya_yolu, basliklar, sutunlar):
+    # constant_memory kipinde satırlar yazıldıkça diske akar; 1M satırda bile bellek sabit kalır.
+    calisma_kitabi = xlsxwriter.Workbook(dosya_yolu, {'constant_memory': True})
+    sayfa = calisma_kitabi.add_worksheet()
+    if basliklar is not None:
+        sayfa.write_row(0, 0, basliklar)
+    for i, satir in enumerate(zip(*sutunlar), start=0 if basliklar is None else 1):
+        sayfa.write_row(i, 0, satir)
+    calisma_kitabi.close()
+
+def satis_defteri_uret(dosya_yolu, satir, rng):
+    boyut = _boyutlar(satir)
+    temsilciler = _temsilci_adlari(boyut['temsilci'])
+    musteriler = _musteri_adlari(boyut['musteri'])
+    musteri = rng.integers(0, len(musteriler), satir)
+    temsilci = musteri % len(temsilciler)
+    # Gün < 0 vadesi gelmemiş satırlardır; tutarların bir kısmı eksi (fazla ödeme / iade).
+    gun = rng.integers(-60, 600, satir)
+    tutar = np.round(rng.lognormal(7, 1.5, satir) * np.where(rng.random(satir) < 0.1, -1, 1), 2)
+    _xlsx_yaz(dosya_yolu, ['ST', 'Satış Temsilcisi', 'Müşteri', 'Gün', 'Kalan Tutar Total'], [
+        [temsilciler[i] for i in temsilci], (100 + temsilci).tolist(), [musteriler[i] for i in musteri], gun.tolist(), tutar.tolist(),
+    ])
+
+def stok_uret(dosya_yolu, satir, rng):
+    urun_sayisi = _boyutlar(satir)['urun']
+    # Her ürün rastgele bir depoda, bir kısmı birden fazla depoda bulunur.
+    urun = np.concatenate([np.arange(urun_sayisi), rng.integers(0, urun_sayisi, urun_sayisi // 2)])
+    depo = rng.integers(0, len(DEPOLAR), len(urun))
+    fiyat = np.round(rng.uniform(5, 500, urun_sayisi), 2)[urun]
+    miktar = np.round(rng.gamma(1.2, 80, len(urun)), 3) * (rng.random(len(urun)) > 0.05)
+    kdv = rng.choice([1, 10, 20], len(urun))
+    brut = np.round(fiyat * miktar, 2)
+    _xlsx_yaz(dosya_yolu, ['Depo Kodu', 'Depo Adı', 'Ürün Kodu', 'Ürün', 'K.D.V', 'Fiyat', 'Miktar', 'Brüt Tutar', "KDV' li Tutar", 'Stok Gün Sayısı', 'Kritik Stok Seviyesi'], [
+        (2495 + depo).tolist(), [DEPOLAR[i] for i in depo], [f"UR.{i:06d}" for i in urun], [f"ÜRÜN {i:06d} 24AD" for i in urun],
+        kdv.tolist(), fiyat.tolist(), miktar.tolist(), brut.tolist(), np.round(brut * (1 + kdv / 100), 4).tolist(),
+        rng.integers(0, 90, len(urun)).tolist(), [''] * len(urun),
+    ])
+
+def satis_hedef_uret(dosya_yolu, satir, rng):
+    # İki gruplu blok yapısı: grup başlığı, 'Satış Temsilcisi' başlık satırı, temsilci satırları; sonda TOPLAM.
+    temsilciler = _temsilci_adlari(_boyutlar(satir)['temsilci'])
+    hedef = np.round(rng.uniform(400_000, 1_500_000, len(temsilciler)), -3)
+    satis = np.round(hedef * rng.uniform(0, 0.3, len(temsilciler)), 2)
+    yari = (len(temsilciler) + 1) // 2
+    satirlar = []
+    for grup, dilim in (('SICAK SATIŞ', slice(0, yari)), ('SOĞUK SATIŞ', slice(yari, None))):
+        satirlar += [[grup, '', '', '', ''], ['Satış Temsilcisi', 'HEDEF', 'SATIŞ', 'KALAN', '%']]
+        satirlar += [[ad, h, s, h - s, s / h * 100] for ad, h, s in zip(temsilciler[dilim], hedef[dilim], satis[dilim])]
+        satirlar.append(['', '', '', '', ''])
+    satirlar[-1] = ['TOPLAM', hedef.sum(), satis.sum(), hedef.sum() - satis.sum(), satis.sum() / hedef.sum() * 100]
+    _xlsx_yaz(dosya_yolu, None, list(zip(*satirlar)))
+
+def ilce_cirosu_uret(dosya_yolu, satir, rng):
+    musteriler = _musteri_adlari(_boyutlar(satir)['musteri'])
+    secilen = np.sort(rng.choice(len(musteriler), int(len(musteriler) * 0.7), replace=False))
+    _xlsx_yaz(dosya_yolu, ['Müşteri Kodu', 'Müşteri Ünvanı', 'İlçe', 'Brüt Fiyat'], [
+        [str(20240000000 + i) for i in secilen], [musteriler[i] for i in secilen],
+        [ADANA_ILCELERI[i] for i in rng.integers(0, len(ADANA_ILCELERI), len(secilen))],
+        np.round(rng.lognormal(9, 1.2, len(secilen)), 2).tolist(),
+    ])
+
+def solen_borcu_uret(dosya_yolu, satir, rng):
+    _xlsx_yaz(dosya_yolu, None, [[float(np.round(rng.uniform(1e6, 5e7), 2))]])
+
+# anahtar: (üretilen dosya adı, üretici); anahtarlar KAYNAKLAR ile aynıdır.
+URETICILER = {
+    'satis': ('rapor.xlsx', satis_defteri_uret),
+    'stok': ('stok.xlsx', stok_uret),
+    'satis_hedef': ('satis-hedef.xlsx', satis_hedef_uret),
+    'solen_borcu': ('solen_borc.xlsx', solen_borcu_uret),
+    'ilce': ('adana_ilce_ciro.xlsx', ilce_cirosu_uret),
+}
+
+def veri_uret(klasor, satir, tohum=TOHUM):
+    # Her dosya kendi tohumundan üretilir; bir üreticinin değişmesi diğerlerinin verisini değiştirmez.
+    yollar = {}
+    for i, (anahtar, (ad, uretici)) in enumerate(URETICILER.items()):
+        yollar[anahtar] = os.path.join(klasor, ad)
+        uretici(yollar[anahtar], satir, np.random.default_rng([tohum, satir, i]))
+    return yollar
+
+# --- Ölçüm ---
+class Olcer:
+    def __init__(self, bellek=True):
+        self.bellek = bellek
+        self.asamalar = []
+
+    def olc(self, ad, fonksiyon, *args, **kwargs):
+        # Aşamanın süresi (sn), tepe bellek kullanımı (MB) ve sonuç tabloysa satır sayısı kaydedilir.
+        # tracemalloc süreleri uzatır; salt süre için --bellek-olcumu-yok ile kapatılabilir.
+        if self.bellek:
+            tracemalloc.start()
+        baslangic = time.perf_counter()
+        try:
+            sonuc = fonksiyon(*args, **kwargs)
+        finally:
+            sure = time.perf_counter() - baslangic
+            tepe = tracemalloc.get_traced_memory()[1] if self.bellek else None
+            if self.bellek:
+                tracemalloc.stop()
+        self.asamalar.append({
+            'asama': ad,
+            'sure_sn': round(sure, 6),
+            'tepe_bellek_mb': None if tepe is None else round(tepe / (1024 * 1024), 3),
+            'satir': len(sonuc) if isinstance(sonuc, (pd.DataFrame, pd.Series)) else None,
+        })
+        print(f"  {ad:<45} {sure:9.3f} sn" + ('' if tepe is None else f"  {tepe / (1024 * 1024):9.1f} MB"), flush=True)
+        return sonuc
+
+# --- Aşamalar ---
+# Yükleyiciler iki kez çalışır: soğuk (anlık görüntü önbelleği boş) ve önbellekten. Türetilmiş veriler
+# veri_yukleme'deki sırayla kurulur. Sayfa aşamaları sayfaların çağırdığı sorgulardır.
+def kaynaklari_yukle(olcer, yollar, etiket):
+    veriler = {}
+    ozetler = []
+    for anahtar, (_, yukleyici, _) in KAYNAKLAR.items():
+        if anahtar not in yollar:
+            continue
+        ayarlar = {'ilerleme': ozetler.append} if anahtar in veri_yukleme.AKISLI_KAYNAKLAR else {}
+        veriler[anahtar] = olcer.olc(f"yükleme: {anahtar} ({etiket})", yukleyici, yollar[anahtar], **ayarlar)
+    veriler['satis_ozeti'] = ozetler[-1] if ozetler else None
+    return veriler
+
+def turetilmis_verileri_kur(olcer, veriler, yollar):
+    kaynaklar = {anahtar: (yol,) + KAYNAKLAR[anahtar][1:] for anahtar, yol in yollar.items()}
+    for anahtar, (kaynak, donusturucu) in turetilmis_verileri_olustur(kaynaklar).items():
+        bagimliliklar = kaynak if isinstance(kaynak, tuple) else (kaynak,)
+        veriler[anahtar] = olcer.olc(f"türetilmiş: {anahtar}", donusturucu, *(veriler.get(b) for b in bagimliliklar))
+
+def sayfa_hesaplamalari(olcer, veriler):
+    satis_df = veriler['satis']
+    temsilci = str(satis_df['ST'].iloc[0])
+    ozet, kup, indeks = veriler['satis_ozeti'], veriler['yaslandirma_kupu'], veriler['gecikme_indeksi']
+    olcer.olc("Genel Bakış: özet göstergeleri", lambda: (ozet.aralik(0, 35), [ozet.ustu(gun) for gun in (35, 45, 60)], ozet.temsilci_bakiyeleri()))
+    olcer.olc("Yaşlandırma: temsilci kovaları", lambda: [kup.ustu(gun, temsilci=temsilci) for gun in (0, 35, 45, 60)])
+    olcer.olc("Yaşlandırma: gecikme sorgusu", indeks.sorgu, temsilci, 90)
+    olcer.olc("tablo penceresi: arama + sıralama", lambda: tablo_penceresi(satis_df, arama='0001', sirala='Kalan Tutar Total', artan=False)[0])
+    stok_modeli = veriler['stok_modeli']
+    olcer.olc("Stok: tablolar ve özet", lambda: [(stok_modeli.tablo(depo), stok_modeli.tablo(depo, sadece_kritik=True), stok_modeli.ozet(depo)) for depo in [None] + stok_modeli.depolar])
+    ilce_metrikleri = veriler['ilce_metrikleri']
+    if ilce_metrikleri is not None and os.path.exists(GEOJSON_DOSYASI):
+        with open(GEOJSON_DOSYASI, encoding='utf-8') as f:
+            geojson = json.load(f)
+        olcer.olc("Müşteri Analizi: harita katmanı", ilce_metrikleri.katmana_uygula, geojson, [(1.0, 1.0, 0.8), (0.5, 0.0, 0.15)])
+    if ilce_metrikleri is not None:
+        olcer.olc("Müşteri Analizi: en değerli müşteriler", ilce_metrikleri.en_degerli_musteriler, 10)
+    analitik = veriler['musteri_analitigi']
+    olcer.olc("Müşteri Analizi: RFM sorguları", lambda: (analitik.segment_ozeti(), analitik.en_sadiklar(10), analitik.uyuyan_musteriler(90)))
+    motor = veriler['senaryo_motoru']
+    if motor is not None:
+        olcer.olc("Senaryo Analizi: duyarlılık ızgarası", motor.izgara, *(eksen / 100 for eksen in SENARYO_IZGARASI))
+        olcer.olc("Senaryo Analizi: temsilci kırılımı", motor.temsilci_kirilimi, tahsilat=0.5, iskonto=0.05, maliyet=0.7)
+    olcer.olc("Senaryo Analizi: tahsilat tahmini", veriler['tahsilat_simulasyonu'].tahmin, TAHSILAT_OLASILIKLARI, 0.25, 5000)
+
+def kiyasla(satir, bellek=True, tohum=TOHUM):
+    # Geçici bir çalışma klasöründe çalışır: anlık görüntü önbelleği ve defter geçmişi gibi
+    # yan ürünler gerçek veri klasörüne yazılmaz.
+    onceki_klasor = os.getcwd()
+    geojson = os.path.abspath(GEOJSON_DOSYASI)
+    klasor = tempfile.mkdtemp(prefix='crm_kiyas_')
+    try:
+        os.chdir(klasor)
+        if os.path.exists(geojson):
+            shutil.copy(geojson, GEOJSON_DOSYASI)
+        print(f"{satir:,} satır".replace(',', '.'), flush=True)
+        olcer = Olcer(bellek)
+        yollar = olcer.olc("üretim: sentetik veri", veri_uret, klasor, satir, tohum)
+        kaynaklari_yukle(olcer, yollar, 'soğuk')
+        veriler = kaynaklari_yukle(olcer, yollar, 'önbellekten')
+        turetilmis_verileri_kur(olcer, veriler, yollar)
+        sayfa_hesaplamalari(olcer, veriler)
+        return {
+            'satir': satir,
+            'dosya_boyutlari_mb': {anahtar: round(os.path.getsize(yol) / (1024 * 1024), 3) for anahtar, yol in yollar.items()},
+            'asamalar': olcer.asamalar,
+        }
+    finally:
+        os.chdir(onceki_klasor)
+        shutil.rmtree(klasor, ignore_errors=True)
+
+def _surum():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ortam_bilgisi():
+    return {
+        'surum': _surum(),
+        'zaman': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cekirdek': os.cpu_count(),
+    }
+
+# --- Doğrulama ---
+# Depoda ayrı bir test takımı yoktur; hızlandırılmış yollar --dogrula ile aynı sentetik veride
+# sayfaların eskiden kullandığı pandas ifadeleriyle (filtre + sum, satır satır isim ve tutar
+# biçimlendirme) karşılaştırılır. Veriye kova sınırlarındaki günler (0, 35, 36, 45, 46, 60, 61)
+# ayrıca eklenir. Uyuşmayan her kontrol yazdırılır ve komut 1 ile çıkar.
+KOVA_ESIKLERI = (0, 35, 45, 60)
+SINIR_GUNLERI = [-5, 0, 1, 35, 36, 45, 46, 60, 61, 600]
+
+def _eski_isim_normallestir(name):
+    # isimler.isimleri_normallestir'den önceki, satır satır çalışan gerçekleme.
+    if pd.isna(name):
+        return ""
+    name = str(name).strip().lower()
+    name = name.replace('i̇', 'i').replace('ı', 'i').replace('ş', 's').replace('ç', 'c').replace('ğ', 'g').replace('ö', 'o').replace('ü', 'u')
+    return name.replace('kalyuncu', 'kalyoncu')
+
+def _eski_tl(deger):
+    # f"{deger:,.2f} TL" ayırıcıları tr-TR düzenine çevrilmiş hali; sıfıra yuvarlanan eksiler işaretsizdir.
+    metin = f"{deger:,.2f}".translate(str.maketrans(',.', '.,'))
+    return ('0,00' if metin == '-0,00' else metin) + " TL"
+
+def _satirlar(df):
+    return sorted(zip(df['Müşteri'].astype(str), df['Gün'].astype(float), df['Kalan Tutar Total']))
+
+def _defterler_ayni(kurulan, beklenen):
+    # Kuruş altı bakiye farkları değişiklik sayılmadığından tutarlar toleransla karşılaştırılır.
+    return (kurulan is not None and len(kurulan) == len(beklenen)
+            and kurulan[['ST', 'Müşteri', 'Kova']].equals(beklenen[['ST', 'Müşteri', 'Kova']])
+            and np.allclose(kurulan[['Bakiye', 'Gecikmiş']], beklenen[['Bakiye', 'Gecikmiş']], rtol=0, atol=2 * BAKIYE_TOLERANSI))
+
+def _hucreler(seri):
+    # Tip ve repr birlikte: 5 ile 5.0, NaN ile None, '00123' ile 123 ayrı sayılır.
+    return [(type(v), repr(v)) for v in seri]
+
+def dogrula(satir, tohum=TOHUM):
+    # Uyuşmayan kontrollerin adlarını ve toplam kontrol sayısını döner.
+    uyusmayanlar = []
+    sayac = 0
+    def kontrol(ad, kosul):
+        nonlocal sayac
+        sayac += 1
+        if not kosul:
+            uyusmayanlar.append(ad)
+    def yakin(a, b):
+        return bool(np.isclose(a, b, rtol=1e-9, atol=1e-6))
+
+    onceki_klasor = os.getcwd()
+    klasor = tempfile.mkdtemp(prefix='crm_dogrula_')
+    try:
+        os.chdir(klasor)
+        yollar = veri_uret(klasor, satir, tohum)
+        # Satış defteri: akışlı okuma (küçük parçalarla) ve anlık görüntüden okuma aynı tabloyu verir.
+        soguk = satis_veri_yukle(yollar['satis'], parca_boyutu=max(satir // 7, 1000))
+        onbellekten = satis_veri_yukle(yollar['satis'])
+        kontrol("anlık görüntü: satış defteri", soguk.equals(onbellekten))
+        sinirlar = pd.DataFrame({
+            'ST': 'Sınır Temsilcisi', 'Müşteri': [f"SINIR {gun}" for gun in SINIR_GUNLERI],
+            'Gün': SINIR_GUNLERI, 'Kalan Tutar Total': 100.0 + np.arange(len(SINIR_GUNLERI)),
+        })
+        df = satis_parcalarini_birlestir([soguk, satis_parcasini_normallestir(sinirlar)])
+        temsilciler = list(df['ST'].cat.categories)
+
+        # Yaşlandırma kovaları: Gün > eşik ve Kalan Tutar Total > 0.
+        gecikmis = df[(df['Gün'] > 0) & (df['Kalan Tutar Total'] > 0)]
+        kup = YaslandirmaKupu(df)
+        ozet = SatisOzeti()
+        for baslangic in range(0, len(df), 5000):
+            ozet.ekle(df.iloc[baslangic:baslangic + 5000])
+        kontrol("SatisOzeti.toplam_bakiye", yakin(ozet.toplam_bakiye, df['Kalan Tutar Total'].sum()))
+        pozitif = df[df['Kalan Tutar Total'] > 0]
+        beklenen = pozitif.groupby(pozitif['ST'].astype(str))['Kalan Tutar Total'].sum().sort_index()
+        kontrol("SatisOzeti.temsilci_bakiyeleri", np.allclose(ozet.temsilci_bakiyeleri().reindex(beklenen.index).to_numpy(), beklenen.to_numpy()))
+        kontrol("SatisOzeti.aralik(0, 35)", yakin(ozet.aralik(0, 35), gecikmis.loc[gecikmis['Gün'] <= 35, 'Kalan Tutar Total'].sum()))
+        for esik in KOVA_ESIKLERI:
+            ustu = gecikmis[gecikmis['Gün'] > esik]
+            kontrol(f"SatisOzeti.ustu({esik})", yakin(ozet.ustu(esik), ustu['Kalan Tutar Total'].sum()))
+            kontrol(f"YaslandirmaKupu.ustu({esik})", yakin(kup.ustu(esik), ustu['Kalan Tutar Total'].sum()))
+            temsilci_toplamlari = ustu.groupby('ST', observed=True)['Kalan Tutar Total'].sum()
+            for temsilci in temsilciler:
+                kontrol(f"YaslandirmaKupu.ustu({esik}, temsilci={temsilci})", yakin(kup.ustu(esik, temsilci=temsilci), temsilci_toplamlari.get(temsilci, 0.0)))
+
+        # Gecikme indeksi: Gün >= eşik satırları, toplamı ve Gün'e göre azalan sıra.
+        indeks = GecikmeIndeksi(df)
+        for temsilci in temsilciler:
+            temsilci_gecikmis = gecikmis[gecikmis['ST'] == temsilci]
+            for esik in (1, 35, 36, 46, 61, 600):
+                toplam, dilim = indeks.sorgu(temsilci, esik)
+                beklenen = temsilci_gecikmis[temsilci_gecikmis['Gün'] >= esik]
+                kontrol(f"GecikmeIndeksi.sorgu({temsilci}, {esik})", yakin(toplam, beklenen['Kalan Tutar Total'].sum())
+                        and _satirlar(dilim) == _satirlar(beklenen) and dilim['Gün'].is_monotonic_decreasing)
+            _, dilim = indeks.sorgu(temsilci, 1)
+            kontrol(f"GecikmeIndeksi dilimi sıralı ({temsilci})", tablo_penceresi(dilim, sirala='Gün', artan=False, uzunluk=len(dilim))[0].equals(dilim))
+
+        # Toplu raporlar: genel toplam rapor.py'deki gibi işaretli toplamdır; temsilci başına
+        # 'Toplam Alacak' ise yalnızca pozitif müşteri bakiyelerinin toplamıdır.
+        _, rapor_ozeti = toplu_rapor_uret(yollar['satis'], os.path.join(klasor, 'raporlar'), isci_sayisi=1)
+        musteri_bakiyeleri = soguk.groupby(['ST', 'Müşteri'], observed=True)['Kalan Tutar Total'].sum()
+        kontrol("toplu rapor: genel toplam alacak", yakin(rapor_ozeti['Genel Toplam Alacak (TL)'].sum(), soguk['Kalan Tutar Total'].sum()))
+        kontrol("toplu rapor: pozitif bakiye toplamı", yakin(rapor_ozeti['Toplam Alacak (TL)'].sum(), musteri_bakiyeleri[musteri_bakiyeleri > 0].sum()))
+
+        # Defter geçmişi çalışma dizinine değil, izleyiciye verilen satış defterinin klasörüne yazılır.
+        veri_klasoru = os.path.join(klasor, 'veri')
+        _, defter_kaydedici = turetilmis_verileri_olustur({'satis': (os.path.join(veri_klasoru, 'rapor.xlsx'),) + KAYNAKLAR['satis'][1:]})['defter_degisiklikleri']
+        defter_kaydedici(soguk)
+        kontrol("defter geçmişi: veri klasörüne yazılır", os.path.isdir(os.path.join(veri_klasoru, DEFTER_KLASORU)) and not os.path.exists(DEFTER_KLASORU))
+
+        # Aynı saniyede eklenen görüntüler birbirinin dosyasını ezmez; her görüntü farklardan geri kurulur.
+        gecmis = DefterGecmisi(os.path.join(klasor, 'ayni_saniye'), anahtar_araligi=3)
+        zaman = datetime(2025, 8, 25, 9, 30, 12)
+        defterler = [soguk, soguk.assign(**{'Kalan Tutar Total': soguk['Kalan Tutar Total'] + 10.0}), soguk.iloc[len(soguk) // 3:], soguk.iloc[:len(soguk) // 2]]
+        for defter in defterler:
+            gecmis.ekle(defter, zaman=zaman)
+        kontrol("defter geçmişi: aynı saniyede eklenen görüntüler", len(gecmis.katalog()) == len(defterler) and all(
+            _defterler_ayni(gecmis.defter(sira), defteri_indirge(defter)) for sira, defter in enumerate(defterler)))
+
+        # Satış geçmişi: adı dönemsiz ya da sütunu eksik bir kitap atlanır, yanındakiler okunur.
+        gecmis_klasoru = os.path.join(klasor, 'gecmis')
+        os.makedirs(gecmis_klasoru)
+        _xlsx_yaz(os.path.join(gecmis_klasoru, '2025_satış_toplam.xlsx'), ['Müşteri Kodu', 'Müşteri Ünvanı', 'Brüt Fiyat'], [['1', '2'], ['A', 'B'], [10.0, 20.0]])
+        _xlsx_yaz(os.path.join(gecmis_klasoru, 'eski_satış_dokum.xlsx'), ['Müşteri Kodu', 'Müşteri Ünvanı', 'Brüt Fiyat'], [['1'], ['A'], [5.0]])
+        _xlsx_yaz(os.path.join(gecmis_klasoru, '2024_satış_toplam.xlsx'), ['Müşteri Kodu', 'Tutar'], [['1'], [5.0]])
+        kayitlar = satis_gecmisi_yukle(gecmis_klasoru)
+        kontrol("satış geçmişi: hatalı kitaplar atlanır", kayitlar is not None and set(kayitlar['Kaynak'].astype(str)) == {'2025_satış_toplam.xlsx'}
+                and kayitlar['Brüt Fiyat'].sum() == 30.0 and len(kayitlar.attrs.get('sorunlar', [])) == 2)
+
+        # Karışık sütunlar (metin/sayı/tarih/bool): anlık görüntü ve süreçler arası aktarım hücreleri
+        # tipleriyle birlikte olduğu gibi geri verir.
+        karisik = pd.DataFrame({
+            0: ['Satış Temsilcisi', '00123', 5, 5.5, None, 'x', 12345678901234, '1e3', -7, 'TOPLAM'],
+            1: [None, 'HEDEF', 1.25, 2, 3, 4, 5, 6, 7, 8.5],
+            2: np.arange(10, dtype=float),
+            3: [datetime(2025, 8, 25), 'Tarih', True, False, date(2025, 1, 31), np.nan, 'x', pd.Timestamp('2025-08-25 09:30:12'), Decimal('12.50'), None],
+        })
+        with open('karisik.bin', 'wb') as f:
+            f.write(b'karisik')
+        onbellekli_oku('karisik.bin', lambda yol: karisik.copy(), header=None)
+        geri = onbellekli_oku('karisik.bin', lambda yol: None, header=None)
+        aktarilan = arrow_baytlarindan_oku(arrow_baytlarina_cevir(karisik))
+        for ad, sonuc in (("anlık görüntü", geri), ("Arrow IPC", aktarilan)):
+            kontrol(f"{ad}: karışık sütunlar", sonuc is not None and list(sonuc.columns) == list(karisik.columns)
+                    and all(_hucreler(sonuc[sutun]) == _hucreler(karisik[sutun]) for sutun in karisik.columns))
+
+        # Aktivite günlüğü: aynı klasöre eşzamanlı yazan süreçlerin satırları bölünmeden ve eksiksiz
+        # kaydedilir; küçük parça sınırı sayesinde parça değiştirme de yarışır.
+        log_klasoru = os.path.join(klasor, 'loglar')
+        yazici = ("import sys\n"
+                  "from aktivite_log import AktiviteGunlugu\n"
+                  "gunluk = AktiviteGunlugu(sys.argv[1], maksimum_parca_boyutu=4096, yazma_araligi=0.001)\n"
+                  "for i in range(500):\n"
+                  "    gunluk.kaydet(f'kullanici{sys.argv[2]}', f'Sayfa ziyareti: {i:04d}', sayfa_adi='Stok')\n"
+                  "    if i % 7 == 0:\n"
+                  "        gunluk.bosalt()\n"
+                  "gunluk.kapat()\n")
+        ortam = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        surecler = [subprocess.Popen([sys.executable, '-c', yazici, log_klasoru, str(no)], env=ortam) for no in range(4)]
+        kontrol("aktivite günlüğü: yazıcı süreçler", all(surec.wait() == 0 for surec in surecler))
+        loglar = AktiviteGunlugu(log_klasoru).tum_kayitlar()
+        kontrol("aktivite günlüğü: eşzamanlı süreçler", len(loglar) == 4 * 500
+                and loglar.groupby('Kullanıcı Adı')['Aktivite'].apply(sorted).to_dict() == {f'kullanici{no}': [f'Sayfa ziyareti: {i:04d}' for i in range(500)] for no in range(4)})
+
+        # Log sorgu motoru: sırasız kayıt yüzünden baştan kurulurken yarım yazılmış son satır okunmuş
+        # sayılmaz; satır tamamlanınca bir sonraki yenilemede eklenir.
+        sirasiz_klasor = os.path.join(klasor, 'loglar_sirasiz')
+        os.makedirs(sirasiz_klasor)
+        parca = os.path.join(sirasiz_klasor, 'aktivite-20250825-000.csv')
+        with open(parca, 'w', encoding='utf-8', newline='') as f:
+            f.write("2025-08-25 09:00:05,a,1,Stok,Sayfa ziyareti: Stok\n"
+                    "2025-08-25 09:00:01,b,1,Stok,Giriş Yaptı\n"
+                    "2025-08-25 09:00:09,c,1,Stok,Sayfa ziy")
+        motor = LogSorguMotoru(AktiviteGunlugu(sirasiz_klasor))
+        motor.yenile()
+        with open(parca, 'a', encoding='utf-8', newline='') as f:
+            f.write("areti: Stok\n")
+        motor.yenile()
+        sonuc, toplam = motor.sorgula()
+        kontrol("log sorgu motoru: baştan kurulumda yarım satır", toplam == 3
+                and sonuc['Aktivite'].tolist() == ['Sayfa ziyareti: Stok', 'Sayfa ziyareti: Stok', 'Giriş Yaptı'])
+
+        # İsim normalleştirme ve TL biçimlendirme: satır satır eski gerçeklemelerle aynı metin.
+        isimler = list(df['ST'].cat.categories) + list(df['Müşteri'].cat.categories[:2000]) + [' İSMAİL KALYUNCU ', 'ŞÜKRÜ ÇAĞLAR ÖZGÜR', 'ığüşöç', None]
+        kontrol("isimleri_normallestir", isimleri_normallestir(pd.Series(isimler, dtype=object)).astype(str).tolist() == [_eski_isim_normallestir(isim) for isim in isimler])
+        tutarlar = np.concatenate((df['Kalan Tutar Total'].to_numpy()[:20000], [0.0, -0.0, 0.001, -0.001, 999.99, 1000.0, -1234567.89, 1e12]))
+        kontrol("tl_dizisi", tl_dizisi(tutarlar).tolist() == [_eski_tl(tutar) for tutar in tutarlar])
+        # int64 sınırına yakın ve ötesindeki tutarlar da aynı metni verir; sonsuzlar NaN gibi boş kalır.
+        buyukler = np.array([2.0 ** 53 / 100, -2.0 ** 53 / 100, 123456789012345.67, 9.5e16, -1e17, 2.0 ** 63, 1e300])
+        kontrol("tl_dizisi: büyük tutarlar", tl_dizisi(buyukler).tolist() == [_eski_tl(tutar) for tutar in buyukler]
+                and tl_dizisi(buyukler, ondalik=0, sonek="").tolist() == [f"{tutar:,.0f}".replace(',', '.') for tutar in buyukler])
+        kontrol("tl_dizisi: sonsuz ve boş", tl_dizisi([np.inf, -np.inf, np.nan, 1.0], bos='-').tolist() == ['-', '-', '-', '1,00 TL'])
+    finally:
+        os.chdir(onceki_klasor)
+        shutil.rmtree(klasor, ignore_errors=True)
+    return uyusmayanlar, sayac
+
+# --- Karşılaştırma ---
+def karsilastir(eski_yolu, yeni_yolu):
+    # Ortak (satır, aşama) çiftleri için süre ve bellek oranları (yeni / eski); 1'den büyük gerilemedir.
+    with open(eski_yolu, encoding='utf-8') as f:
+        eski = json.load(f)
+    with open(yeni_yolu, encoding='utf-8') as f:
+        yeni = json.load(f)
+    def tablo(sonuc):
+        return pd.DataFrame([dict(asama, satir=olcum['satir']) for olcum in sonuc['olcumler'] for asama in olcum['asamalar']]).set_index(['satir', 'asama'])
+    birlesik = tablo(eski).join(tablo(yeni), how='inner', lsuffix='_eski', rsuffix='_yeni', sort=False)
+    birlesik['sure_orani'] = birlesik['sure_sn_yeni'] / birlesik['sure_sn_eski']
+    birlesik['bellek_orani'] = birlesik['tepe_bellek_mb_yeni'] / birlesik['tepe_bellek_mb_eski']
+    return birlesik[['sure_sn_eski', 'sure_sn_yeni', 'sure_orani', 'tepe_bellek_mb_eski', 'tepe_bellek_mb_yeni', 'bellek_orani']]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CRM panosu için sentetik veriyle performans kıyaslaması.")
+    parser.add_argument('--satir', type=int, nargs='+', default=list(VARSAYILAN_SATIRLAR), help="Satış defteri satır sayıları (ör. 10000 100000 1000000).")
+    parser.add_argument('--cikti', default=None, help="Sonuçların yazılacağı JSON dosyası (varsayılan: kiyas-<zaman>.json).")
+    parser.add_argument('--tohum', type=int, default=TOHUM)
+    parser.add_argument('--bellek-olcumu-yok', action='store_true', help="tracemalloc'u kapatır; yalnızca süre ölçülür.")
+    parser.add_argument('--karsilastir', nargs=2, metavar=('ESKI', 'YENI'), help="İki sonuç dosyasını karşılaştırır ve çıkar.")
+    parser.add_argument('--dogrula', action='store_true', help="Ölçmek yerine hızlandırılmış hesapları eski pandas hesaplarıyla karşılaştırır.")
+    args = parser.parse_args(argv)
+
+    if args.dogrula:
+        basarili = True
+        for satir in args.satir:
+            uyusmayanlar, sayac = dogrula(satir, args.tohum)
+            for ad in uyusmayanlar:
+                print(f"  UYUŞMUYOR: {ad}")
+            print(f"{satir:,} satır".replace(',', '.') + f": {sayac} kontrol, {len(uyusmayanlar)} uyuşmazlık", flush=True)
+            basarili = basarili and not uyusmayanlar
+        return 0 if basarili else 1
+
+    if args.karsilastir:
+        with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.float_format', '{:.3f}'.format):
+            print(karsilastir(*args.karsilastir).to_string())
+        return 0
+
+    sonuc = ortam_bilgisi()
+    sonuc['tohum'] = args.tohum
+    sonuc['olcumler'] = [kiyasla(satir, bellek=not args.bellek_olcumu_yok, tohum=args.tohum) for satir in args.satir]
+    cikti = args.cikti or f"kiyas-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(cikti, 'w', encoding='utf-8') as f:
+        json.dump(sonuc, f, ensure_ascii=False, indent=2)
+    print(f"Sonuçlar '{cikti}' dosyasına yazıldı.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
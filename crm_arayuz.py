@@ -1,16 +1,23 @@
 import branca.colormap as cm
 import streamlit as st
+import numpy as np
 import pandas as pd
 from streamlit_option_menu import option_menu
-from datetime import datetime, timedelta
-import io
-import csv
+from datetime import timedelta
+import functools
 import plotly.graph_objects as go
 import plotly.express as px
 import requests
 import json
 import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import olcum
+from aktivite_log import AktiviteGunlugu, LogSorguMotoru
+from analiz import RFM_SEGMENTLERI, TAHSILAT_KOVALARI, TAHSILAT_OLASILIKLARI, tablo_penceresi
+from disa_aktarim import BICIMLER, disa_aktar
+from para_bicimi import PLOTLY_AYIRICILARI, tl
+from veri_yukleme import KAYNAKLAR, VeriIzleyici
 
 # --- Sayfa Ayarları ---
 st.set_page_config(page_title="Öz lider CRM", page_icon="👑", layout="wide")
@@ -32,150 +39,106 @@ USER_CREDENTIALS = {
     "Fatih Bakıcı": "0134"
 }
 
-# --- İsimleri Normalleştirme Fonksiyonu ---
-def normalize_turkish_names(name):
-    if pd.isna(name):
-        return ""
-    name = str(name).strip().lower()
-    name = name.replace('i̇', 'i').replace('ı', 'i').replace('ş', 's').replace('ç', 'c').replace('ğ', 'g').replace('ö', 'o').replace('ü', 'u')
-    name = name.replace('kalyuncu', 'kalyoncu')
-    return name
-
-# --- VERİ YÜKLEME FONKSİYONLARI ---
-@st.cache_data
-def satis_veri_yukle(dosya_yolu):
-    try:
-        df = pd.read_excel(dosya_yolu)
-        df.columns = df.columns.str.strip()
-        df['Gün'] = pd.to_numeric(df['Gün'], errors='coerce')
-        df['ST'] = df['ST'].astype(str)
-        df['Müşteri'] = df['Müşteri'].astype(str)
-        df = df.dropna(subset=['ST'])
-        return df
-    except Exception as e:
-        st.error(f"Satış verisi ('{dosya_yolu}') okunurken bir hata oluştu: {e}")
-        return None
-
-@st.cache_data
-def stok_veri_yukle(dosya_yolu):
-    try:
-        df = pd.read_excel(dosya_yolu)
-        df.columns = df.columns.str.strip()
-        return df
-    except Exception as e:
-        st.error(f"Stok verisi ('{dosya_yolu}') okunurken bir hata oluştu: {e}")
-        return None
-
-@st.cache_data
-def satis_hedef_veri_yukle(dosya_yolu):
-    try:
-        df = pd.read_excel(dosya_yolu, header=None)
-        return df
-    except Exception as e:
-        st.error(f"Satış/Hedef verisi ('{dosya_yolu}') okunurken bir hata oluştu: {e}")
-        return None
+# --- Dışa Aktarım Düğmeleri ---
+# Dosya sayfa her çizildiğinde değil, yalnızca düğmeye basıldığında (Streamlit'in ayrı bir iş
+# parçacığında) üretilir. Sonuç (filtre, veri sürümü, biçim) anahtarıyla önbelleğe alınır; aynı
+# dilimi indiren ikinci kullanıcı dosyayı yeniden üretmez. Tablo hash'lenmez (_df).
+@olcum.cagri_sayaci('disa_aktarim')
+@st.cache_data(max_entries=16, show_spinner=False)
+@olcum.hesaplama_sayaci('disa_aktarim')
+def disa_aktarim_dosyasi(_df, filtre, veri_surumu, bicim):
+    return disa_aktar(_df, bicim)
+
+def indirme_dugmeleri(df, dosya_adi, filtre, veri_surumu):
+    # filtre, df'yi üreten seçimleri tanımlayan bir demettir; ilk elemanı düğme anahtarlarında kullanılır.
+    sutunlar = st.columns(len(BICIMLER))
+    for sutun, (bicim, (etiket, mime)) in zip(sutunlar, BICIMLER.items()):
+        sutun.download_button(
+            label=f"📥 {etiket}", data=functools.partial(disa_aktarim_dosyasi, df, filtre, veri_surumu, bicim),
+            file_name=f"{dosya_adi}.{bicim}", mime=mime, key=f"indir_{filtre[0]}_{bicim}", on_click='ignore', use_container_width=True,
+        )
 
-@st.cache_data
-def solen_borc_excel_oku(dosya_yolu):
-    try:
-        df = pd.read_excel(dosya_yolu, header=None)
-        deger = df.iloc[:1, :1].values.flatten()[0]
-        if isinstance(deger, (int, float)):
-            return float(deger)
-        else:
-            rakam_str = str(deger).strip().replace('.', '').replace(',', '.')
-            return float(rakam_str)
-    except Exception:
-        return 0.0
+@st.cache_resource
+def aktivite_gunlugu():
+    # Süreç başına tek yazıcı: tüm oturumların kayıtları aynı kuyruktan sırayla yazılır.
+    return AktiviteGunlugu()
 
-@st.cache_data
-def adana_ilce_veri_yukle(dosya_yolu):
-    try:
-        df = pd.read_excel(dosya_yolu)
-        df.columns = df.columns.str.strip()
-        if 'İlçe' in df.columns:
-            df['İlçe'] = df['İlçe'].str.upper()
-        return df
-    except FileNotFoundError:
-        return None
-    except Exception as e:
-        st.error(f"Adana ilçe verisi ('{dosya_yolu}') okunurken bir hata oluştu: {e}")
-        return pd.DataFrame()
+@st.cache_resource
+def log_sorgu_motoru():
+    return LogSorguMotoru(aktivite_gunlugu())
 
-@st.cache_data
-def parse_satis_hedef_excel_robust(df_raw):
-    if df_raw is None:
-        return pd.DataFrame()
+def istemci_ip_adresi():
+    # Ters vekil (proxy) arkasında gerçek adres X-Forwarded-For başlığının ilk elemanıdır.
     try:
-        df_raw_copy = df_raw.copy()
-        header_indices = df_raw_copy[df_raw_copy.iloc[:, 0].astype(str).str.strip() == 'Satış Temsilcisi'].index.tolist()
-        all_tables = []
-        for i in range(len(header_indices)):
-            start_index = header_indices[i]
-            end_index = header_indices[i+1] if i + 1 < len(header_indices) else None
-            table = df_raw_copy.iloc[start_index:end_index].dropna(axis=0, how='all').dropna(axis=1, how='all').reset_index(drop=True)
-            if table.empty or len(table) < 2: continue
-            new_header = table.iloc[0]
-            table = table[1:].copy()
-            table.columns = new_header
-            table.columns = table.columns.str.strip()
-            for col in ['HEDEF', 'SATIŞ', '%', 'KALAN']:
-                if col in table.columns:
-                    table[col] = pd.to_numeric(table[col], errors='coerce').fillna(0)
-            table_title = df_raw_copy.iloc[start_index - 1, 0] if start_index > 0 else f"Grup {i+1}"
-            table['Grup'] = table_title
-            table['ST_normal'] = table['Satış Temsilcisi'].apply(normalize_turkish_names)
-            all_tables.append(table)
-        if not all_tables:
-            return pd.DataFrame()
-        final_df = pd.concat(all_tables, ignore_index=True)
-        return final_df
+        yonlendirilen = st.context.headers.get('X-Forwarded-For')
+        if yonlendirilen:
+            return yonlendirilen.split(',')[0].strip()
+        return str(getattr(st.context, 'ip_address', None) or "N/A")
     except Exception:
-        return pd.DataFrame()
-
-def to_excel(df):
-    output = io.BytesIO()
-    writer = pd.ExcelWriter(output, engine='xlsxwriter')
-    df.to_excel(writer, index=False, sheet_name='Rapor')
-    writer.close()
-    processed_data = output.getvalue()
-    return processed_data
+        return "N/A"
 
 def log_user_activity(user, activity, page_name="N/A"):
-    log_file = 'loglar.csv'
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    ip_address = "N/A"
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if f.tell() == 0:
-            writer.writerow(['Zaman Damgası', 'Kullanıcı Adı', 'IP Adresi', 'Sayfa Adı', 'Aktivite'])
-        writer.writerow([timestamp, user, ip_address, page_name, activity])
+    aktivite_gunlugu().kaydet(user, activity, sayfa_adi=page_name, ip_adresi=istemci_ip_adresi())
+
+# --- Sayfalı Tablo ---
+# Arama, sıralama ve sayfalama sunucuda yapılır; tarayıcıya yalnızca görünen sayfa gönderilir.
+# Tutarlar sayı olarak kalır ve column_config ile istemcide biçimlendirilir. Fragment olduğu için
+# tablo kontrolleri sayfanın geri kalanını yeniden çalıştırmaz. sirali=True ise df zaten varsayılan
+# sıralamadadır (ör. GecikmeIndeksi dilimi); kullanıcı sıralamayı değiştirmedikçe yeniden sıralanmaz.
+@st.fragment
+def sayfali_tablo(df, anahtar, column_config=None, column_order=None, siralama=None, sayfa_boyutlari=(25, 50, 100, 250), sirali=False):
+    sutunlar = list(column_order or df.columns)
+    etiketler = {sutun: (column_config or {}).get(sutun) for sutun in sutunlar}
+    etiketler = {sutun: ayar if isinstance(ayar, str) else (ayar or {}).get('label') or sutun for sutun, ayar in etiketler.items()}
+    varsayilan_sutun, varsayilan_artan = siralama or (sutunlar[0], True)
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    arama = col1.text_input("Ara", key=f"{anahtar}_arama", placeholder="Tabloda ara...")
+    sirala = col2.selectbox("Sırala", sutunlar, index=sutunlar.index(varsayilan_sutun), format_func=etiketler.get, key=f"{anahtar}_sirala")
+    artan = col3.selectbox("Yön", [True, False], index=0 if varsayilan_artan else 1, format_func=lambda deger: "Artan" if deger else "Azalan", key=f"{anahtar}_yon")
+    sayfa_boyutu = col4.selectbox("Satır", sayfa_boyutlari, index=min(1, len(sayfa_boyutlari) - 1), key=f"{anahtar}_boyut")
+    if sirali and (sirala, artan) == (varsayilan_sutun, varsayilan_artan):
+        sirala = None
+    sayfa_anahtari = f"{anahtar}_sayfa"
+    sayfa_no = st.session_state.get(sayfa_anahtari, 1)
+    with olcum.asama(f"tablo penceresi: {anahtar}") as olcum_kaydi:
+        pencere, toplam = tablo_penceresi(df, arama=arama, sirala=sirala, artan=artan, baslangic=(sayfa_no - 1) * sayfa_boyutu, uzunluk=sayfa_boyutu)
+        olcum_kaydi.satir_ekle(len(df))
+    toplam_sayfa = max((toplam + sayfa_boyutu - 1) // sayfa_boyutu, 1)
+    if sayfa_no > toplam_sayfa:
+        # Arama ya da sayfa boyutu değişince mevcut sayfa aralık dışında kalabilir.
+        sayfa_no = st.session_state[sayfa_anahtari] = toplam_sayfa
+        pencere, toplam = tablo_penceresi(df, arama=arama, sirala=sirala, artan=artan, baslangic=(sayfa_no - 1) * sayfa_boyutu, uzunluk=sayfa_boyutu)
+    st.dataframe(pencere, column_order=sutunlar, column_config=column_config, use_container_width=True, hide_index=True)
+    col5, col6 = st.columns([1, 3])
+    col5.number_input("Sayfa", min_value=1, max_value=toplam_sayfa, step=1, key=sayfa_anahtari)
+    col6.caption(f"Toplam {toplam} kayıt · Sayfa {sayfa_no} / {toplam_sayfa}")
 
 # =======================================================================================
 # --- SAYFA FONKSİYONLARI ---
 # =======================================================================================
 
-def page_genel_bakis(satis_df, stok_df, solen_borcu_degeri):
+def page_genel_bakis(satis_ozeti, stok_df, solen_borcu_degeri):
+    # Göstergeler satış defteri okunurken biriken özetten gelir; büyük bir dosya yüklenirken
+    # sayfa okunan kısma göre çizilir ve her yeni görüntüde güncellenir.
     st.title("📈 Genel Bakış")
-    if satis_df is not None and stok_df is not None:
-        toplam_bakiye = satis_df['Kalan Tutar Total'].sum()
+    if satis_ozeti is not None and stok_df is not None:
+        toplam_bakiye = satis_ozeti.toplam_bakiye
         toplam_stok_degeri = stok_df['Brüt Tutar'].sum()
         col1, col2, col3 = st.columns(3)
-        with col1: st.metric("Toplam Bakiye (TL)", f"{toplam_bakiye:,.2f}")
-        with col2: st.metric("Toplam Stok Değeri (Brüt)", f"{toplam_stok_degeri:,.2f} TL")
-        with col3: st.metric("Şölen'e Olan Borç", f"{solen_borcu_degeri:,.2f} TL")
+        with col1: st.metric("Toplam Bakiye (TL)", tl(toplam_bakiye, sonek=""))
+        with col2: st.metric("Toplam Stok Değeri (Brüt)", tl(toplam_stok_degeri))
+        with col3: st.metric("Şölen'e Olan Borç", tl(solen_borcu_degeri))
         st.markdown("---")
 
         st.subheader("Vadesi Geçmiş Alacak Özeti (Tüm Temsilciler)")
-        gecikmis_df_genel = satis_df[(satis_df['Gün'] > 0) & (satis_df['Kalan Tutar Total'] > 0)]
-        gun_1_35_genel = gecikmis_df_genel[(gecikmis_df_genel['Gün'] > 0) & (gecikmis_df_genel['Gün'] <= 35)]['Kalan Tutar Total'].sum()
-        ustu_35_gun_genel = gecikmis_df_genel[gecikmis_df_genel['Gün'] > 35]['Kalan Tutar Total'].sum()
-        ustu_45_gun_genel = gecikmis_df_genel[gecikmis_df_genel['Gün'] > 45]['Kalan Tutar Total'].sum()
-        ustu_60_gun_genel = gecikmis_df_genel[gecikmis_df_genel['Gün'] > 60]['Kalan Tutar Total'].sum()
-        gun_1_35_str = f"{gun_1_35_genel:,.2f} TL"
-        ustu_35_gun_str = f"{ustu_35_gun_genel:,.2f} TL"
-        ustu_45_gun_str = f"{ustu_45_gun_genel:,.2f} TL"
-        ustu_60_gun_str = f"{ustu_60_gun_genel:,.2f} TL"
+        gun_1_35_genel = satis_ozeti.aralik(0, 35)
+        ustu_35_gun_genel = satis_ozeti.ustu(35)
+        ustu_45_gun_genel = satis_ozeti.ustu(45)
+        ustu_60_gun_genel = satis_ozeti.ustu(60)
+        gun_1_35_str = tl(gun_1_35_genel)
+        ustu_35_gun_str = tl(ustu_35_gun_genel)
+        ustu_45_gun_str = tl(ustu_45_gun_genel)
+        ustu_60_gun_str = tl(ustu_60_gun_genel)
 
         st.markdown(f"""
         <style>
@@ -206,112 +169,108 @@ def page_genel_bakis(satis_df, stok_df, solen_borcu_degeri):
         st.subheader("Temsilci Bazında Müşteri Bakiyelerinin Dağılımı")
         col1_chart, col2_table = st.columns([2, 1])
         with col1_chart:
-            temsilci_bakiyeleri = satis_df[satis_df['Kalan Tutar Total'] > 0].groupby('ST')['Kalan Tutar Total'].sum().reset_index()
+            temsilci_bakiyeleri = satis_ozeti.temsilci_bakiyeleri().reset_index()
             temsilci_bakiyeleri.columns = ['Satış Temsilcisi', 'Toplam Bakiye']
             temsilci_bakiyeleri['parent'] = "Toplam Bakiye"
             fig = px.sunburst(temsilci_bakiyeleri, path=['parent', 'Satış Temsilcisi'], values='Toplam Bakiye', color='Toplam Bakiye', color_continuous_scale='YlOrRd', title="Temsilcilerin Toplam Bakiyedeki Payları")
-            fig.update_traces(textinfo='label+percent parent', hovertemplate='<b>%{{label}}</b><br>Bakiye: ₺%{{value:,.2f}}<extra></extra>')
-            fig.update_layout(margin=dict(t=50, l=25, r=25, b=25), height=500)
+            fig.update_traces(textinfo='label+percent parent', hovertemplate='<b>%{label}</b><br>Bakiye: %{value:,.2f} TL<extra></extra>')
+            fig.update_layout(margin=dict(t=50, l=25, r=25, b=25), height=500, separators=PLOTLY_AYIRICILARI)
             st.plotly_chart(fig, use_container_width=True)
         with col2_table:
             st.write("#### En Yüksek Bakiyeli Temsilciler")
             top_temsilciler_df = temsilci_bakiyeleri[['Satış Temsilcisi', 'Toplam Bakiye']].sort_values(by='Toplam Bakiye', ascending=False).reset_index(drop=True)
-            display_df = top_temsilciler_df.copy()
-            display_df['Bakiye (TL)'] = display_df['Toplam Bakiye'].apply(lambda x: f"₺{x:,.2f}")
-            st.dataframe(display_df[['Satış Temsilcisi', 'Bakiye (TL)']], use_container_width=True, hide_index=True)
+            st.dataframe(top_temsilciler_df, use_container_width=True, hide_index=True, column_config={'Toplam Bakiye': st.column_config.NumberColumn("Bakiye (TL)", format="localized")})
     else:
         st.warning("Genel Bakış sayfasını görüntülemek için temel veri dosyalarının yüklenmesi gerekmektedir.")
 
-def page_tum_temsilciler(satis_df, satis_hedef_df):
+def page_tum_temsilciler(satis_df, satis_hedef_df, yaslandirma_kupu, temsilci_satislari, satis_surumu):
     st.title("👥 Tüm Temsilciler Detay Raporu")
     if satis_df is None or satis_hedef_df is None or satis_hedef_df.empty:
         st.warning("Bu sayfayı görüntülemek için `rapor.xls` ve `satis-hedef.xlsx` dosyalarının yüklenmesi gerekmektedir.")
         return
+    if temsilci_satislari is None or yaslandirma_kupu is None:
+        st.info("Sayfanın verileri hazırlanıyor; hazır olduğunda sayfa kendiliğinden güncellenecek.")
+        return
     toplam_musteri = satis_df['Müşteri'].nunique()
     toplam_temsilci = satis_df['ST'].nunique()
     col1, col2 = st.columns(2)
     with col1: st.metric("Toplam Müşteri Sayısı", f"{toplam_musteri}")
     with col2: st.metric("Aktif Temsilci Sayısı", f"{toplam_temsilci}")
     st.markdown("---")
-    temsilci_listesi = sorted(satis_df['ST'].unique())
+    temsilci_listesi = list(satis_df['ST'].cat.categories)
     secilen_temsilci = st.selectbox('İncelemek istediğiniz temsilciyi seçin:', temsilci_listesi)
     if secilen_temsilci:
         st.markdown(f"### {secilen_temsilci} Raporu")
-        normalized_name = normalize_turkish_names(secilen_temsilci)
-        personel_hedef_df = satis_hedef_df[satis_hedef_df['ST_normal'] == normalized_name]
-        toplam_satis = personel_hedef_df['SATIŞ'].sum()
+        toplam_satis = temsilci_satislari.get(secilen_temsilci, 0.0)
         temsilci_df = satis_df[satis_df['ST'] == secilen_temsilci]
         toplam_bakiye = temsilci_df['Kalan Tutar Total'].sum()
         musteri_sayisi = temsilci_df['Müşteri'].nunique()
-        gecikmis_df_temsilci = temsilci_df[(temsilci_df['Gün'] > 0) & (temsilci_df['Kalan Tutar Total'] > 0)]
-        ustu_35_gun_temsilci = gecikmis_df_temsilci[gecikmis_df_temsilci['Gün'] > 35]['Kalan Tutar Total'].sum()
-        ustu_60_gun_temsilci = gecikmis_df_temsilci[gecikmis_df_temsilci['Gün'] > 60]['Kalan Tutar Total'].sum()
+        ustu_35_gun_temsilci = yaslandirma_kupu.ustu(35, temsilci=secilen_temsilci)
+        ustu_60_gun_temsilci = yaslandirma_kupu.ustu(60, temsilci=secilen_temsilci)
         kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
-        kpi_col1.metric("Toplam Satış Cirosu", f"{toplam_satis:,.2f} TL")
-        kpi_col2.metric("Toplam Bakiye", f"{toplam_bakiye:,.2f} TL")
-        kpi_col3.metric("35+ Gün Geçikme", f"{ustu_35_gun_temsilci:,.2f} TL")
-        kpi_col4.metric("60+ Gün Geçikme", f"{ustu_60_gun_temsilci:,.2f} TL", delta_color="inverse")
+        kpi_col1.metric("Toplam Satış Cirosu", tl(toplam_satis))
+        kpi_col2.metric("Toplam Bakiye", tl(toplam_bakiye))
+        kpi_col3.metric("35+ Gün Geçikme", tl(ustu_35_gun_temsilci))
+        kpi_col4.metric("60+ Gün Geçikme", tl(ustu_60_gun_temsilci), delta_color="inverse")
         st.markdown("---")
         st.metric("Müşteri Sayısı", f"{musteri_sayisi}")
         st.markdown("---")
         st.subheader("Müşteri Bakiye Dökümü")
         pozitif_bakiye_df = temsilci_df[temsilci_df['Kalan Tutar Total'] > 0]
-        gosterilecek_tablo = pozitif_bakiye_df[['Müşteri', 'Kalan Tutar Total']].rename(columns={'Müşteri': 'Müşteri Adı', 'Kalan Tutar Total': 'Bakiye (TL)'}).sort_values(by='Bakiye (TL)', ascending=False)
-        gosterilecek_tablo['Bakiye (TL)'] = gosterilecek_tablo['Bakiye (TL)'].apply(lambda x: f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-        st.dataframe(gosterilecek_tablo, use_container_width=True, hide_index=True)
-def page_stok(stok_df):
+        sayfali_tablo(
+            pozitif_bakiye_df[['Müşteri', 'Kalan Tutar Total']], 'temsilci_bakiye', siralama=('Kalan Tutar Total', False),
+            column_config={'Müşteri': "Müşteri Adı", 'Kalan Tutar Total': st.column_config.NumberColumn("Bakiye (TL)", format="localized")},
+        )
+        indirme_dugmeleri(pozitif_bakiye_df[['Müşteri', 'Kalan Tutar Total']], f"{secilen_temsilci}_bakiye", ('temsilci_bakiye', secilen_temsilci), satis_surumu)
+def page_stok(stok_df, stok_modeli, stok_surumu):
     st.title("📦 Stok Yönetimi ve Envanter Analizi")
     if stok_df is None:
         st.warning("Stok verileri yüklenemedi.")
         return
-    brut_tutar_sutunu = 'Brüt Tutar'; miktar_sutunu = 'Miktar'; urun_adi_sutunu = 'Ürün'; urun_kodu_sutunu = 'Ürün Kodu'; depo_adi_sutunu = 'Depo Adı'; fiyat_sutunu = 'Fiyat'
-    gerekli_sutunlar = [brut_tutar_sutunu, miktar_sutunu, urun_adi_sutunu]
+    gerekli_sutunlar = ['Brüt Tutar', 'Miktar', 'Ürün', 'Ürün Kodu', 'Depo Adı', 'Fiyat']
     for sutun in gerekli_sutunlar:
         if sutun not in stok_df.columns:
             st.error(f"HATA: Stok Excel dosyasında '{sutun}' adında bir sütun bulunamadı!")
             return
-    aktif_stok_df = stok_df[stok_df[miktar_sutunu] > 0].copy()
+    if stok_modeli is None:
+        st.info("Sayfanın verileri hazırlanıyor; hazır olduğunda sayfa kendiliğinden güncellenecek.")
+        return
+    kritik_seviye_degeri = stok_modeli.kritik_seviye
     st.markdown("Depo seçimi yaparak envanteri filtreleyin veya tüm depolardaki ürünleri toplu olarak görün.")
     col1, col2 = st.columns([1, 1])
     with col1:
-        depo_listesi = ['Tüm Depolar'] + sorted(aktif_stok_df[depo_adi_sutunu].unique())
-        secilen_depo = st.selectbox('Depo Seçin:', depo_listesi)
+        secilen_depo = st.selectbox('Depo Seçin:', ['Tüm Depolar'] + stok_modeli.depolar)
     with col2:
         sadece_kritikleri_goster = st.toggle('Sadece Kritik Seviyedeki Ürünleri Göster', value=False)
-    if secilen_depo == 'Tüm Depolar':
-        goruntulenecek_df = aktif_stok_df.groupby([urun_kodu_sutunu, urun_adi_sutunu, fiyat_sutunu]).agg(Miktar=(miktar_sutunu, 'sum'), Brüt_Tutar=(brut_tutar_sutunu, 'sum')).reset_index()
-        is_aggregated = True
-    else:
-        goruntulenecek_df = aktif_stok_df[aktif_stok_df[depo_adi_sutunu] == secilen_depo]
-        is_aggregated = False
+    depo = None if secilen_depo == 'Tüm Depolar' else secilen_depo
+    ozet = stok_modeli.ozet(depo)
     st.markdown("---")
-    toplam_stok_degeri = goruntulenecek_df['Brüt_Tutar' if is_aggregated else brut_tutar_sutunu].sum()
-    kritik_seviye_degeri = 40
-    kritik_seviyedeki_urunler_df = goruntulenecek_df[goruntulenecek_df[miktar_sutunu] < kritik_seviye_degeri]
     kpi1, kpi2, kpi3 = st.columns(3)
-    kpi1.metric("Toplam Stok Değeri (Brüt)", f"{toplam_stok_degeri:,.2f} TL")
-    kpi2.metric("Stoktaki Ürün Çeşidi", f"{goruntulenecek_df[urun_adi_sutunu].nunique()}")
-    kpi3.metric(f"KRİTİK SEVİYEDEKİ ÜRÜNLER (<{kritik_seviye_degeri} Koli)", f"{kritik_seviyedeki_urunler_df.shape[0]} Ürün", delta_color="inverse")
+    kpi1.metric("Toplam Stok Değeri (Brüt)", tl(ozet['toplam_deger']))
+    kpi2.metric("Stoktaki Ürün Çeşidi", f"{ozet['urun_cesidi']}")
+    kpi3.metric(f"KRİTİK SEVİYEDEKİ ÜRÜNLER (<{kritik_seviye_degeri} Koli)", f"{ozet['kritik_sayisi']} Ürün", delta_color="inverse")
     st.markdown("---")
     if sadece_kritikleri_goster:
-        gosterilecek_nihai_df = kritik_seviyedeki_urunler_df
         st.warning(f"Aşağıda sadece stok miktarı {kritik_seviye_degeri} kolinin altına düşmüş ürünler listelenmektedir.")
-    else:
-        gosterilecek_nihai_df = goruntulenecek_df
     st.subheader("Detaylı Stok Listesi")
-    def highlight_critical(row):
-        if row[miktar_sutunu] < kritik_seviye_degeri: return ['background-color: #5E2A2A'] * len(row)
-        return [''] * len(row)
-    gosterilecek_nihai_df = gosterilecek_nihai_df.sort_values(by=urun_adi_sutunu, ascending=True)
-    if is_aggregated:
-        gosterilecek_sutunlar = [urun_kodu_sutunu, urun_adi_sutunu, miktar_sutunu, fiyat_sutunu, 'Brüt_Tutar']
-        format_sozlugu = {'Brüt_Tutar': '{:,.2f} TL', fiyat_sutunu: '{:,.2f} TL'}
-    else:
-        gosterilecek_sutunlar = [depo_adi_sutunu, urun_kodu_sutunu, urun_adi_sutunu, miktar_sutunu, fiyat_sutunu, brut_tutar_sutunu]
-        format_sozlugu = {brut_tutar_sutunu: '{:,.2f} TL', fiyat_sutunu: '{:,.2f} TL'}
-    st.dataframe(gosterilecek_nihai_df[gosterilecek_sutunlar].style.apply(highlight_critical, axis=1).format(format_sozlugu), use_container_width=True, hide_index=True)
-
-def page_yaslandirma(satis_df):
+    # Kritik satırlar hücre boyamak yerine önceden hesaplanmış 'Kritik' sütunuyla işaretlenir;
+    # tutarlar sayı olarak kalır, biçimlendirmeyi tarayıcı yapar.
+    gosterilecek_sutunlar = (['Depo Adı'] if depo is not None else []) + ['Kritik', 'Ürün Kodu', 'Ürün', 'Miktar', 'Fiyat', 'Brüt Tutar']
+    stok_tablosu = stok_modeli.tablo(depo, sadece_kritikleri_goster)
+    sayfali_tablo(
+        stok_tablosu, 'stok', column_order=gosterilecek_sutunlar, siralama=('Ürün', True),
+        column_config={
+            'Kritik': st.column_config.CheckboxColumn(f"Kritik (<{kritik_seviye_degeri})"),
+            'Fiyat': st.column_config.NumberColumn("Fiyat (TL)", format="localized"),
+            'Brüt Tutar': st.column_config.NumberColumn("Brüt Tutar (TL)", format="localized"),
+        },
+    )
+    indirme_dugmeleri(
+        stok_tablosu[[sutun for sutun in gosterilecek_sutunlar if sutun in stok_tablosu.columns]],
+        f"stok_{secilen_depo}" + ("_kritik" if sadece_kritikleri_goster else ""), ('stok', depo, sadece_kritikleri_goster), stok_surumu,
+    )
+
+def page_yaslandirma(satis_df, yaslandirma_kupu, gecikme_indeksi, defter_degisiklikleri, satis_surumu):
     st.title("⏳ Borç Yaşlandırma Analizi")
     if satis_df is None:
         st.warning("Satış verileri yüklenemedi.")
@@ -320,39 +279,73 @@ def page_yaslandirma(satis_df):
     if gun_sutunu not in satis_df.columns:
         st.error(f"HATA: Satış verilerinde ('rapor.xls') '{gun_sutunu}' adında bir sütun bulunamadı!")
         return
+    if yaslandirma_kupu is None or gecikme_indeksi is None:
+        st.info("Sayfanın verileri hazırlanıyor; hazır olduğunda sayfa kendiliğinden güncellenecek.")
+        return
     st.markdown("Satış temsilcisi seçerek vadesi geçmiş alacakların dökümünü ve özetini görüntüleyin.")
-    temsilci_listesi = sorted(satis_df['ST'].unique())
+    temsilci_listesi = list(satis_df['ST'].cat.categories)
     secilen_temsilcisi = st.selectbox('Analiz için bir satış temsilcisi seçin:', temsilci_listesi)
     if secilen_temsilcisi:
-        temsilci_df = satis_df[satis_df['ST'] == secilen_temsilcisi].copy()
-        gecikmis_df = temsilci_df[(temsilci_df[gun_sutunu] > 0) & (temsilci_df['Kalan Tutar Total'] > 0)]
         st.markdown("---")
         st.subheader(f"{secilen_temsilcisi} - Vadesi Geçmiş Alacak Özeti")
-        ustu_35_gun_df = gecikmis_df[gecikmis_df['Gün'] > 35]
-        ustu_45_gun_df = gecikmis_df[gecikmis_df['Gün'] > 45]
-        ustu_60_gun_df = gecikmis_df[gecikmis_df['Gün'] > 60]
         col1, col2, col3 = st.columns(3)
-        col1.metric("35+ Gün Geçikme", f"{ustu_35_gun_df['Kalan Tutar Total'].sum():,.2f} TL")
-        col2.metric("45+ Gün Geçikme", f"{ustu_45_gun_df['Kalan Tutar Total'].sum():,.2f} TL")
-        col3.metric("60+ Gün Geçikme (Riskli)", f"{ustu_60_gun_df['Kalan Tutar Total'].sum():,.2f} TL")
+        col1.metric("35+ Gün Geçikme", tl(yaslandirma_kupu.ustu(35, temsilci=secilen_temsilcisi)))
+        col2.metric("45+ Gün Geçikme", tl(yaslandirma_kupu.ustu(45, temsilci=secilen_temsilcisi)))
+        col3.metric("60+ Gün Geçikme (Riskli)", tl(yaslandirma_kupu.ustu(60, temsilci=secilen_temsilcisi)))
         st.markdown("---")
-        min_gun_sayisi = int(gecikmis_df[gun_sutunu].min()) if not gecikmis_df.empty else 0
-        max_gun_sayisi = int(gecikmis_df[gun_sutunu].max()) if not gecikmis_df.empty else 1
+        min_gun_sayisi, max_gun_sayisi = gecikme_indeksi.gun_araligi(secilen_temsilcisi) or (0, 1)
         secilen_gun = st.slider('Özel Gecikme Günü Filtresi', min_gun_sayisi, max_gun_sayisi, max_gun_sayisi)
-        dinamik_gecikmis_df = gecikmis_df[gecikmis_df['Gün'] >= secilen_gun]
+        # Satırlar önceden Gün'e göre azalan sıralı: eşik sorgusu ikili arama ve kopyasız dilimdir.
+        dinamik_toplam, dinamik_gecikmis_df = gecikme_indeksi.sorgu(secilen_temsilcisi, secilen_gun)
         st.subheader(f"{secilen_gun}+ Gün Gecikmiş Alacakların Detaylı Listesi")
         if dinamik_gecikmis_df.empty:
             st.success(f"{secilen_temsilcisi} adlı temsilcinin {secilen_gun} günden fazla gecikmiş alacağı bulunmamaktadır.")
         else:
-            sirali_liste = dinamik_gecikmis_df.sort_values(by=gun_sutunu, ascending=False)
+            st.metric(f"{secilen_gun}+ Gün Toplam Bakiye", tl(dinamik_toplam))
             gosterilecek_sutunlar = ['Müşteri', 'Kalan Tutar Total', gun_sutunu]
-            st.dataframe(sirali_liste[gosterilecek_sutunlar], use_container_width=True, hide_index=True, column_config={gun_sutunu: "Gecikme Günü", "Kalan Tutar Total": st.column_config.NumberColumn("Bakiye (TL)", format="%.2f TL")})
+            sayfali_tablo(dinamik_gecikmis_df[gosterilecek_sutunlar], 'yaslandirma', siralama=(gun_sutunu, False), sirali=True, column_config={gun_sutunu: "Gecikme Günü", "Kalan Tutar Total": st.column_config.NumberColumn("Bakiye (TL)", format="localized")})
         st.markdown("")
         if not dinamik_gecikmis_df.empty:
-            st.download_button(label=f"📥 {secilen_gun}+ Gün Raporunu İndir", data=to_excel(dinamik_gecikmis_df), file_name=f"{secilen_temsilcisi}_{secilen_gun}_gun_ustu.xlsx")
+            st.markdown(f"**{secilen_gun}+ Gün Raporunu İndir**")
+            indirme_dugmeleri(dinamik_gecikmis_df, f"{secilen_temsilcisi}_{secilen_gun}_gun_ustu", ('yaslandirma', secilen_temsilcisi, secilen_gun), satis_surumu)
+        bolum_defter_degisiklikleri(defter_degisiklikleri, secilen_temsilcisi)
+
+def bolum_defter_degisiklikleri(defter_degisiklikleri, temsilci):
+    st.markdown("---")
+    st.subheader("Son Rapordan Bu Yana Değişiklikler")
+    if defter_degisiklikleri is None:
+        st.info("Karşılaştırma için en az iki farklı `rapor.xls` sürümü yüklenmiş olmalıdır.")
+        return
+    st.caption(f"{defter_degisiklikleri.onceki_zaman} → {defter_degisiklikleri.zaman}")
+    ozet = defter_degisiklikleri.ozet(temsilci)
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Yeni Müşteri", ozet['yeni'])
+    col2.metric("Kapanan Hesap", ozet['kapanan'])
+    col3.metric("Ödeme Yapan", ozet['odeme_yapan'])
+    col4.metric("Kovası Kötüleşen", ozet['kotulesen'], delta=f"{ozet['iyilesen']} iyileşen", delta_color="off")
+    col5.metric("Bakiye Değişimi", tl(ozet['bakiye_degisimi'], ondalik=0))
+    degisiklikler = defter_degisiklikleri.temsilci(temsilci)
+    if degisiklikler.empty:
+        st.success(f"{temsilci} adlı temsilcinin müşterilerinde son rapordan bu yana değişiklik yok.")
+        return
+    with st.expander("Kova Geçişleri (müşteri sayısı)"):
+        st.dataframe(defter_degisiklikleri.kova_gocu(temsilci), use_container_width=True)
+    kova_adi = lambda kodlar: kodlar.map(lambda kod: TAHSILAT_KOVALARI[kod] if kod >= 0 else "")
+    tablo = degisiklikler.assign(**{
+        'Fark': degisiklikler['Bakiye'] - degisiklikler['Önceki Bakiye'],
+        'Önceki Kova': kova_adi(degisiklikler['Önceki Kova']), 'Kova': kova_adi(degisiklikler['Kova']),
+    })
+    tl_sutunu = lambda etiket: st.column_config.NumberColumn(etiket, format="localized")
+    sayfali_tablo(
+        tablo[['Müşteri', 'Durum', 'Önceki Bakiye', 'Bakiye', 'Fark', 'Önceki Kova', 'Kova']], 'defter_degisiklikleri', siralama=('Fark', True),
+        column_config={'Önceki Bakiye': tl_sutunu("Önceki Bakiye (TL)"), 'Bakiye': tl_sutunu("Bakiye (TL)"), 'Fark': tl_sutunu("Fark (TL)")},
+    )
 
 def page_satis_hedef(final_df):
     st.title("🎯 Satış / Hedef Analizi")
+    if final_df is not None:
+        for sorun in final_df.attrs.get('sorunlar', []):
+            st.warning(f"`satis-hedef.xlsx`: {sorun}")
     if final_df is None or final_df.empty:
         st.warning("Lütfen `satis-hedef.xlsx` dosyasını yükleyin ve formatını kontrol edin.")
         return
@@ -361,26 +354,27 @@ def page_satis_hedef(final_df):
         toplam_hedef = total_row['HEDEF'].sum()
         toplam_satis = total_row['SATIŞ'].sum()
         st.subheader("Genel Performans Durumu")
-        gauge_fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta", value = toplam_satis,
-            number = {'prefix': "₺", 'valueformat': ',.0f'}, domain = {'x': [0, 1], 'y': [0.1, 1]},
-            title = {'text': f"<b>Aylık Toplam Satış</b><br><span style='font-size:1.0em;color:#FDB022;'><b>Hedef: ₺{toplam_hedef:,.0f}</b></span>", 'font': {"size": 24}},
-            delta = {'reference': toplam_hedef, 'relative': False, 'valueformat': ',.0f', 'increasing': {'color': "#2ECC71"}, 'decreasing': {'color': "#E74C3C"}},
-            gauge = {
-                'axis': {'range': [None, toplam_hedef * 1.2], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "#2ECC71"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [{'range': [0, toplam_hedef * 0.5], 'color': '#FADBD8'}, {'range': [toplam_hedef * 0.5, toplam_hedef * 0.8], 'color': '#FDEBD0'}],
-                'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': toplam_hedef}
-            }
-        ))
+        with olcum.asama("gösterge grafiği"):
+            gauge_fig = go.Figure(go.Indicator(
+                mode = "gauge+number+delta", value = toplam_satis,
+                number = {'suffix': " TL", 'valueformat': ',.0f'}, domain = {'x': [0, 1], 'y': [0.1, 1]},
+                title = {'text': f"<b>Aylık Toplam Satış</b><br><span style='font-size:1.0em;color:#FDB022;'><b>Hedef: {tl(toplam_hedef, ondalik=0)}</b></span>", 'font': {"size": 24}},
+                delta = {'reference': toplam_hedef, 'relative': False, 'valueformat': ',.0f', 'increasing': {'color': "#2ECC71"}, 'decreasing': {'color': "#E74C3C"}},
+                gauge = {
+                    'axis': {'range': [None, toplam_hedef * 1.2], 'tickwidth': 1, 'tickcolor': "darkblue"},
+                    'bar': {'color': "#2ECC71"},
+                    'bgcolor': "white",
+                    'borderwidth': 2,
+                    'bordercolor': "gray",
+                    'steps': [{'range': [0, toplam_hedef * 0.5], 'color': '#FADBD8'}, {'range': [toplam_hedef * 0.5, toplam_hedef * 0.8], 'color': '#FDEBD0'}],
+                    'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': toplam_hedef}
+                }
+            ))
         
-        tamamlanma_yuzdesi = (toplam_satis / toplam_hedef * 100) if toplam_hedef > 0 else 0
-        gauge_fig.add_annotation(x=0.5, y=0.08, text=f"<b>%{tamamlanma_yuzdesi:.1f} Tamamlandı</b>", font=dict(size=22, color="#FDB022"), showarrow=False)
-        gauge_fig.update_layout(height=450)
-        st.plotly_chart(gauge_fig, use_container_width=True)
+            tamamlanma_yuzdesi = (toplam_satis / toplam_hedef * 100) if toplam_hedef > 0 else 0
+            gauge_fig.add_annotation(x=0.5, y=0.08, text=f"<b>%{tamamlanma_yuzdesi:.1f} Tamamlandı</b>", font=dict(size=22, color="#FDB022"), showarrow=False)
+            gauge_fig.update_layout(height=450, separators=PLOTLY_AYIRICILARI)
+            st.plotly_chart(gauge_fig, use_container_width=True)
 
         st.markdown("---")
         st.subheader("Temsilci ve Grup Bazında Performans")
@@ -391,26 +385,28 @@ def page_satis_hedef(final_df):
         personel_df['Y_Axis_Label'] = personel_df.apply(lambda row: f"{row['Satış Temsilcisi']} (%{row['Performans']:.0f})", axis=1)
         personel_df = personel_df.sort_values(by='Performans', ascending=True)
 
-        bar_fig = go.Figure()
-        bar_fig.add_trace(go.Bar(y=personel_df['Y_Axis_Label'], x=personel_df['HEDEF'], name='Hedef', orientation='h', text=personel_df['HEDEF'], marker=dict(color='#E74C3C', line=dict(color='#C0392B', width=1))))
-        bar_fig.add_trace(go.Bar(y=personel_df['Y_Axis_Label'], x=personel_df['SATIŞ'], name='Satış', orientation='h', text=personel_df['SATIŞ'], marker=dict(color='#2ECC71', line=dict(color='#27AE60', width=1))))
+        with olcum.asama("çubuk grafiği"):
+            bar_fig = go.Figure()
+            bar_fig.add_trace(go.Bar(y=personel_df['Y_Axis_Label'], x=personel_df['HEDEF'], name='Hedef', orientation='h', text=personel_df['HEDEF'], marker=dict(color='#E74C3C', line=dict(color='#C0392B', width=1))))
+            bar_fig.add_trace(go.Bar(y=personel_df['Y_Axis_Label'], x=personel_df['SATIŞ'], name='Satış', orientation='h', text=personel_df['SATIŞ'], marker=dict(color='#2ECC71', line=dict(color='#27AE60', width=1))))
         
-        bar_fig.update_traces(texttemplate='₺%{x:,.0f}', textposition='outside', textfont_size=12)
-        bar_fig.update_layout(title_text='Satış Temsilcisi Hedef & Satış Karşılaştırması', barmode='group', yaxis_title=None, xaxis_title="Tutar (TL)", legend_title="Gösterge", height=600, margin=dict(l=50, r=50, t=70, b=70), yaxis=dict(categoryorder='total ascending', tickfont=dict(family="Arial Black, sans-serif", size=15, color="#FDB022")), bargap=0.30, bargroupgap=0.1)
-        st.plotly_chart(bar_fig, use_container_width=True)
+            bar_fig.update_traces(texttemplate='%{x:,.0f} TL', textposition='outside', textfont_size=12)
+            bar_fig.update_layout(separators=PLOTLY_AYIRICILARI, title_text='Satış Temsilcisi Hedef & Satış Karşılaştırması', barmode='group', yaxis_title=None, xaxis_title="Tutar (TL)", legend_title="Gösterge", height=600, margin=dict(l=50, r=50, t=70, b=70), yaxis=dict(categoryorder='total ascending', tickfont=dict(family="Arial Black, sans-serif", size=15, color="#FDB022")), bargap=0.30, bargroupgap=0.1)
+            st.plotly_chart(bar_fig, use_container_width=True)
             
         with st.expander("Detaylı Veri Tablolarını Görüntüle"):
-            for title, table in final_df.groupby('Grup'):
-                st.subheader(title)
-                df_display = table[table['Satış Temsilcisi'] != 'TOPLAM']
-                st.dataframe(df_display.style.format({'HEDEF': '{:,.2f} TL', 'SATIŞ': '{:,.2f} TL', 'KALAN': '{:,.2f} TL', '%': '{:,.2f}%'}).background_gradient(cmap='RdYlGn', subset=['%'], vmin=0, vmax=120), use_container_width=True, hide_index=True)
+            with olcum.asama("Styler tabloları"):
+                for title, table in final_df.groupby('Grup'):
+                    st.subheader(title)
+                    df_display = table[table['Satış Temsilcisi'] != 'TOPLAM']
+                    st.dataframe(df_display.style.format({'HEDEF': tl, 'SATIŞ': tl, 'KALAN': tl, '%': lambda deger: "%" + tl(deger, sonek="")}).background_gradient(cmap='RdYlGn', subset=['%'], vmin=0, vmax=120), use_container_width=True, hide_index=True)
 
     except Exception as e:
         st.error(f"Grafikler oluşturulurken veya Excel dosyası ayrıştırılırken bir hata oluştu. Lütfen dosya formatını kontrol edin. Hata: {e}")
 
 def page_solen(solen_borcu_degeri):
     st.title("🎉 Şölen Cari Hesap Özeti")
-    st.metric("Güncel Borç Bakiyesi", f"{solen_borcu_degeri:,.2f} TL")
+    st.metric("Güncel Borç Bakiyesi", tl(solen_borcu_degeri))
     st.info("Bu veri `solen_borc.xlsx` dosyasından okunmaktadır.")
 
 def page_hizmet_faturalari():
@@ -420,186 +416,322 @@ def page_hizmet_faturalari():
 # ==========================================================================================
 # MÜŞTERİ ANALİZİ SAYFASI - NİHAİ GÜNCELLEME v9: RENK PALETİ İSİM DÜZELTMESİ
 # ==========================================================================================
-def page_musteri_analizi(satis_df, ilce_df):
+# Harita katmanı: GeoJSON'daki her ilçe (veya başka bir ilin ilçeleri) veriyle eşleştirilir.
+# Yeni ilçe ya da il eklemek için GeoJSON dosyasına poligon eklemek yeterlidir.
+ADANA_GEOJSON_DOSYASI = 'adana_ilceler.geojson'
+HARITA_MERKEZI = [37.05, 35.35]
+HARITA_YAKINLASTIRMA = 9.5
+HARITA_STILLERI = {
+    "Karanlık (Önerilen)": 'CartoDB dark_matter',
+    "Sokak Haritası": 'OpenStreetMap',
+    "Kabartma (Arazi)": 'Stamen Terrain',
+}
+
+@st.cache_resource
+def adana_geojson_yukle():
+    # İlçe sınırları süreç başına bir kez okunur; dönen sözlük paylaşılır, değiştirilmemelidir.
+    with open(ADANA_GEOJSON_DOSYASI, encoding='utf-8') as f:
+        return json.load(f)
+
+# Harita HTML'i ve haritadaki ilçelerin özeti (veri sürümü, harita stili) başına bir kez üretilir.
+# Alt çizgiyle başlayan parametreler Streamlit tarafından özetlenmez; anahtar veri sürümüdür.
+@olcum.cagri_sayaci('ilce_haritasi')
+@st.cache_data(max_entries=12)
+@olcum.hesaplama_sayaci('ilce_haritasi')
+def ilce_haritasi_olustur(_ilce_metrikleri, veri_surumu, tile):
+    adana_geojson = adana_geojson_yukle()
+    # --- DÜZELTME BURADA ---
+    # 'YlOrRd' yerine bu kütüphanede var olan 'YlOrRd_09' kullanıldı.
+    # Veriler ve dolgu renkleri özelliklere tek geçişte yazılır; style_function sadece okur.
+    dolu_geojson, gosterilecek_veri, (min_ciro, max_ciro) = _ilce_metrikleri.katmana_uygula(adana_geojson, cm.linear.YlOrRd_09.colors)
+    colormap = cm.linear.YlOrRd_09.scale(min_ciro, max_ciro)
+    colormap.caption = 'Toplam Ciro (TL)'
+
+    m = folium.Map(location=HARITA_MERKEZI, zoom_start=HARITA_YAKINLASTIRMA, tiles=tile)
+    folium.GeoJson(
+        dolu_geojson,
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['fillColor'],
+            'color': 'white',
+            'weight': 2,
+            'fillOpacity': 0.7
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=['name', 'Brüt Fiyat', 'Müşteri Sayısı'],
+            aliases=['İlçe:', 'Toplam Ciro:', 'Müşteri Sayısı:'],
+            localize=True,
+            sticky=False,
+            labels=True,
+            style="""
+                background-color: #2D3748;
+                color: #FFFFFF;
+                border: 1px solid #FDB022;
+                border-radius: 5px;
+                box-shadow: 3px;
+                font-size: 16px;
+                font-family: Arial;
+                padding: 10px;
+            """
+        )
+    ).add_to(m)
+
+    m.add_child(colormap)
+    return m.get_root().render(), gosterilecek_veri
+
+def page_satis_gecmisi(gecmis_toplamlari, sorunlar):
+    st.title("📅 Satış Geçmişi")
+    for sorun in sorunlar:
+        st.warning(f"Satış geçmişi: {sorun}")
+    if gecmis_toplamlari is None:
+        st.warning("Satış geçmişi için veri klasöründe `2025_satış_toplam.xlsx` gibi dönem adlı (`YYYY_satış_...`, `YYYY-AA_satış_...`) çalışma kitapları bulunmalıdır.")
+        return
+    with st.expander("Depodaki Dönem Kitapları"):
+        st.dataframe(gecmis_toplamlari.kaynaklar, use_container_width=True, hide_index=True, column_config={
+            "Başlangıç": st.column_config.DateColumn(format="YYYY-MM-DD"), "Bitiş": st.column_config.DateColumn(format="YYYY-MM-DD"),
+        })
+    boyutlar = {"Toplam": None, "Temsilci": 'ST', "İlçe": 'İlçe', "Müşteri": 'Müşteri Ünvanı'}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        # Varsayılan, depoda verisi bulunan en ince sıklıktır.
+        sikliklar = list(gecmis_toplamlari.toplamlar)
+        varsayilan = next((i for i, siklik in enumerate(sikliklar) if not gecmis_toplamlari.toplamlar[siklik].empty), len(sikliklar) - 1)
+        siklik = st.selectbox("Sıklık", sikliklar, index=varsayilan, format_func=str.capitalize, key="gecmis_siklik")
+    with col2:
+        boyut = boyutlar[st.selectbox("Kırılım", list(boyutlar), key="gecmis_boyut")]
+    degerler = None
+    if boyut is not None:
+        toplamlar = gecmis_toplamlari.toplamlar[siklik].groupby(boyut, observed=True)['Brüt Fiyat'].sum().sort_values(ascending=False)
+        with col3:
+            degerler = st.multiselect("Gösterilecek Değerler", toplamlar.index.tolist(), default=toplamlar.index[:5].tolist(), key=f"gecmis_degerler_{boyut}")
+    trend = gecmis_toplamlari.trend(siklik, boyut, degerler)
+    if trend.empty:
+        st.info(f"Depoda {siklik} ya da daha ince dönemli kitap yok; daha kaba bir sıklık seçin.")
+        return
+    st.subheader("Trend")
+    fig = px.line(trend, markers=True, labels={'value': "Brüt Satış (TL)", 'Dönem': "Dönem", 'variable': ""})
+    fig.update_layout(separators=PLOTLY_AYIRICILARI, showlegend=boyut is not None, height=450)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("Geçen Yılla Karşılaştırma")
+    karsilastirma = gecmis_toplamlari.yillik_karsilastirma(siklik, boyut)
+    if degerler is not None:
+        karsilastirma = karsilastirma[karsilastirma[boyut].isin(degerler)]
+    if karsilastirma['Geçen Yıl'].notna().sum() == 0:
+        st.info("Karşılaştırma için depoda aynı dönemin en az iki yıllık verisi bulunmalıdır.")
+    sayfali_tablo(karsilastirma, 'gecmis_karsilastirma', siralama=('Dönem', False), column_config={
+        "Dönem": st.column_config.DateColumn(format="YYYY-MM-DD"),
+        "Bu Yıl": st.column_config.NumberColumn("Bu Yıl (TL)", format="localized"),
+        "Geçen Yıl": st.column_config.NumberColumn("Geçen Yıl (TL)", format="localized"),
+        "Değişim %": st.column_config.NumberColumn(format="%.1f%%"),
+    })
+
+def page_musteri_analizi(ilce_df, ilce_metrikleri, ilce_surumu, musteri_analitigi, musteri_surumu):
     st.title("👥 Müşteri Analizi")
     st.markdown("Değerli, sadık veya hareketsiz müşterilerinizi keşfedin ve bölgesel performansı analiz edin.")
     st.markdown("---")
 
-    aktif_ilceler = ["SEYHAN", "ÇUKUROVA", "YÜREĞİR", "SARIÇAM", "KARAİSALI"]
     st.subheader("🗺️ Adana Merkez İlçe Performans Haritası")
 
     if ilce_df is None:
         st.warning("Haritayı görüntülemek için lütfen `adana_ilce_ciro.xlsx` dosyasını ana klasöre ekleyin.")
         return
-    if ilce_df.empty or 'İlçe' not in ilce_df.columns:
+    if ilce_metrikleri is None:
         st.error("`adana_ilce_ciro.xlsx` dosyasında 'İlçe' sütunu bulunamadı veya dosya formatı hatalı.")
         return
 
-    ilce_df_aktif = ilce_df[ilce_df['İlçe'].isin(aktif_ilceler)].copy()
-    
-    if ilce_df_aktif.empty:
-        st.warning(f"Veri setinde belirtilen aktif ilçelerden ({', '.join(aktif_ilceler)}) herhangi birine ait kayıt bulunamadı.")
-        return
-
-    ciro_by_ilce = ilce_df_aktif.groupby('İlçe')['Brüt Fiyat'].sum().reset_index()
-    musteri_by_ilce = ilce_df_aktif.groupby('İlçe')['Müşteri Ünvanı'].nunique().reset_index()
-    musteri_by_ilce.rename(columns={'Müşteri Ünvanı': 'Müşteri Sayısı'}, inplace=True)
-    gosterilecek_veri = pd.merge(ciro_by_ilce, musteri_by_ilce, on='İlçe')
-
     col1, col2 = st.columns([3, 1])
     with col2:
         st.write("#### Harita Stili")
         harita_stili = st.selectbox(
             "Harita arka planını seçin:",
-            ["Karanlık (Önerilen)", "Sokak Haritası", "Kabartma (Arazi)"],
+            list(HARITA_STILLERI),
             key="harita_stili_secim"
         )
+
+    try:
+        harita_html, gosterilecek_veri = ilce_haritasi_olustur(ilce_metrikleri, ilce_surumu, HARITA_STILLERI[harita_stili])
+    except Exception as e:
+        st.error(f"Harita oluşturulurken beklenmedik bir hata oluştu. Hata: {e}")
+        return
+
+    if gosterilecek_veri.empty:
+        st.warning("Veri setinde haritadaki ilçelerden herhangi birine ait kayıt bulunamadı.")
+        return
+
+    with col2:
         st.markdown("---")
         st.write("#### Genel Bakış")
         en_iyi_ilce = gosterilecek_veri.sort_values(by='Brüt Fiyat', ascending=False).iloc[0]
-        st.metric(label="En Yüksek Cirolu İlçe", value=en_iyi_ilce['İlçe'], help=f"Değer: {en_iyi_ilce['Brüt Fiyat']:,.0f} TL")
+        st.metric(label="En Yüksek Cirolu İlçe", value=en_iyi_ilce['İlçe'], help=f"Değer: {tl(en_iyi_ilce['Brüt Fiyat'], ondalik=0)}")
 
     with col1:
-        try:
-            adana_geojson = { "type": "FeatureCollection", "features": [ { "type": "Feature", "properties": { "name": "SEYHAN" }, "geometry": { "type": "Polygon", "coordinates": [ [ [ 35.3228, 37.0049 ], [ 35.3094, 36.9852 ], [ 35.2842, 36.9806 ], [ 35.2481, 36.9587 ], [ 35.2158, 36.9554 ], [ 35.1578, 36.9525 ], [ 35.1611, 37.0142 ], [ 35.2017, 37.0317 ], [ 35.2494, 37.0863 ], [ 35.2789, 37.0782 ], [ 35.3117, 37.0818 ], [ 35.3403, 37.0665 ], [ 35.3228, 37.0049 ] ] ] } }, { "type": "Feature", "properties": { "name": "YÜREĞİR" }, "geometry": { "type": "Polygon", "coordinates": [ [ [ 35.3411, 37.0004 ], [ 35.3722, 36.8788 ], [ 35.4381, 36.8742 ], [ 35.4878, 36.8407 ], [ 35.5397, 36.8197 ], [ 35.5683, 36.9632 ], [ 35.5808, 37.0194 ], [ 35.4411, 37.0504 ], [ 35.3411, 37.0004 ] ] ] } }, { "type": "Feature", "properties": { "name": "SARIÇAM" }, "geometry": { "type": "Polygon", "coordinates": [ [ [ 35.4411, 37.0504 ], [ 35.5808, 37.0194 ], [ 35.6175, 37.108 ], [ 35.6314, 37.1504 ], [ 35.5783, 37.1707 ], [ 35.4883, 37.1821 ], [ 35.4411, 37.0504 ] ] ] } }, { "type": "Feature", "properties": { "name": "ÇUKUROVA" }, "geometry": { "type": "Polygon", "coordinates": [ [ [ 35.2494, 37.0863 ], [ 35.2017, 37.0317 ], [ 35.2114, 37.0304 ], [ 35.2483, 37.057 ], [ 35.3033, 37.0514 ], [ 35.3403, 37.0665 ], [ 35.3117, 37.0818 ], [ 35.2789, 37.0782 ], [ 35.2494, 37.0863 ] ] ] } }, { "type": "Feature", "properties": { "name": "KARAİSALI" }, "geometry": { "type": "Polygon", "coordinates": [ [ [ 35.0480, 37.2211 ], [ 35.1583, 37.1683 ], [ 35.2413, 37.2280 ], [ 35.2013, 37.3011 ], [ 35.0880, 37.3308 ], [ 35.0480, 37.2211 ] ] ] } } ] }
-            
-            if harita_stili == "Karanlık (Önerilen)":
-                tile = 'CartoDB dark_matter'
-            elif harita_stili == "Sokak Haritası":
-                tile = 'OpenStreetMap'
-            else:
-                tile = 'Stamen Terrain'
-
-            m = folium.Map(location=[37.05, 35.35], zoom_start=9.5, tiles=tile)
-
-            veri_sozlugu = gosterilecek_veri.set_index('İlçe')
-            
-            for feature in adana_geojson['features']:
-                ilce_adi = feature['properties']['name']
-                if ilce_adi in veri_sozlugu.index:
-                    feature['properties']['Brüt Fiyat'] = veri_sozlugu.loc[ilce_adi, 'Brüt Fiyat']
-                    feature['properties']['Müşteri Sayısı'] = veri_sozlugu.loc[ilce_adi, 'Müşteri Sayısı']
-
-            # --- DÜZELTME BURADA ---
-            # 'YlOrRd' yerine bu kütüphanede var olan 'YlOrRd_09' kullanıldı.
-            min_ciro = gosterilecek_veri['Brüt Fiyat'].min()
-            max_ciro = gosterilecek_veri['Brüt Fiyat'].max()
-            colormap = cm.linear.YlOrRd_09.scale(min_ciro, max_ciro)
-            colormap.caption = 'Toplam Ciro (TL)'
-
-            geo_json_layer = folium.GeoJson(
-                adana_geojson,
-                style_function=lambda feature: {
-                    'fillColor': colormap(feature['properties'].get('Brüt Fiyat', 0)),
-                    'color': 'white',
-                    'weight': 2,
-                    'fillOpacity': 0.7
-                },
-                tooltip=folium.GeoJsonTooltip(
-                    fields=['name', 'Brüt Fiyat', 'Müşteri Sayısı'],
-                    aliases=['İlçe:', 'Toplam Ciro:', 'Müşteri Sayısı:'],
-                    localize=True,
-                    sticky=False,
-                    labels=True,
-                    style="""
-                        background-color: #2D3748;
-                        color: #FFFFFF;
-                        border: 1px solid #FDB022;
-                        border-radius: 5px;
-                        box-shadow: 3px;
-                        font-size: 16px;
-                        font-family: Arial;
-                        padding: 10px;
-                    """
-                )
-            ).add_to(m)
-
-            m.add_child(colormap)
-            st_folium(m, use_container_width=True, height=550)
-
-        except Exception as e:
-            st.error(f"Harita oluşturulurken beklenmedik bir hata oluştu. Hata: {e}")
+        # Harita önceden üretilmiş statik HTML olarak gösterilir; yeniden çalışmalarda folium
+        # nesnesi kurulmaz ve sayfa aynı HTML'i tekrar işlemez.
+        with olcum.asama("harita gösterimi"):
+            components.html(harita_html, height=550)
 
     st.markdown("---")
     st.subheader("🥇 En Değerli Müşteriler (Yıllık Ciroya Göre)")
-    if ilce_df is None or ilce_df.empty:
+    bolum_en_degerli_musteriler(ilce_metrikleri)
+
+    if musteri_analitigi is not None:
+        bolum_rfm_segmentleri(musteri_analitigi, musteri_surumu)
+        bolum_sadik_musteriler(musteri_analitigi)
+        bolum_uyuyan_musteriler(musteri_analitigi)
+    else:
+        st.warning("Sadık ve uyuyan müşterileri analiz etmek için `rapor.xls` dosyası gereklidir.")
+
+# Sayfanın alt bölümleri ayrı fragment'lerdir: kaydırıcıları yalnızca kendi bölümlerini yeniden
+# çalıştırır, üstteki harita yeniden oluşturulmaz ve tarayıcıya tekrar gönderilmez.
+@st.fragment
+def bolum_en_degerli_musteriler(ilce_metrikleri):
+    if ilce_metrikleri.musteri_cirolari.empty:
         st.warning("En değerli müşterileri görüntülemek için `adana_ilce_ciro.xlsx` dosyası gereklidir.")
     else:
         top_n = st.slider("Listelenecek müşteri sayısı:", 5, 50, 10, step=5, key='degerli_slider')
-        en_degerli_musteriler = ilce_df.groupby('Müşteri Ünvanı')['Brüt Fiyat'].sum().sort_values(ascending=False).head(top_n).reset_index()
-        en_degerli_musteriler.rename(columns={'Müşteri Ünvanı': 'Müşteri Adı', 'Brüt Fiyat': 'Toplam Ciro (TL)'}, inplace=True)
-        en_degerli_musteriler['Toplam Ciro (TL)'] = en_degerli_musteriler['Toplam Ciro (TL)'].apply(lambda x: f"₺{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-        st.dataframe(en_degerli_musteriler, use_container_width=True, hide_index=True)
-
-    if satis_df is not None:
-        st.markdown("---")
-        st.subheader("❤️ Sadık Müşteriler (İşlem Sayısı)")
-        top_n_sadik = st.slider("Listelenecek sadık müşteri sayısı:", 5, 50, 10, step=5, key='sadik_slider')
-        sadik_musteriler = satis_df['Müşteri'].value_counts().head(top_n_sadik).reset_index()
-        sadik_musteriler.columns = ['Müşteri Adı', 'Toplam İşlem Sayısı']
-        st.dataframe(sadik_musteriler, use_container_width=True, hide_index=True)
+        en_degerli_musteriler = ilce_metrikleri.en_degerli_musteriler(top_n).rename(columns={'Müşteri Ünvanı': 'Müşteri Adı', 'Brüt Fiyat': 'Toplam Ciro (TL)'})
+        st.dataframe(en_degerli_musteriler, use_container_width=True, hide_index=True, column_config={'Toplam Ciro (TL)': st.column_config.NumberColumn(format="localized")})
 
-        st.markdown("---")
-        st.subheader("😴 'Uyuyan' Müşteriler (Son İşlem Tarihine Göre)")
-        son_islem_gunleri = satis_df.groupby('Müşteri')['Gün'].max().reset_index()
-        son_islem_gunleri.columns = ['Müşteri', 'Gecikme Günü']
-        bugunun_tarihi = datetime.today().date()
-        son_islem_gunleri['Son İşlem Tarihi'] = son_islem_gunleri['Gecikme Günü'].apply(lambda x: bugunun_tarihi - pd.Timedelta(days=x) if pd.notna(x) else None)
-        gecikme_gunu = st.slider("İşlem görmeyen minimum gün sayısı:", 30, 180, 60)
-        uyuyan_musteriler = son_islem_gunleri[son_islem_gunleri['Gecikme Günü'] >= gecikme_gunu].sort_values(by='Gecikme Günü', ascending=False)
-        if not uyuyan_musteriler.empty:
-            st.info(f"Son işlemi **{gecikme_gunu} günden** eski olan müşteriler listeleniyor.")
-            st.dataframe(uyuyan_musteriler[['Müşteri', 'Gecikme Günü', 'Son İşlem Tarihi']], use_container_width=True, hide_index=True, column_config={"Gecikme Günü": "Gecikme Günü", "Son İşlem Tarihi": st.column_config.DateColumn(format="YYYY-MM-DD")})
-        else:
-            st.success("Belirlenen kriterde uyuyan müşteri bulunamadı.")
+@st.fragment
+def bolum_rfm_segmentleri(musteri_analitigi, veri_surumu):
+    st.markdown("---")
+    st.subheader("🧭 Müşteri Segmentleri (RFM)")
+    st.caption("Yakınlık: en yeni açık işlemin günü · Sıklık: işlem sayısı · Tutar: yıllık ciro. Her gösterge 1-5 arası puanlanır.")
+    st.dataframe(musteri_analitigi.segment_ozeti(), use_container_width=True, hide_index=True, column_config={
+        'Toplam Ciro': st.column_config.NumberColumn("Toplam Ciro (TL)", format="localized"),
+        'Toplam Bakiye': st.column_config.NumberColumn("Toplam Bakiye (TL)", format="localized"),
+        'Ort. R': st.column_config.NumberColumn(format="%.2f"), 'Ort. F': st.column_config.NumberColumn(format="%.2f"), 'Ort. M': st.column_config.NumberColumn(format="%.2f"),
+    })
+    segment = st.selectbox("Segment müşterileri:", RFM_SEGMENTLERI, key='rfm_segment')
+    segment_musterileri = musteri_analitigi.segment(segment)[['Müşteri', 'ST', 'İlçe', 'İşlem Sayısı', 'Son İşlem Günü', 'Ciro', 'Bakiye', 'R', 'F', 'M']]
+    sayfali_tablo(
+        segment_musterileri, 'rfm', siralama=('Ciro', False),
+        column_config={'Ciro': st.column_config.NumberColumn("Ciro (TL)", format="localized"), 'Bakiye': st.column_config.NumberColumn("Bakiye (TL)", format="localized")},
+    )
+    indirme_dugmeleri(segment_musterileri, f"musteriler_{segment}", ('rfm', segment), veri_surumu)
+
+@st.fragment
+def bolum_sadik_musteriler(musteri_analitigi):
+    st.markdown("---")
+    st.subheader("❤️ Sadık Müşteriler (İşlem Sayısı)")
+    top_n_sadik = st.slider("Listelenecek sadık müşteri sayısı:", 5, 50, 10, step=5, key='sadik_slider')
+    sadik_musteriler = musteri_analitigi.en_sadiklar(top_n_sadik)[['Müşteri', 'İşlem Sayısı']]
+    sadik_musteriler.columns = ['Müşteri Adı', 'Toplam İşlem Sayısı']
+    st.dataframe(sadik_musteriler, use_container_width=True, hide_index=True)
+
+@st.fragment
+def bolum_uyuyan_musteriler(musteri_analitigi):
+    st.markdown("---")
+    st.subheader("😴 'Uyuyan' Müşteriler (Son İşlem Tarihine Göre)")
+    gecikme_gunu = st.slider("İşlem görmeyen minimum gün sayısı:", 30, 180, 60)
+    # Müşteriler gecikme gününe göre önceden sıralı; eşik bir ikili arama ve dilimdir.
+    uyuyan_musteriler = musteri_analitigi.uyuyan_musteriler(gecikme_gunu)
+    if not uyuyan_musteriler.empty:
+        st.info(f"Son işlemi **{gecikme_gunu} günden** eski olan müşteriler listeleniyor.")
+        sayfali_tablo(uyuyan_musteriler[['Müşteri', 'Gecikme Günü', 'Son İşlem Tarihi']], 'uyuyan', siralama=('Gecikme Günü', False), sirali=True, column_config={"Son İşlem Tarihi": st.column_config.DateColumn(format="YYYY-MM-DD")})
     else:
-        st.warning("Sadık ve uyuyan müşterileri analiz etmek için `rapor.xls` dosyası gereklidir.")
-def page_log_raporlari():
+        st.success("Belirlenen kriterde uyuyan müşteri bulunamadı.")
+def page_log_raporlari(bellek_raporu, yukleme_raporu):
     st.title("🗒️ Kullanıcı Aktivite Logları")
-    log_file = 'loglar.csv'
     try:
-        log_df = pd.read_csv(log_file)
-        log_df = log_df.sort_values(by='Zaman Damgası', ascending=False)
-        st.info("Kullanıcıların sisteme giriş ve sayfa ziyaret aktiviteleri aşağıda listelenmiştir.")
-        st.dataframe(log_df, use_container_width=True, hide_index=True)
-    except FileNotFoundError:
-        st.warning("Henüz herhangi bir log kaydı bulunmamaktadır.")
+        motor = log_sorgu_motoru()
+        motor.yenile()
+        zaman_araligi = motor.zaman_araligi()
+        if zaman_araligi is None:
+            st.warning("Henüz herhangi bir log kaydı bulunmamaktadır.")
+        else:
+            st.info("Kullanıcıların sisteme giriş ve sayfa ziyaret aktiviteleri aşağıda listelenmiştir.")
+            col1, col2, col3, col4 = st.columns(4)
+            secilen_kullanici = col1.selectbox("Kullanıcı", ["Tümü"] + motor.secenekler('kullanici'), key='log_kullanici')
+            secilen_sayfa = col2.selectbox("Sayfa", ["Tümü"] + motor.secenekler('sayfa'), key='log_sayfa')
+            secilen_tur = col3.selectbox("Aktivite", ["Tümü"] + motor.secenekler('tur'), key='log_tur')
+            ilk_gun, son_gun = zaman_araligi[0].date(), zaman_araligi[1].date()
+            tarih_araligi = col4.date_input("Tarih Aralığı", value=(ilk_gun, son_gun), min_value=ilk_gun, max_value=son_gun, key='log_tarih')
+            col5, col6 = st.columns([1, 3])
+            sayfa_boyutu = col5.selectbox("Sayfa başına kayıt", [25, 50, 100, 250], index=1, key='log_sayfa_boyutu')
+            sayfa_no = col6.number_input("Sayfa", min_value=1, value=1, step=1, key='log_sayfa_no')
+            baslangic = pd.Timestamp(tarih_araligi[0]) if len(tarih_araligi) > 0 else None
+            bitis = pd.Timestamp(tarih_araligi[1]) + timedelta(days=1) if len(tarih_araligi) > 1 else None
+            log_df, toplam_kayit = motor.sorgula(
+                kullanici=None if secilen_kullanici == "Tümü" else secilen_kullanici,
+                sayfa=None if secilen_sayfa == "Tümü" else secilen_sayfa,
+                tur=None if secilen_tur == "Tümü" else secilen_tur,
+                baslangic=baslangic, bitis=bitis, sayfa_no=sayfa_no - 1, sayfa_boyutu=sayfa_boyutu,
+            )
+            toplam_sayfa = max((toplam_kayit + sayfa_boyutu - 1) // sayfa_boyutu, 1)
+            st.caption(f"Toplam {toplam_kayit} kayıt · Sayfa {sayfa_no} / {toplam_sayfa}")
+            st.dataframe(log_df, use_container_width=True, hide_index=True, column_config={"Zaman Damgası": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm:ss")})
+            with st.expander("Günlük Sayfa Ziyaretleri"):
+                ziyaretler = motor.gunluk_sayfa_ziyaretleri()
+                st.dataframe(ziyaretler.pivot_table(index='Gün', columns='Sayfa Adı', values='Ziyaret Sayısı', fill_value=0).sort_index(ascending=False), use_container_width=True)
+            with st.expander("Kullanıcı Girişleri"):
+                st.dataframe(motor.kullanici_girisleri(), use_container_width=True, hide_index=True)
     except Exception as e:
         st.error(f"Log raporları okunurken bir hata oluştu: {e}")
+    with st.expander("Veri Bellek Kullanımı"):
+        st.dataframe(bellek_raporu, use_container_width=True, hide_index=True, column_config={"Bellek (MB)": st.column_config.NumberColumn(format="%.2f MB")})
+    with st.expander("Veri Yükleme Süreleri"):
+        st.dataframe(yukleme_raporu, use_container_width=True, hide_index=True, column_config={"Ayrıştırma (sn)": st.column_config.NumberColumn(format="%.3f"), "Toplam (sn)": st.column_config.NumberColumn(format="%.3f")})
+
+# Duyarlılık ızgarası: her eksen ilgili slider'ın değer aralığını ve adımını izler.
+SENARYO_EKSENLERI = {
+    'Tahsilat': ("Vadesi Geçmiş Tahsilat Oranı (%)", np.arange(0, 101, 5)),
+    'İskonto': ("Genel Satış İskonto Oranı (%)", np.arange(0, 51, 1)),
+    'Maliyet': ("Ortalama Ürün Maliyet Oranı (%)", np.arange(0, 101, 1)),
+}
+
+# Tahmin (veri sürümü, parametreler) başına bir kez hesaplanır; slider'lar önceki bir
+# değere döndüğünde sonuç önbellekten gelir.
+@olcum.cagri_sayaci('tahsilat_tahmini')
+@st.cache_data(max_entries=32)
+@olcum.hesaplama_sayaci('tahsilat_tahmini')
+def tahsilat_tahmini_hesapla(_tahsilat_simulasyonu, veri_surumu, kova_olasiliklari, temsilci_oynakligi, kosu_sayisi):
+    return _tahsilat_simulasyonu.tahmin(kova_olasiliklari, temsilci_oynakligi, kosu_sayisi)
 
-def page_senaryo_analizi(satis_df, stok_df, satis_hedef_df):
+def bolum_tahsilat_tahmini(tahsilat_simulasyonu, veri_surumu):
+    st.markdown("---")
+    st.subheader("Monte Carlo Tahsilat Tahmini")
+    if tahsilat_simulasyonu is None:
+        st.warning("Tahsilat tahmini için `rapor.xls` dosyasının yüklenmiş olması gerekmektedir.")
+        return
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        with st.expander("Kova Bazında Tahsilat Olasılıkları (%)", expanded=False):
+            kova_olasiliklari = tuple(
+                st.slider(kova, 0, 100, int(round(olasilik * 100)), 5, key=f"mc_kova_{i}") / 100
+                for i, (kova, olasilik) in enumerate(zip(TAHSILAT_KOVALARI, TAHSILAT_OLASILIKLARI))
+            )
+        temsilci_oynakligi = st.slider("Temsilci Bazında Oynaklık (%)", 0, 100, 25, 5, key="mc_oynaklik") / 100
+        kosu_sayisi = st.selectbox("Simülasyon Sayısı", [1000, 5000, 10000, 20000], index=1, key="mc_kosu")
+    tahmin = tahsilat_tahmini_hesapla(tahsilat_simulasyonu, veri_surumu, kova_olasiliklari, temsilci_oynakligi, kosu_sayisi)
+    with col2:
+        kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+        kpi1.metric("Açık Bakiye", tl(tahmin['acik_bakiye'], ondalik=0))
+        for kpi, (etiket, deger) in zip((kpi2, kpi3, kpi4), tahmin['yuzdelikler'].items()):
+            kpi.metric(f"Tahsilat {etiket}", tl(deger, ondalik=0))
+        fig = go.Figure(go.Histogram(x=tahmin['kosular'], nbinsx=60, marker_color='#FDB022', hovertemplate="%{x:,.0f} TL<br>%{y} koşu<extra></extra>"))
+        for etiket, deger in tahmin['yuzdelikler'].items():
+            fig.add_vline(x=deger, line_dash='dash', line_color='#3B2F8E', annotation_text=etiket)
+        fig.update_layout(xaxis_title="Toplam Tahsilat (TL)", yaxis_title="Koşu Sayısı", separators=PLOTLY_AYIRICILARI, height=350, bargap=0.05)
+        st.plotly_chart(fig, use_container_width=True)
+    tl_sutunlari = {sutun: st.column_config.NumberColumn(f"{sutun} (TL)", format="localized") for sutun in ['Açık Bakiye', 'P10', 'P50', 'P90']}
+    tab1, tab2 = st.tabs(["Temsilci Bazında", "Kova Bazında"])
+    with tab1:
+        st.dataframe(tahmin['temsilciler'].reset_index(), use_container_width=True, hide_index=True, column_config=tl_sutunlari)
+    with tab2:
+        st.dataframe(tahmin['kovalar'].reset_index(), use_container_width=True, hide_index=True, column_config=tl_sutunlari)
+
+def page_senaryo_analizi(senaryo_motoru, tahsilat_simulasyonu, veri_surumu):
     st.title("♟️ Senaryo Analizi (What-If)")
-    if satis_df is None or stok_df is None or satis_hedef_df is None or satis_hedef_df.empty:
+    if senaryo_motoru is None:
         st.warning("Bu modülün çalışması için `rapor.xls`, `stok.xls` ve `satis-hedef.xlsx` dosyalarının yüklenmiş olması gerekmektedir.")
         return
-    try:
-        total_row = satis_hedef_df[satis_hedef_df['Satış Temsilcisi'].str.strip() == 'TOPLAM']
-        mevcut_toplam_satis = total_row['SATIŞ'].sum()
-    except Exception:
-        st.error("`satis-hedef.xlsx` dosyasındaki TOPLAM satırları okunamadı. Lütfen dosya formatını kontrol edin.")
-        return
-    mevcut_toplam_bakiye = satis_df['Kalan Tutar Total'].sum()
-    vadesi_gecmis_df = satis_df[(satis_df['Gün'] > 0) & (satis_df['Kalan Tutar Total'] > 0)]
-    toplam_vadesi_gecmis = vadesi_gecmis_df['Kalan Tutar Total'].sum()
-    mevcut_stok_degeri = stok_df['Brüt Tutar'].sum()
     st.markdown("---")
     st.subheader("Genel Performans Simülasyonu")
     col1, col2 = st.columns([1, 2])
     with col1:
         satis_degisim_yuzde = st.slider("Satış Performansı Değişimi (%)", -50, 100, 0, 1, key="satis_slider")
         tahsilat_yuzde = st.slider("Vadesi Geçmiş Tahsilat Oranı (%)", 0, 100, 0, 5, key="tahsilat_slider")
-    with col2:
-        simulasyon_satis = mevcut_toplam_satis * (1 + satis_degisim_yuzde / 100)
-        satis_fark = simulasyon_satis - mevcut_toplam_satis
-        tahsil_edilen_tutar = toplam_vadesi_gecmis * (tahsilat_yuzde / 100)
-        simulasyon_bakiye = mevcut_toplam_bakiye - tahsil_edilen_tutar
-        kpi1, kpi2 = st.columns(2)
-        kpi1.metric("Mevcut Ciro", f"₺{mevcut_toplam_satis:,.0f}")
-        kpi2.metric("Simülasyon Sonrası Ciro", f"₺{simulasyon_satis:,.0f}", delta=f"₺{satis_fark:,.0f}")
-        kpi3, kpi4 = st.columns(2)
-        kpi3.metric("Mevcut Toplam Bakiye", f"₺{mevcut_toplam_bakiye:,.0f}")
-        kpi4.metric("Simülasyon Sonrası Bakiye", f"₺{simulasyon_bakiye:,.0f}", delta=f"-₺{tahsil_edilen_tutar:,.0f}", delta_color="inverse")
-    
     st.markdown("---")
     st.subheader("Stok ve Kârlılık Simülasyonu")
     col3, col4 = st.columns([1, 2])
@@ -607,20 +739,90 @@ def page_senaryo_analizi(satis_df, stok_df, satis_hedef_df):
         stok_zam_yuzde = st.slider("Stok Değerine Zam Oranı (%)", 0, 50, 0, 1)
         maliyet_orani = st.slider("Ortalama Ürün Maliyet Oranı (%)", 0, 100, 75, 1)
         iskonto_orani = st.slider("Genel Satış İskonto Oranı (%)", 0, 50, 0, 1)
+    oranlar = dict(satis_degisim=satis_degisim_yuzde / 100, tahsilat=tahsilat_yuzde / 100, iskonto=iskonto_orani / 100, maliyet=maliyet_orani / 100)
+    sonuc = senaryo_motoru.degerlendir(stok_zam=stok_zam_yuzde / 100, **oranlar)
+    with col2:
+        kpi1, kpi2 = st.columns(2)
+        kpi1.metric("Mevcut Ciro", tl(senaryo_motoru.ciro, ondalik=0))
+        kpi2.metric("Simülasyon Sonrası Ciro", tl(sonuc['Ciro'], ondalik=0), delta=tl(sonuc['Ciro Farkı'], ondalik=0))
+        kpi3, kpi4 = st.columns(2)
+        kpi3.metric("Mevcut Toplam Bakiye", tl(senaryo_motoru.bakiye, ondalik=0))
+        kpi4.metric("Simülasyon Sonrası Bakiye", tl(sonuc['Bakiye'], ondalik=0), delta=tl(-sonuc['Tahsil Edilen'], ondalik=0), delta_color="inverse")
     with col4:
-        simulasyon_stok_degeri = mevcut_stok_degeri * (1 + stok_zam_yuzde / 100)
-        stok_deger_artisi = simulasyon_stok_degeri - mevcut_stok_degeri
-        iskontolu_satis = simulasyon_satis * (1 - iskonto_orani / 100)
-        toplam_maliyet = iskontolu_satis * (maliyet_orani / 100)
-        brut_kar = iskontolu_satis - toplam_maliyet
         kpi5, kpi6 = st.columns(2)
-        kpi5.metric("Mevcut Stok Değeri", f"₺{mevcut_stok_degeri:,.0f}")
-        kpi6.metric("Zam Sonrası Stok Değeri", f"₺{simulasyon_stok_degeri:,.0f}", delta=f"₺{stok_deger_artisi:,.0f}")
+        kpi5.metric("Mevcut Stok Değeri", tl(senaryo_motoru.stok_degeri, ondalik=0))
+        kpi6.metric("Zam Sonrası Stok Değeri", tl(sonuc['Stok Değeri'], ondalik=0), delta=tl(sonuc['Stok Değeri'] - senaryo_motoru.stok_degeri, ondalik=0))
         st.markdown("")
         kpi7, kpi8, kpi9 = st.columns(3)
-        kpi7.metric("İskontolu Ciro", f"₺{iskontolu_satis:,.0f}")
-        kpi8.metric("Toplam Maliyet", f"₺{toplam_maliyet:,.0f}")
-        kpi9.metric("Brüt Kâr", f"₺{brut_kar:,.0f}")
+        kpi7.metric("İskontolu Ciro", tl(sonuc['İskontolu Ciro'], ondalik=0))
+        kpi8.metric("Toplam Maliyet", tl(sonuc['Toplam Maliyet'], ondalik=0))
+        kpi9.metric("Brüt Kâr", tl(sonuc['Brüt Kâr'], ondalik=0))
+
+    st.markdown("---")
+    st.subheader("Duyarlılık Analizi")
+    col5, col6 = st.columns(2)
+    with col5:
+        olcu = st.selectbox("Gösterilecek Sonuç", ['Brüt Kâr', 'Nakit Girişi', 'Bakiye', 'İskontolu Ciro'], key="senaryo_olcu")
+    with col6:
+        eksenler = st.selectbox("Eksenler", ['İskonto × Maliyet', 'Tahsilat × İskonto', 'Tahsilat × Maliyet'], key="senaryo_eksenler")
+    dikey, yatay = eksenler.split(' × ')
+    with olcum.asama("duyarlılık ızgarası"):
+        izgara = senaryo_motoru.izgara(*(deger / 100 for _, deger in SENARYO_EKSENLERI.values()), satis_degisim=oranlar['satis_degisim'])
+    # Izgarada yer almayan eksen, ilgili slider'ın değerinde sabitlenir.
+    sabit = {'Tahsilat': tahsilat_yuzde, 'İskonto': iskonto_orani, 'Maliyet': maliyet_orani}
+    dilim = tuple(slice(None) if eksen in (dikey, yatay) else int(np.searchsorted(degerler, sabit[eksen])) for eksen, (_, degerler) in SENARYO_EKSENLERI.items())
+    fig = go.Figure(go.Heatmap(
+        z=izgara[olcu][dilim], x=SENARYO_EKSENLERI[yatay][1], y=SENARYO_EKSENLERI[dikey][1], colorscale='RdYlGn',
+        hovertemplate=f"{dikey}: %{{y}}%<br>{yatay}: %{{x}}%<br>{olcu}: %{{z:,.0f}} TL<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title=SENARYO_EKSENLERI[yatay][0], yaxis_title=SENARYO_EKSENLERI[dikey][0], separators=PLOTLY_AYIRICILARI, height=500)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("---")
+    st.subheader("Kırılımlar")
+    tl_sutunu = lambda etiket: st.column_config.NumberColumn(etiket, format="localized")
+    tab1, tab2 = st.tabs(["Temsilci Bazında", "Depo Bazında"])
+    with tab1:
+        temsilciler = senaryo_motoru.temsilci_kirilimi(**oranlar)
+        st.dataframe(
+            temsilciler[['Temsilci', 'Ciro', 'Ciro Farkı', 'Bakiye', 'Tahsil Edilen', 'İskontolu Ciro', 'Brüt Kâr']].rename(columns={'Ciro': 'Simülasyon Ciro', 'Bakiye': 'Simülasyon Bakiye'}),
+            use_container_width=True, hide_index=True,
+            column_config={sutun: tl_sutunu(f"{sutun} (TL)") for sutun in ['Simülasyon Ciro', 'Ciro Farkı', 'Simülasyon Bakiye', 'Tahsil Edilen', 'İskontolu Ciro', 'Brüt Kâr']},
+        )
+    with tab2:
+        st.dataframe(
+            senaryo_motoru.depo_kirilimi(stok_zam_yuzde / 100), use_container_width=True, hide_index=True,
+            column_config={'Stok Değeri': tl_sutunu("Mevcut Stok Değeri (TL)"), 'Zam Sonrası': tl_sutunu("Zam Sonrası Stok Değeri (TL)")},
+        )
+    bolum_tahsilat_tahmini(tahsilat_simulasyonu, veri_surumu)
+
+def page_performans(oturum):
+    st.title("⏱️ Performans Ölçümleri")
+    acik = st.toggle("Ölçüm açık", value=olcum.acik_mi(), key='olcum_acik', help=f"Kapalıyken ölçüm maliyeti ihmal edilebilir. Uygulama `{olcum.OLCUM_ORTAM_DEGISKENI}=1` ile başlatılırsa varsayılan olarak açıktır.")
+    if acik != olcum.acik_mi():
+        olcum.etkinlestir(acik)
+    col1, col2 = st.columns([3, 1])
+    sadece_bu_oturum = col1.checkbox("Yalnızca bu oturum", value=False, key='olcum_oturum')
+    if col2.button("Ölçümleri Sıfırla", key='olcum_sifirla'):
+        olcum.sifirla()
+    rapor = olcum.yuzdelik_raporu(oturum if sadece_bu_oturum else None)
+    if rapor.empty:
+        st.info("Henüz ölçüm yok. Ölçümü açıp diğer sayfaları ziyaret edin.")
+    else:
+        st.subheader("Sayfa ve Aşama Süreleri")
+        st.dataframe(rapor, use_container_width=True, hide_index=True, column_config={
+            sutun: st.column_config.NumberColumn(format="%.1f") for sutun in ['p50 (ms)', 'p95 (ms)', 'En Büyük (ms)', 'Ort. Satır']
+        })
+        sayfalar = rapor[rapor['Tür'] == 'sayfa']
+        if not sayfalar.empty:
+            fig = px.bar(sayfalar, x='Sayfa', y=['p50 (ms)', 'p95 (ms)'], barmode='group', labels={'value': "Süre (ms)", 'variable': ""})
+            fig.update_layout(separators=PLOTLY_AYIRICILARI, height=400)
+            st.plotly_chart(fig, use_container_width=True)
+    st.subheader("Önbellek İsabetleri")
+    st.dataframe(olcum.sayac_tablosu(), use_container_width=True, hide_index=True, column_config={"İsabet Oranı": st.column_config.ProgressColumn(min_value=0, max_value=1, format="percent")})
+    with st.expander("Son Kayıtlar"):
+        st.dataframe(olcum.kayit_tablosu().tail(500).iloc[::-1], use_container_width=True, hide_index=True)
+
 def add_developer_credit():
     st.markdown("""
     <style>
@@ -638,7 +840,9 @@ def add_developer_credit():
     <div class='developer-credit'>DEVELOPED BY FATİH BAKICI</div>
     """, unsafe_allow_html=True)
 
-def main_app(satis_df, stok_df, satis_hedef_df, solen_borcu_degeri, ilce_df):
+def main_app(veri):
+    satis_df, stok_df, satis_hedef_df, solen_borcu_degeri, ilce_df = veri['satis'], veri['stok'], veri['satis_hedef'], veri['solen_borcu'], veri['ilce']
+    yaslandirma_kupu, gecikme_indeksi = veri['yaslandirma_kupu'], veri['gecikme_indeksi']
     st.markdown("""
     <style>
     div[data-testid="stMetric"] { background-color: #F7F7F7 !important; border: 2px solid #FDB022 !important; border-radius: 10px !important; padding: 20px !important; transition: transform 0.3s ease-in-out, box-shadow 0.3s ease-in-out !important; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1) !important; }
@@ -656,12 +860,12 @@ def main_app(satis_df, stok_df, satis_hedef_df, solen_borcu_degeri, ilce_df):
         st.image("logo.jpeg", use_container_width=True)
         st.markdown("""<style>@import url('https://fonts.googleapis.com/css2?family=Exo+2:wght@700&display=swap');</style><div style="font-family: 'Exo 2', sans-serif; font-size: 28px; text-align: center; margin-bottom: 20px;"><span style="color: #FDB022;">ÖZLİDER TÜKETİM</span><span style="color: #E6EAF5;">- ŞÖLEN CRM</span></div>""", unsafe_allow_html=True)
         
-        menu_options = ["Genel Bakış", "Tüm Temsilciler", "Satış/Hedef", "Yaşlandırma", "Stok", "Müşteri Analizi", "Şölen", "Hizmet Faturaları", "Senaryo Analizi"]
-        menu_icons = ['graph-up', 'people-fill', 'bullseye', 'clock-history', 'box-seam', 'person-lines-fill', 'gift-fill', 'receipt-cutoff', 'robot']
+        menu_options = ["Genel Bakış", "Tüm Temsilciler", "Satış/Hedef", "Yaşlandırma", "Stok", "Müşteri Analizi", "Şölen", "Hizmet Faturaları", "Senaryo Analizi", "Satış Geçmişi"]
+        menu_icons = ['graph-up', 'people-fill', 'bullseye', 'clock-history', 'box-seam', 'person-lines-fill', 'gift-fill', 'receipt-cutoff', 'robot', 'calendar3']
         
         if st.session_state.get('current_user') == "Fatih Bakıcı":
-            menu_options.append("Log Raporları")
-            menu_icons.append('book')
+            menu_options.extend(["Log Raporları", "Performans"])
+            menu_icons.extend(['book', 'speedometer2'])
             
         secim = option_menu(menu_title=None, options=menu_options, icons=menu_icons, menu_icon="cast", default_index=0, orientation="vertical", styles={"container": {"padding": "0!important", "background-color": "transparent"}, "icon": {"color": "#FDB022", "font-size": "20px"}, "nav-link": {"font-size": "16px", "text-align": "left", "margin":"5px", "--hover-color": "#111A33"}, "nav-link-selected": {"background-color": "#3B2F8E"},})
 
@@ -669,27 +873,34 @@ def main_app(satis_df, stok_df, satis_hedef_df, solen_borcu_degeri, ilce_df):
         log_user_activity(st.session_state['current_user'], f"Sayfa ziyareti: {secim}", page_name=secim)
         st.session_state['last_page'] = secim
 
-    if secim == "Genel Bakış":
-        page_genel_bakis(satis_df, stok_df, solen_borcu_degeri)
-    elif secim == "Tüm Temsilciler":
-        page_tum_temsilciler(satis_df, satis_hedef_df)
-    elif secim == "Satış/Hedef":
-        page_satis_hedef(satis_hedef_df)
-    elif secim == "Yaşlandırma":
-        page_yaslandirma(satis_df)
-    elif secim == "Stok":
-        page_stok(stok_df)
-    elif secim == "Müşteri Analizi":
-        page_musteri_analizi(satis_df, ilce_df)
-    elif secim == "Şölen":
-        page_solen(solen_borcu_degeri)
-    elif secim == "Hizmet Faturaları":
-        page_hizmet_faturalari()
-    elif secim == "Log Raporları":
-        page_log_raporlari()
-    elif secim == "Senaryo Analizi":
-        page_senaryo_analizi(satis_df, stok_df, satis_hedef_df)
-        
+    # Sayfa çiziminin tamamı ve içindeki aşamalar ölçülür (bkz. olcum; kapalıyken maliyetsizdir).
+    oturum = get_script_run_ctx().session_id if get_script_run_ctx() else None
+    with olcum.sayfa(secim, oturum=oturum):
+        if secim == "Genel Bakış":
+            page_genel_bakis(veri['satis_ozeti'], stok_df, solen_borcu_degeri)
+        elif secim == "Tüm Temsilciler":
+            page_tum_temsilciler(satis_df, satis_hedef_df, yaslandirma_kupu, veri['temsilci_satislari'], veri.surumler.get('satis'))
+        elif secim == "Satış/Hedef":
+            page_satis_hedef(satis_hedef_df)
+        elif secim == "Yaşlandırma":
+            page_yaslandirma(satis_df, yaslandirma_kupu, gecikme_indeksi, veri['defter_degisiklikleri'], veri.surumler.get('satis'))
+        elif secim == "Stok":
+            page_stok(stok_df, veri['stok_modeli'], veri.surumler.get('stok_modeli'))
+        elif secim == "Müşteri Analizi":
+            page_musteri_analizi(ilce_df, veri['ilce_metrikleri'], veri.surumler.get('ilce'), veri['musteri_analitigi'], veri.surumler.get('musteri_analitigi'))
+        elif secim == "Şölen":
+            page_solen(solen_borcu_degeri)
+        elif secim == "Hizmet Faturaları":
+            page_hizmet_faturalari()
+        elif secim == "Satış Geçmişi":
+            page_satis_gecmisi(veri['gecmis_toplamlari'], veri['satis_gecmisi'].attrs.get('sorunlar', []) if veri['satis_gecmisi'] is not None else [])
+        elif secim == "Log Raporları":
+            page_log_raporlari(veri.bellek_raporu(), veri.yukleme_raporu())
+        elif secim == "Performans":
+            page_performans(oturum)
+        elif secim == "Senaryo Analizi":
+            page_senaryo_analizi(veri['senaryo_motoru'], veri['tahsilat_simulasyonu'], veri.surumler.get('satis'))
+
     add_developer_credit()
 
 def login_page():
@@ -724,18 +935,30 @@ def login_page():
             st.markdown("</div>", unsafe_allow_html=True)
 
 # --- ANA KOD AKIŞI ---
-satis_df_cache = satis_veri_yukle('rapor.xls')
-stok_df_cache = stok_veri_yukle('stok.xls')
-satis_hedef_df_raw_cache = satis_hedef_veri_yukle('satis-hedef.xlsx')
-solen_borcu_degeri_cache = solen_borc_excel_oku('solen_borc.xlsx')
-temiz_satis_hedef_df_cache = parse_satis_hedef_excel_robust(satis_hedef_df_raw_cache)
-ilce_df_cache = adana_ilce_veri_yukle('adana_ilce_ciro.xlsx')
-
+@st.cache_resource
+def veri_izleyici_baslat():
+    # Süreç başına tek izleyici: değişen çalışma kitabını arka planda yeniden okur.
+    return VeriIzleyici()
+
+@st.fragment(run_every=5)
+def veri_degisikligi_kontrol(goruntu):
+    # İzleyici yeni bir görüntü yayınladıysa oturum kendiliğinden yenilenir.
+    if veri_izleyici_baslat().goruntu() is not goruntu:
+        st.rerun()
+
+# Görüntü çalışma başında bir kez alınır; arka planda gelen yeni veri bir sonraki çalışmada görünür.
+veri = veri_izleyici_baslat().goruntu()
+for hata_mesaji in veri.hatalar.values():
+    st.error(hata_mesaji)
+if veri.yukleniyor:
+    bekleyenler = [KAYNAKLAR[anahtar][2] if okunan_satir is None else f"{KAYNAKLAR[anahtar][2]} ({okunan_satir:,} satır okundu)" for anahtar, okunan_satir in veri.yukleniyor.items()]
+    st.info(f"Veriler yükleniyor: {', '.join(bekleyenler)}. Sayfa, hazır olan verilerle güncelleniyor.")
 
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
 
 if st.session_state['logged_in']:
-    main_app(satis_df_cache, stok_df_cache, temiz_satis_hedef_df_cache, solen_borcu_degeri_cache, ilce_df_cache)
+    veri_degisikligi_kontrol(veri)
+    main_app(veri)
 else:
     login_page()
\ No newline at end of file
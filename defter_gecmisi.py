@@ -0,0 +1,175 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from analiz import TAHSILAT_KOVALARI, YASLANDIRMA_SINIRLARI
+from veri_onbellek import atomik_yaz, meta_oku, meta_yaz
+
+# --- Satış Defteri Anlık Görüntüleri ---
+# Her yeni rapor.xls (ST, Müşteri) düzeyine indirgenip saklanır: bakiye, vadesi geçmiş tutar ve
+# en eski vadesi geçmiş satırın yaşlandırma kovası. Gecikme günü her gün bütün müşterilerde
+# arttığından saklanmaz; aksi halde her fark neredeyse tam görüntü olurdu. Görüntüler ardışık farklar olarak yazılır; her
+# ANAHTAR_ARALIGI görüntüde bir tam görüntü (anahtar kare) de yazılır. Bir görüntüyü kurmak için
+# en yakın anahtar kareye sonraki farklar uygulanır. Fark dosyaları değişen satırların hem önceki
+# hem yeni değerlerini taşıdığından "son görüntüden bu yana değişiklikler" doğrudan okunur.
+#   defter_gecmisi/katalog.json
+#   defter_gecmisi/000000-20250825-093012-anahtar.arrow, defter_gecmisi/000001-20250826-091544-fark.arrow, ...
+# Dosya adının başındaki sıra numarası katalogdaki yeridir; aynı saniyede eklenen iki görüntü
+# birbirinin dosyasının üzerine yazamaz.
+DEFTER_KLASORU = 'defter_gecmisi'
+KATALOG_DOSYASI = 'katalog.json'
+ANAHTAR_ARALIGI = 30
+DEFTER_ANAHTARLARI = ['ST', 'Müşteri']
+DEFTER_DEGERLERI = ['Bakiye', 'Gecikmiş', 'Kova']
+# Kuruş altı farklar değişiklik sayılmaz.
+BAKIYE_TOLERANSI = 0.005
+DURUMLAR = ['Yeni', 'Kapandı', 'Değişti']
+
+def defteri_indirge(satis_df, sinirlar=YASLANDIRMA_SINIRLARI):
+    # Satır düzeyindeki defter -> (ST, Müşteri) başına bir satır. Kova, pozitif bakiyeli en eski
+    # vadesi geçmiş satıra göre belirlenir; vadesi geçmiş alacağı olmayan müşteri kova 0'dadır.
+    tutar = satis_df['Kalan Tutar Total']
+    gecikmis = (satis_df['Gün'] > 0) & (tutar > 0)
+    df = pd.DataFrame({
+        'ST': satis_df['ST'].astype(str), 'Müşteri': satis_df['Müşteri'].astype(str), 'Bakiye': tutar,
+        'Gecikmiş': tutar.where(gecikmis, 0.0), 'Gün': satis_df['Gün'].where(gecikmis, 0).fillna(0),
+    })
+    df = df.groupby(DEFTER_ANAHTARLARI, sort=True).agg({'Bakiye': 'sum', 'Gecikmiş': 'sum', 'Gün': 'max'}).reset_index()
+    gun = df.pop('Gün').to_numpy()
+    df['Kova'] = np.where(gun > 0, np.searchsorted(sinirlar, gun, side='left') + 1, 0).astype(np.int8)
+    return df
+
+def defter_farki(onceki, simdi):
+    # İki indirgenmiş defterin (ST, Müşteri) üzerinden hash join ile farkı: yalnızca yeni, kapanan
+    # ve bakiyesi ya da kovası değişen satırlar; önceki değerler 'Önceki ...' sütunlarındadır.
+    birlesik = onceki.merge(simdi, on=DEFTER_ANAHTARLARI, how='outer', suffixes=(' (önceki)', ''), indicator=True)
+    durum = np.select(
+        [birlesik['_merge'] == 'right_only', birlesik['_merge'] == 'left_only'], ['Yeni', 'Kapandı'], 'Değişti')
+    degisti = (
+        (birlesik['Bakiye'] - birlesik['Bakiye (önceki)']).abs().gt(BAKIYE_TOLERANSI)
+        | (birlesik['Gecikmiş'] - birlesik['Gecikmiş (önceki)']).abs().gt(BAKIYE_TOLERANSI)
+        | birlesik['Kova'].ne(birlesik['Kova (önceki)'])
+    )
+    secili = (durum != 'Değişti') | degisti.to_numpy()
+    fark = birlesik.loc[secili].drop(columns='_merge').rename(columns={f'{sutun} (önceki)': f'Önceki {sutun}' for sutun in DEFTER_DEGERLERI})
+    fark.insert(2, 'Durum', durum[secili])
+    for sutun in ['Bakiye', 'Gecikmiş', 'Önceki Bakiye', 'Önceki Gecikmiş']:
+        fark[sutun] = fark[sutun].fillna(0.0)
+    # Yeni müşterinin önceki, kapanan müşterinin yeni kovası -1'dir.
+    for sutun in ['Kova', 'Önceki Kova']:
+        fark[sutun] = fark[sutun].fillna(-1).astype(np.int8)
+    return fark.reset_index(drop=True)
+
+def farki_uygula(defter, fark):
+    kalan = defter.merge(fark[DEFTER_ANAHTARLARI], on=DEFTER_ANAHTARLARI, how='left', indicator=True)
+    kalan = kalan[kalan['_merge'] == 'left_only'].drop(columns='_merge')
+    eklenen = fark.loc[fark['Durum'] != 'Kapandı', DEFTER_ANAHTARLARI + DEFTER_DEGERLERI]
+    sonuc = pd.concat([kalan, eklenen], ignore_index=True).sort_values(DEFTER_ANAHTARLARI, ignore_index=True)
+    return sonuc.astype({'Kova': np.int8})
+
+class DefterGecmisi:
+    def __init__(self, klasor=DEFTER_KLASORU, anahtar_araligi=ANAHTAR_ARALIGI):
+        self.klasor = klasor
+        self.anahtar_araligi = anahtar_araligi
+        self.katalog_yolu = os.path.join(klasor, KATALOG_DOSYASI)
+
+    def katalog(self):
+        # Görüntüler zaman sırasıyla: [{'zaman', 'ozet', 'fark', 'anahtar', 'degisen'}, ...]
+        return meta_oku(self.katalog_yolu) or []
+
+    def _yaz(self, ad, df):
+        tablo = pa.Table.from_pandas(df, preserve_index=False)
+        atomik_yaz(os.path.join(self.klasor, ad), lambda yol: feather.write_feather(tablo, yol, compression='zstd'))
+        return ad
+
+    def _oku(self, ad):
+        return feather.read_table(os.path.join(self.klasor, ad)).to_pandas()
+
+    def defter(self, sira=-1):
+        # 'sira'ncı görüntüdeki indirgenmiş defter: en yakın önceki anahtar kare + farklar.
+        katalog = self.katalog()
+        if not katalog:
+            return None
+        sira = range(len(katalog))[sira]
+        baslangic = max(i for i in range(sira + 1) if katalog[i].get('anahtar'))
+        defter = self._oku(katalog[baslangic]['anahtar'])
+        for kayit in katalog[baslangic + 1:sira + 1]:
+            defter = farki_uygula(defter, self._oku(kayit['fark']))
+        return defter
+
+    def degisiklikler(self, sira=-1):
+        # 'sira'ncı görüntünün bir öncekine göre farkı; ilk görüntü için None.
+        katalog = self.katalog()
+        if not katalog or not katalog[sira].get('fark'):
+            return None
+        return self._oku(katalog[sira]['fark'])
+
+    def ekle(self, satis_df, zaman=None):
+        # İçeriği son görüntüyle aynı olan defter eklenmez; eklendiyse True döner.
+        simdi = defteri_indirge(satis_df)
+        ozet = format(int(pd.util.hash_pandas_object(simdi, index=False).sum()) & (2 ** 64 - 1), '016x')
+        katalog = self.katalog()
+        if katalog and katalog[-1]['ozet'] == ozet:
+            return False
+        os.makedirs(self.klasor, exist_ok=True)
+        zaman = zaman or datetime.now()
+        on_ek = f"{len(katalog):06d}-{zaman.strftime('%Y%m%d-%H%M%S')}"
+        kayit = {'zaman': zaman.isoformat(timespec='seconds'), 'ozet': ozet, 'satir': len(simdi)}
+        if katalog:
+            fark = defter_farki(self.defter(), simdi)
+            kayit['fark'] = self._yaz(f'{on_ek}-fark.arrow', fark)
+            kayit['degisen'] = len(fark)
+        if len(katalog) % self.anahtar_araligi == 0:
+            kayit['anahtar'] = self._yaz(f'{on_ek}-anahtar.arrow', simdi)
+        katalog.append(kayit)
+        meta_yaz(self.katalog_yolu, katalog)
+        return True
+
+# --- Son Görüntüden Bu Yana Değişiklikler ---
+class DefterDegisiklikleri:
+    def __init__(self, tablo, zaman, onceki_zaman):
+        self.tablo = tablo
+        self.zaman = zaman
+        self.onceki_zaman = onceki_zaman
+
+    def temsilci(self, temsilci=None):
+        if temsilci is None:
+            return self.tablo
+        return self.tablo[self.tablo['ST'] == temsilci]
+
+    def ozet(self, temsilci=None):
+        # Sayılar ve toplam bakiye değişimi; kova göçü ise kötüleşen / iyileşen müşteri sayısıdır.
+        df = self.temsilci(temsilci)
+        acik = (df['Kova'] >= 0) & (df['Önceki Kova'] >= 0)
+        return {
+            'yeni': int((df['Durum'] == 'Yeni').sum()),
+            'kapanan': int((df['Durum'] == 'Kapandı').sum()),
+            'odeme_yapan': int(((df['Durum'] == 'Değişti') & (df['Bakiye'] < df['Önceki Bakiye'] - BAKIYE_TOLERANSI)).sum()),
+            'kotulesen': int((acik & (df['Kova'] > df['Önceki Kova'])).sum()),
+            'iyilesen': int((acik & (df['Kova'] < df['Önceki Kova'])).sum()),
+            'bakiye_degisimi': float(df['Bakiye'].sum() - df['Önceki Bakiye'].sum()),
+        }
+
+    def kova_gocu(self, temsilci=None):
+        # Önceki kova × yeni kova müşteri sayıları (kapanan/yeni müşteriler hariç).
+        df = self.temsilci(temsilci)
+        df = df[(df['Kova'] >= 0) & (df['Önceki Kova'] >= 0)]
+        return pd.crosstab(
+            pd.Series(pd.Categorical.from_codes(df['Önceki Kova'], TAHSILAT_KOVALARI), name='Önceki Kova'),
+            pd.Series(pd.Categorical.from_codes(df['Kova'], TAHSILAT_KOVALARI), name='Kova'), dropna=False)
+
+def defter_degisiklikleri_olustur(satis_df, klasor=DEFTER_KLASORU):
+    # rapor.xls her yüklendiğinde görüntü deposuna eklenir; dönen nesne son görüntünün farkıdır.
+    if satis_df is None:
+        return None
+    gecmis = DefterGecmisi(klasor)
+    gecmis.ekle(satis_df)
+    katalog = gecmis.katalog()
+    fark = gecmis.degisiklikler()
+    if fark is None:
+        return None
+    return DefterDegisiklikleri(fark, katalog[-1]['zaman'], katalog[-2]['zaman'])
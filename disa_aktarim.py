@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+from para_bicimi import EXCEL_TL_BICIMI
+
+# --- Dışa Aktarım ---
+# Tablolar Excel, CSV ya da Parquet olarak parça parça geçici bir dosyaya yazılır ve dosya tek
+# seferde bayt olarak okunur. Bellekte tablonun kendisi ve bir parçası dışında yalnızca sonuç
+# baytları bulunur; BytesIO + getvalue() ile oluşan ikinci tam kopya oluşmaz.
+#   Excel    xlsxwriter constant_memory kipi: hücreler satır sırasıyla diske akar.
+#   CSV      Türkçe Excel'in doğrudan açabileceği biçim: ';' ayırıcı, ',' ondalık, UTF-8 BOM.
+#   Parquet  pyarrow ile satır grupları halinde; tipler (kategorik, tarih) korunur.
+# Arayüzdeki indirme düğmeleri dosyayı yalnızca tıklandığında üretir (bkz. crm_arayuz).
+PARCA_BOYUTU = 10000
+SUTUN_GENISLIGI = 18
+METIN_SUTUN_GENISLIGI = 50
+# bicim: (düğme etiketi, MIME türü)
+BICIMLER = {
+    'xlsx': ("Excel", 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ("CSV", 'text/csv'),
+    'parquet': ("Parquet", 'application/vnd.apache.parquet'),
+}
+
+def excel_sayfasi_yaz(calisma_kitabi, ad, df, tl_bicimi):
+    # constant_memory kipinde hücreler satır sırasıyla yazılmalıdır; bu yüzden pandas'ın (sütun
+    # sütun yazan) to_excel'i yerine satırlar tek tek yazılır. Ondalıklı sütunlar TL biçimindedir.
+    # Boş değerler boş hücre olur.
+    sayfa = calisma_kitabi.add_worksheet(ad)
+    for i, sutun in enumerate(df.columns):
+        if pd.api.types.is_float_dtype(df[sutun]):
+            sayfa.set_column(i, i, SUTUN_GENISLIGI, tl_bicimi)
+        elif sutun in ('Müşteri', 'Ürün'):
+            sayfa.set_column(i, i, METIN_SUTUN_GENISLIGI)
+    sayfa.write_row(0, 0, [str(sutun) for sutun in df.columns])
+    bos_olabilir = df.isna().any().any()
+    for baslangic in range(0, len(df), PARCA_BOYUTU):
+        parca = df.iloc[baslangic:baslangic + PARCA_BOYUTU]
+        if bos_olabilir:
+            parca = parca.astype(object).where(parca.notna(), None)
+        for i, satir in enumerate(parca.itertuples(index=False, name=None), start=baslangic + 1):
+            sayfa.write_row(i, 0, satir)
+    if len(df.columns):
+        sayfa.autofilter(0, 0, len(df), len(df.columns) - 1)
+    sayfa.freeze_panes(1, 0)
+
+def excel_yaz(df, dosya_yolu, sayfa_adi='Rapor'):
+    calisma_kitabi = xlsxwriter.Workbook(dosya_yolu, {'constant_memory': True})
+    excel_sayfasi_yaz(calisma_kitabi, sayfa_adi, df, calisma_kitabi.add_format({'num_format': EXCEL_TL_BICIMI}))
+    calisma_kitabi.close()
+
+def csv_yaz(df, dosya_yolu):
+    with open(dosya_yolu, 'w', encoding='utf-8-sig', newline='') as f:
+        for baslangic in range(0, max(len(df), 1), PARCA_BOYUTU):
+            df.iloc[baslangic:baslangic + PARCA_BOYUTU].to_csv(f, sep=';', decimal=',', index=False, header=baslangic == 0)
+
+def parquet_yaz(df, dosya_yolu):
+    yazici = None
+    try:
+        for baslangic in range(0, max(len(df), 1), PARCA_BOYUTU):
+            tablo = pa.Table.from_pandas(df.iloc[baslangic:baslangic + PARCA_BOYUTU], preserve_index=False)
+            if yazici is None:
+                yazici = pq.ParquetWriter(dosya_yolu, tablo.schema, compression='zstd')
+            yazici.write_table(tablo.cast(yazici.schema))
+    finally:
+        if yazici is not None:
+            yazici.close()
+
+YAZICILAR = {'xlsx': excel_yaz, 'csv': csv_yaz, 'parquet': parquet_yaz}
+
+def disa_aktar(df, bicim):
+    # Tabloyu istenen biçimde dosya baytlarına çevirir.
+    if bicim not in YAZICILAR:
+        raise ValueError(f"Desteklenmeyen dışa aktarım biçimi: {bicim}")
+    # Süzülmüş tablolardaki kategorik sütunlar tüm defterin kategorilerini taşır; yalnızca
+    # kullanılanlar yazılır.
+    kategorikler = {sutun: df[sutun].cat.remove_unused_categories() for sutun in df.columns if isinstance(df[sutun].dtype, pd.CategoricalDtype)}
+    if kategorikler:
+        df = df.assign(**kategorikler)
+    tanitici, dosya_yolu = tempfile.mkstemp(suffix=f'.{bicim}')
+    os.close(tanitici)
+    try:
+        YAZICILAR[bicim](df, dosya_yolu)
+        with open(dosya_yolu, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(dosya_yolu)
@@ -0,0 +1,41 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# --- İsimleri Normalleştirme ---
+# Türkçe karakterler tek bir çeviri tablosuyla sadeleştirilir. 'İ'.lower() sonucu 'i' + birleşik
+# nokta (U+0307) olduğundan birleşik nokta silinir.
+TURKCE_CEVIRI_TABLOSU = str.maketrans({'ı': 'i', 'ş': 's', 'ç': 'c', 'ğ': 'g', 'ö': 'o', 'ü': 'u', '\u0307': None})
+
+# Kaynak dosyalardaki yazım farkları için düzeltmeler (normalleştirilmiş metin üzerinde).
+ISIM_DUZELTMELERI = {
+    'kalyuncu': 'kalyoncu',
+}
+
+# Ham isim -> normalleştirilmiş anahtar. Aynı isimler dosyalarda binlerce kez tekrarlandığı
+# için her farklı isim süreç boyunca yalnızca bir kez işlenir.
+_ISIM_ONBELLEGI = {}
+
+def _onbellege_ekle(ham_isimler):
+    yeniler = [isim for isim in ham_isimler if isim not in _ISIM_ONBELLEGI]
+    if not yeniler:
+        return
+    normaller = pd.Series(yeniler, dtype=object).astype(str).str.strip().str.lower().str.translate(TURKCE_CEVIRI_TABLOSU)
+    for yanlis, dogru in ISIM_DUZELTMELERI.items():
+        normaller = normaller.str.replace(yanlis, dogru, regex=False)
+    _ISIM_ONBELLEGI.update((isim, sys.intern(normal)) for isim, normal in zip(yeniler, normaller))
+
+def isimleri_normallestir(seri):
+    # Seri kategorilere ayrılır, yalnızca farklı isimler normalleştirilir ve sonuç kodlarla
+    # geri dağıtılır; dönen seri kategoriktir.
+    kategorik = seri.astype('category')
+    kategoriler = list(kategorik.cat.categories)
+    _onbellege_ekle(kategoriler)
+    normaller = np.array([_ISIM_ONBELLEGI[isim] for isim in kategoriler] + [""], dtype=object)
+    # Boş değerlerin kodu -1'dir ve listenin sonundaki "" değerine denk gelir.
+    return pd.Series(normaller[kategorik.cat.codes.to_numpy()], index=seri.index, name=seri.name).astype('category')
+
+def normalize_turkish_names(name):
+    # Tek bir isim için isimleri_normallestir; boş değer "" olur.
+    return str(isimleri_normallestir(pd.Series([name], dtype=object)).iloc[0])
@@ -0,0 +1,171 @@
+import collections
+import contextvars
+import functools
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- Performans Ölçümü ---
+# Sayfa çizimleri, yükleyiciler ve sayfaların içindeki adlandırılmış aşamalar (filtreleme, grafik,
+# harita, Styler ...) süreç içi bir halka tamponda tutulur; yönetici sayfası bunlardan sayfa ve
+# aşama bazında p50/p95 üretir. Ayrıca veri katmanındaki önbelleklerin isabet/ıskalama sayaçları
+# ve taranan satır sayıları kaydedilir.
+# Ölçüm kapalıyken sayfa()/asama() paylaşılan boş bir bağlam döner, süre ölçülmez ve hiçbir şey
+# kaydedilmez; açık/kapalı kontrolü tek bir modül değişkeni okumasıdır. Varsayılan olarak
+# CRM_OLCUM=1 ortam değişkeniyle açılır, yönetici sayfasından çalışırken açılıp kapatılabilir.
+# Süreç havuzunda (bkz. veri_yukleme) okunan dosyaların önbellek sayaçları ana sürece taşınmaz.
+OLCUM_ORTAM_DEGISKENI = 'CRM_OLCUM'
+KAYIT_KAPASITESI = 50000
+KAYIT_SUTUNLARI = ['Zaman', 'Oturum', 'Tür', 'Sayfa', 'Aşama', 'Süre (ms)', 'Satır']
+SAYFA_DISI = '—'
+
+_acik = os.environ.get(OLCUM_ORTAM_DEGISKENI) == '1'
+_kayitlar = collections.deque(maxlen=KAYIT_KAPASITESI)
+_sayaclar = collections.Counter()
+_kilit = threading.Lock()
+# Etkin sayfa ve oturum; aşamalar kaydedildikleri sayfaya bu değişkenden bağlanır.
+_baglam = contextvars.ContextVar('olcum_baglami', default=(SAYFA_DISI, None))
+
+def acik_mi():
+    return _acik
+
+def etkinlestir(acik=True):
+    global _acik
+    _acik = bool(acik)
+
+def sifirla():
+    with _kilit:
+        _kayitlar.clear()
+        _sayaclar.clear()
+
+class _BosOlcum:
+    # Ölçüm kapalıyken tüm sayfa()/asama() çağrılarının döndüğü tek nesne.
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *hata):
+        return False
+
+    def satir_ekle(self, adet):
+        pass
+
+_BOS = _BosOlcum()
+
+class _Olcum:
+    __slots__ = ('tur', 'sayfa', 'asama', 'oturum', 'satir', '_baslangic', '_jeton')
+
+    def __init__(self, tur, sayfa, asama, oturum):
+        self.tur, self.sayfa, self.asama, self.oturum = tur, sayfa, asama, oturum
+        self.satir = None
+        self._jeton = None
+
+    def __enter__(self):
+        if self.tur == 'sayfa':
+            self._jeton = _baglam.set((self.sayfa, self.oturum))
+        self._baslangic = time.perf_counter()
+        return self
+
+    def __exit__(self, *hata):
+        sure = (time.perf_counter() - self._baslangic) * 1000
+        if self._jeton is not None:
+            _baglam.reset(self._jeton)
+        with _kilit:
+            _kayitlar.append((time.time(), self.oturum, self.tur, self.sayfa, self.asama, sure, self.satir))
+        return False
+
+    def satir_ekle(self, adet):
+        self.satir = (self.satir or 0) + int(adet)
+
+def sayfa(ad, oturum=None):
+    # Bir sayfa çiziminin tamamı; içinde açılan aşamalar bu sayfaya yazılır.
+    if not _acik:
+        return _BOS
+    return _Olcum('sayfa', ad, '(toplam)', oturum)
+
+def asama(ad):
+    if not _acik:
+        return _BOS
+    sayfa_adi, oturum = _baglam.get()
+    return _Olcum('aşama', sayfa_adi, ad, oturum)
+
+def kaydet(tur, ad, sure, satir=None):
+    # Başka yerde ölçülmüş bir süreyi (saniye) kaydeder; ör. arka plandaki yükleyiciler.
+    if not _acik:
+        return
+    with _kilit:
+        _kayitlar.append((time.time(), None, tur, SAYFA_DISI, ad, sure * 1000, satir))
+
+def say(ad, olay, adet=1):
+    # ('veri_onbellek', 'isabet') gibi sayaçlar.
+    if not _acik:
+        return
+    with _kilit:
+        _sayaclar[(ad, olay)] += adet
+
+def cagri_sayaci(ad):
+    # st.cache_data/st.cache_resource'un üstüne konur ve her çağrıyı sayar; aynı adla altına konan
+    # hesaplama_sayaci yalnızca önbellek ıskalamasında çalışır. Fark isabet sayısıdır.
+    def dekorator(fonksiyon):
+        @functools.wraps(fonksiyon)
+        def sarmalayici(*args, **kwargs):
+            if _acik:
+                say(ad, 'çağrı')
+            return fonksiyon(*args, **kwargs)
+        return sarmalayici
+    return dekorator
+
+def hesaplama_sayaci(ad):
+    def dekorator(fonksiyon):
+        @functools.wraps(fonksiyon)
+        def sarmalayici(*args, **kwargs):
+            if not _acik:
+                return fonksiyon(*args, **kwargs)
+            say(ad, 'ıskalama')
+            with asama(ad):
+                return fonksiyon(*args, **kwargs)
+        return sarmalayici
+    return dekorator
+
+def kayit_tablosu():
+    with _kilit:
+        kayitlar = list(_kayitlar)
+    df = pd.DataFrame(kayitlar, columns=KAYIT_SUTUNLARI)
+    df['Zaman'] = pd.to_datetime(df['Zaman'], unit='s')
+    return df
+
+def yuzdelik_raporu(oturum=None):
+    # Sayfa ve aşama bazında çağrı sayısı, p50/p95/en büyük süre (ms) ve ortalama taranan satır.
+    df = kayit_tablosu()
+    if oturum is not None:
+        df = df[df['Oturum'] == oturum]
+    if df.empty:
+        return pd.DataFrame(columns=['Tür', 'Sayfa', 'Aşama', 'Adet', 'p50 (ms)', 'p95 (ms)', 'En Büyük (ms)', 'Ort. Satır'])
+    gruplar = df.groupby(['Tür', 'Sayfa', 'Aşama'], sort=False)
+    sureler = gruplar['Süre (ms)']
+    rapor = pd.DataFrame({
+        'Adet': sureler.size(),
+        'p50 (ms)': sureler.quantile(0.5),
+        'p95 (ms)': sureler.quantile(0.95),
+        'En Büyük (ms)': sureler.max(),
+        'Ort. Satır': gruplar['Satır'].mean(),
+    }).reset_index()
+    return rapor.sort_values(['Tür', 'Sayfa', 'p95 (ms)'], ascending=[False, True, False], ignore_index=True)
+
+def sayac_tablosu():
+    # Önbellek bazında isabet, ıskalama ve isabet oranı. Çağrıları sayılan önbelleklerde isabet
+    # çağrı - ıskalama, diğerlerinde (veri_onbellek) doğrudan sayılan isabettir.
+    with _kilit:
+        sayaclar = dict(_sayaclar)
+    satirlar = []
+    for ad in sorted({ad for ad, _ in sayaclar}):
+        iskalama = sayaclar.get((ad, 'ıskalama'), 0)
+        cagri = sayaclar.get((ad, 'çağrı'))
+        isabet = cagri - iskalama if cagri is not None else sayaclar.get((ad, 'isabet'), 0)
+        toplam = isabet + iskalama
+        satirlar.append((ad, isabet, iskalama, isabet / toplam if toplam else np.nan))
+    return pd.DataFrame(satirlar, columns=['Önbellek', 'İsabet', 'Iskalama', 'İsabet Oranı'])
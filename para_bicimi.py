@@ -0,0 +1,78 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# --- Türk Lirası Biçimlendirme ---
+# Tutarlar tr-TR düzeninde yazılır: binlik ayırıcı nokta, ondalık ayırıcı virgül (1.234.567,89 TL).
+# Diziler tek tek değil, numpy ile bütün olarak biçimlendirilir: değerler kuruşa yuvarlanıp tamsayı
+# kısmı sabit genişlikte karakter matrisine açılır, üçlü gruplar arasına nokta tek işlemle eklenir.
+# Aynı tutar dizide birden çok kez geçiyorsa yalnızca bir kez biçimlendirilir. Kuruş cinsinden
+# 2**53'ü aşan (float'ın tamsayıları tam tutamadığı) tutarlar int64'e çevrilmez, tek tek Python'un
+# biçimlendirmesiyle yazılır; sonsuz değerler NaN gibi boş kalır.
+SONEK = " TL"
+# Excel çıktıları için: hücreler sayı kalır, görünümü Excel'in kendi yerel ayarı belirler.
+EXCEL_TL_BICIMI = '#,##0.00 "TL"'
+# Plotly grafiklerinde (layout.separators) önce ondalık, sonra binlik ayırıcı.
+PLOTLY_AYIRICILARI = ',.'
+
+
+def _gruplu_tamsayilar(tamsayilar):
+    # Negatif olmayan int64 dizisi -> '1.234.567' biçiminde metin dizisi.
+    if len(tamsayilar) == 0:
+        return np.array([], dtype=str)
+    metinler = tamsayilar.astype(str)
+    genislik = -(-int(np.char.str_len(metinler).max()) // 3) * 3
+    rakamlar = np.char.zfill(metinler, genislik).view('U1').reshape(len(metinler), genislik // 3, 3)
+    noktalar = np.full((len(metinler), genislik // 3, 1), '.')
+    birlesik = np.concatenate((rakamlar, noktalar), axis=2).reshape(len(metinler), -1)[:, :-1]
+    sonuc = np.ascontiguousarray(birlesik).view(f'U{birlesik.shape[1]}').ravel()
+    # Soldaki doldurma sıfırları ve aralarındaki noktalar atılır; sıfırın kendisi '0' kalır.
+    sonuc = np.char.lstrip(sonuc, '0.')
+    return np.where(sonuc == '', '0', sonuc)
+
+
+def _benzersizleri_bicimlendir(degerler, ondalik, sonek):
+    carpan = 10 ** ondalik
+    birimler = np.rint(np.abs(degerler) * carpan).astype(np.int64)
+    metin = _gruplu_tamsayilar(birimler // carpan)
+    if ondalik:
+        kesirler = np.char.zfill((birimler % carpan).astype(str), ondalik)
+        metin = np.char.add(np.char.add(metin, ','), kesirler)
+    isaret = np.where((degerler < 0) & (birimler > 0), '-', '')
+    return np.char.add(np.char.add(isaret, metin), sonek)
+
+
+def _buyuk_tutari_bicimlendir(deger, ondalik, sonek):
+    return f"{deger:,.{ondalik}f}".translate(str.maketrans(',.', '.,')) + sonek
+
+
+def tl_dizisi(degerler, ondalik=2, sonek=SONEK, bos=""):
+    # Sayı dizisini (liste, numpy dizisi ya da Series) tr-TR tutar metinlerine çevirir.
+    # Series verilirse aynı indeksle Series döner; boş (NaN) ve sonsuz değerler 'bos' olur.
+    seri = degerler if isinstance(degerler, pd.Series) else None
+    dizi = np.asarray(degerler, dtype=float)
+    sonuc = np.full(dizi.shape, bos, dtype=object)
+    dolu = np.isfinite(dizi)
+    buyuk = dolu & (np.abs(dizi) >= 2.0 ** 53 / 10 ** ondalik)
+    dolu &= ~buyuk
+    if dolu.any():
+        benzersizler, konumlar = np.unique(dizi[dolu], return_inverse=True)
+        sonuc[dolu] = _benzersizleri_bicimlendir(benzersizler, ondalik, sonek).astype(object)[konumlar]
+    if buyuk.any():
+        sonuc[buyuk] = [_buyuk_tutari_bicimlendir(deger, ondalik, sonek) for deger in dizi[buyuk]]
+    if seri is not None:
+        return pd.Series(sonuc, index=seri.index, name=seri.name)
+    return sonuc
+
+
+@lru_cache(maxsize=4096)
+def _tl_onbellekli(deger, ondalik, sonek, bos):
+    return tl_dizisi([deger], ondalik, sonek, bos)[0]
+
+
+def tl(deger, ondalik=2, sonek=SONEK, bos=""):
+    # Tek tutar için; sayfalarda tekrar tekrar gösterilen toplamlar önbellekten gelir.
+    if deger is None:
+        return bos
+    return _tl_onbellekli(float(deger), ondalik, sonek, bos)
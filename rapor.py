@@ -1,5 +1,7 @@
 import pandas as pd
 
+from para_bicimi import tl, tl_dizisi
+
 # --- KULLANICI AYARLARI ---
 DOSYA_YOLU = 'rapor.xls'
 
@@ -36,13 +38,14 @@ try:
         print("\n" + "="*40)
         print(f"         RAPOR SONUCU")
         print("="*40)
-        print(f"\nGENEL TOPLAM ALACAK: {toplam_bakiye:,.2f} TL")
+        print(f"\nGENEL TOPLAM ALACAK: {tl(toplam_bakiye)}")
         print("-"*40)
 
         if not musteri_bazinda_bakiye.empty:
             print("\nMÜŞTERİ BAZINDA BAKİYE DÖKÜMÜ:")
             dokum_df = musteri_bazinda_bakiye.reset_index()
             dokum_df = dokum_df.rename(columns={TUTAR_SUTUNU: 'Toplam Alacak (TL)'})
+            dokum_df['Toplam Alacak (TL)'] = tl_dizisi(dokum_df['Toplam Alacak (TL)'], sonek="")
             print(dokum_df.to_string(index=False))
         else:
             print("\nBu temsilci(ler)e ait pozitif bakiye bulunan müşteri yok.")
@@ -0,0 +1,207 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from isimler import isimleri_normallestir
+from veri_onbellek import atomik_yaz, dosya_ozeti, meta_oku, meta_yaz
+
+# --- Satış Geçmişi Deposu ---
+# Dönemsel satış çalışma kitapları (yıllık 2025_satış_toplam.xlsx, sonraki aylık/günlük dışa
+# aktarımlar) bir kez ayrıştırılıp dönem klasörlerine bölünmüş Arrow (Feather) parçalarına yazılır:
+#   satis_gecmisi/donem=2025/2025_satış_toplam-1a2b3c4d.arrow
+#   satis_gecmisi/donem=2025-07/2025-07_satış_ay-5e6f7a8b.arrow
+# Depo yalnızca büyür; parçalar hiç yeniden yazılmaz. Hangi parçanın geçerli olduğunu katalog
+# (katalog.json) tutar: kaynak dosya adı -> içerik özeti ve parça. İçeriği değişen bir kitap yeni
+# bir parça olarak eklenir ve katalogda eskisinin yerini alır. Dönem dosya adından okunur
+# (YYYY, YYYY-AA veya YYYY-AA-GG); çalışma kitabında tarih sütunu yoktur.
+GECMIS_KLASORU = 'satis_gecmisi'
+KATALOG_DOSYASI = 'katalog.json'
+GECMIS_DESENI = '*_satış_*.xlsx'
+GECMIS_SUTUNLARI = ['Müşteri Kodu', 'Müşteri Ünvanı', 'Brüt Fiyat']
+# Kitapta varsa saklanan, yoksa güncel verilerden tamamlanan sütunlar.
+GECMIS_EK_SUTUNLARI = ['ST', 'İlçe']
+DONEM_DESENI = re.compile(r'^(\d{4})(?:[-_.](\d{2}))?(?:[-_.](\d{2}))?(?=[^\d]|$)')
+# Dönem türleri incelikten kabalığa sıralıdır.
+DONEM_TURLERI = ['gün', 'hafta', 'ay', 'yıl']
+
+def donem_coz(dosya_yolu):
+    # '2025_satış_toplam.xlsx' -> (2025-01-01, 2026-01-01, 'yıl'); bitiş dahil değildir.
+    eslesme = DONEM_DESENI.match(os.path.basename(dosya_yolu))
+    if not eslesme:
+        return None
+    yil, ay, gun = eslesme.groups()
+    if gun:
+        baslangic = pd.Timestamp(int(yil), int(ay), int(gun))
+        return baslangic, baslangic + pd.DateOffset(days=1), 'gün'
+    if ay:
+        baslangic = pd.Timestamp(int(yil), int(ay), 1)
+        return baslangic, baslangic + pd.DateOffset(months=1), 'ay'
+    baslangic = pd.Timestamp(int(yil), 1, 1)
+    return baslangic, baslangic + pd.DateOffset(years=1), 'yıl'
+
+def _donem_etiketi(baslangic, tur):
+    return baslangic.strftime({'gün': '%Y-%m-%d', 'ay': '%Y-%m', 'yıl': '%Y'}[tur])
+
+def gecmis_kitaplari(kaynak_klasoru='.', desen=GECMIS_DESENI):
+    # Excel'in açık kitaplar için bıraktığı '~$' kilit dosyaları dönem kitabı sayılmaz.
+    return [yol for yol in sorted(glob.glob(os.path.join(kaynak_klasoru, desen))) if not os.path.basename(yol).startswith('~$')]
+
+def gecmis_damgasi(kaynak_klasoru='.', desen=GECMIS_DESENI):
+    # Dönem kitaplarının (ad, değiştirilme zamanı, boyut) listesi. İzleyici bununla klasördeki
+    # diğer dosyalara (kilit dosyaları, depolar, önbellek) tepki vermez ve yerinde yeniden
+    # yazılan bir kitabı da fark eder.
+    damga = []
+    for yol in gecmis_kitaplari(kaynak_klasoru, desen):
+        try:
+            durum = os.stat(yol)
+        except OSError:
+            continue
+        damga.append((os.path.basename(yol), durum.st_mtime_ns, durum.st_size))
+    return tuple(damga)
+
+class SatisGecmisiDeposu:
+    def __init__(self, klasor=GECMIS_KLASORU):
+        self.klasor = klasor
+        self.katalog_yolu = os.path.join(klasor, KATALOG_DOSYASI)
+
+    def katalog(self):
+        return meta_oku(self.katalog_yolu) or {}
+
+    def ekle(self, dosya_yolu):
+        # Kitap daha önce aynı içerikle eklendiyse okunmaz; eklendiyse True döner.
+        donem = donem_coz(dosya_yolu)
+        if donem is None:
+            raise ValueError(f"Dosya adından dönem okunamadı (YYYY, YYYY-AA veya YYYY-AA-GG ile başlamalı): {os.path.basename(dosya_yolu)}")
+        katalog = self.katalog()
+        kaynak = os.path.basename(dosya_yolu)
+        ozet = dosya_ozeti(dosya_yolu)
+        if katalog.get(kaynak, {}).get('ozet') == ozet:
+            return False
+        df = pd.read_excel(dosya_yolu, dtype={'Müşteri Kodu': str})
+        eksik = [sutun for sutun in GECMIS_SUTUNLARI if sutun not in df.columns]
+        if eksik:
+            raise ValueError(f"Eksik sütunlar: {', '.join(eksik)}")
+        df = df[GECMIS_SUTUNLARI + [sutun for sutun in GECMIS_EK_SUTUNLARI if sutun in df.columns]]
+        df = df.dropna(subset=['Müşteri Kodu']).assign(**{'Brüt Fiyat': pd.to_numeric(df['Brüt Fiyat'], errors='coerce').fillna(0.0)})
+        for sutun in GECMIS_EK_SUTUNLARI:
+            if sutun not in df.columns:
+                df[sutun] = pd.Series(None, index=df.index, dtype=object)
+        baslangic, bitis, tur = donem
+        parca = os.path.join(f"donem={_donem_etiketi(baslangic, tur)}", f"{os.path.splitext(kaynak)[0]}-{ozet[:8]}.arrow")
+        os.makedirs(os.path.dirname(os.path.join(self.klasor, parca)), exist_ok=True)
+        tablo = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+        atomik_yaz(os.path.join(self.klasor, parca), lambda yol: feather.write_feather(tablo, yol, compression='uncompressed'))
+        katalog[kaynak] = {
+            'ozet': ozet, 'parca': parca, 'satir': len(df),
+            'baslangic': baslangic.strftime('%Y-%m-%d'), 'bitis': bitis.strftime('%Y-%m-%d'), 'tur': tur,
+        }
+        meta_yaz(self.katalog_yolu, katalog)
+        return True
+
+    def tara(self, kaynak_klasoru='.', desen=GECMIS_DESENI):
+        # Klasördeki yeni veya değişmiş dönem kitaplarını ekler; (eklenen kaynak adları, sorunlar)
+        # döner. Adından dönem okunamayan, sütunları eksik ya da açılamayan bir kitap atlanır ve
+        # açıklaması sorunlar listesine eklenir; diğer kitaplar yine eklenir.
+        eklenenler, sorunlar = [], []
+        for yol in gecmis_kitaplari(kaynak_klasoru, desen):
+            kaynak = os.path.basename(yol)
+            try:
+                if self.ekle(yol):
+                    eklenenler.append(kaynak)
+            except Exception as e:
+                sorunlar.append(f"`{kaynak}` atlandı: {e}")
+        return eklenenler, sorunlar
+
+    def oku(self):
+        # Katalogdaki geçerli parçalar tek tabloda; her satırda dönemi ve kaynağı bulunur.
+        tablolar = []
+        for kaynak, kayit in sorted(self.katalog().items()):
+            df = feather.read_table(os.path.join(self.klasor, kayit['parca'])).to_pandas()
+            tablolar.append(df.assign(**{
+                'Başlangıç': pd.Timestamp(kayit['baslangic']), 'Bitiş': pd.Timestamp(kayit['bitis']),
+                'Dönem Türü': kayit['tur'], 'Kaynak': kaynak,
+            }))
+        if not tablolar:
+            return pd.DataFrame(columns=GECMIS_SUTUNLARI + GECMIS_EK_SUTUNLARI + ['Başlangıç', 'Bitiş', 'Dönem Türü', 'Kaynak'])
+        df = pd.concat(tablolar, ignore_index=True)
+        for sutun in ['Müşteri Kodu', 'Müşteri Ünvanı', 'ST', 'İlçe', 'Dönem Türü', 'Kaynak']:
+            df[sutun] = df[sutun].astype('category')
+        return df
+
+# --- Satış Geçmişi Toplamları ---
+# Depodaki kayıtlar veri yüklemesi başına bir kez gün / hafta / ay / yıl × ST × İlçe × müşteri
+# düzeyinde toplanır; trend ve yıllık karşılaştırma sorguları bu toplamlardan okunur.
+# Bir sıklıkta yalnızca o sıklıktan ince ya da eşit dönemli kaynaklar kullanılır (yıllık toplam
+# aylara dağıtılmaz). Aynı dönemi kapsayan daha kaba bir kaynak varsa ince kaynak o sıklıkta
+# sayılmaz: 2025 yıllık toplamı varken 2025'in aylık dosyaları yıllık toplama ikinci kez eklenmez.
+# Sıklık -> pandas dönem kodu; haftalar pazartesi başlar.
+SIKLIKLAR = {'gün': 'D', 'hafta': 'W-SUN', 'ay': 'M', 'yıl': 'Y'}
+ATANMAMIS = 'Atanmamış'
+GECMIS_BOYUTLARI = ['ST', 'İlçe', 'Müşteri Kodu', 'Müşteri Ünvanı']
+
+def _eksikleri_tamamla(kayitlar, satis_df, ilce_df):
+    # ST müşteri adından (normalleştirilmiş) güncel satış raporuna, İlçe müşteri kodundan ilçe
+    # listesine göre tamamlanır; birden çok temsilcide görünen müşteri en yüksek bakiyeli olana atanır.
+    st = pd.Series(kayitlar['ST'].astype(object), index=kayitlar.index)
+    if satis_df is not None:
+        adaylar = satis_df.assign(Anahtar=isimleri_normallestir(satis_df['Müşteri']).astype(str))
+        adaylar = adaylar.sort_values('Kalan Tutar Total', ascending=False).drop_duplicates('Anahtar')
+        eslesen = isimleri_normallestir(kayitlar['Müşteri Ünvanı']).astype(str).map(adaylar.set_index('Anahtar')['ST'].astype(str))
+        st = st.fillna(eslesen)
+    ilce = pd.Series(kayitlar['İlçe'].astype(object), index=kayitlar.index)
+    if ilce_df is not None:
+        ilceler = ilce_df.assign(Kod=ilce_df['Müşteri Kodu'].astype(str)).drop_duplicates('Kod').set_index('Kod')['İlçe']
+        ilce = ilce.fillna(kayitlar['Müşteri Kodu'].astype(str).map(ilceler))
+    return kayitlar.assign(ST=st.fillna(ATANMAMIS).astype('category'), İlçe=ilce.fillna(ATANMAMIS).astype('category'))
+
+class SatisGecmisi:
+    def __init__(self, kayitlar, satis_df=None, ilce_df=None):
+        self.kayitlar = _eksikleri_tamamla(kayitlar, satis_df, ilce_df)
+        self.kaynaklar = self.kayitlar[['Kaynak', 'Başlangıç', 'Bitiş', 'Dönem Türü']].drop_duplicates('Kaynak').reset_index(drop=True)
+        self.toplamlar = {siklik: self._topla(siklik) for siklik in SIKLIKLAR}
+
+    def _gecerli_kaynaklar(self, siklik):
+        sira = DONEM_TURLERI.index(siklik)
+        kaynaklar = self.kaynaklar[self.kaynaklar['Dönem Türü'].astype(str).map(DONEM_TURLERI.index) <= sira]
+        derece = kaynaklar['Dönem Türü'].astype(str).map(DONEM_TURLERI.index).to_numpy()
+        bas, bit = kaynaklar['Başlangıç'].to_numpy(), kaynaklar['Bitiş'].to_numpy()
+        # Kaynak i, daha kaba dönemli ve dönemini kapsayan bir kaynak j varsa gölgelenir.
+        golgeli = ((derece[None, :] > derece[:, None]) & (bas[None, :] <= bas[:, None]) & (bit[None, :] >= bit[:, None])).any(axis=1)
+        return kaynaklar['Kaynak'][~golgeli]
+
+    def _topla(self, siklik):
+        df = self.kayitlar[self.kayitlar['Kaynak'].isin(self._gecerli_kaynaklar(siklik))]
+        donem = df['Başlangıç'].dt.to_period(SIKLIKLAR[siklik]).dt.start_time
+        return (df.assign(Dönem=donem).groupby(['Dönem'] + GECMIS_BOYUTLARI, observed=True)['Brüt Fiyat'].sum()
+                .reset_index())
+
+    def trend(self, siklik='ay', boyut=None, degerler=None):
+        # Dönem × (isteğe bağlı) boyut değeri toplamları; boyut verilirse sütunlar boyut değerleridir.
+        df = self.toplamlar[siklik]
+        if boyut is None:
+            return df.groupby('Dönem')['Brüt Fiyat'].sum()
+        if degerler is not None:
+            df = df[df[boyut].isin(degerler)]
+        return df.pivot_table(index='Dönem', columns=boyut, values='Brüt Fiyat', aggfunc='sum', fill_value=0.0, observed=True)
+
+    def yillik_karsilastirma(self, siklik='yıl', boyut=None):
+        # Her dönem, bir önceki yılın aynı dönemiyle: (Dönem, [boyut], Bu Yıl, Geçen Yıl, Değişim %).
+        anahtarlar = ['Dönem'] + ([boyut] if boyut else [])
+        df = self.toplamlar[siklik].groupby(anahtarlar, observed=True)['Brüt Fiyat'].sum().rename('Bu Yıl').reset_index()
+        gecen = df.assign(Dönem=df['Dönem'] + pd.DateOffset(years=1)).rename(columns={'Bu Yıl': 'Geçen Yıl'})
+        if siklik == 'hafta':
+            # Bir yıl kaydırılan hafta başı pazartesiye denk gelmez; o haftanın başına yuvarlanır.
+            gecen['Dönem'] = gecen['Dönem'].dt.to_period(SIKLIKLAR['hafta']).dt.start_time
+        sonuc = df.merge(gecen, on=anahtarlar, how='left')
+        sonuc['Değişim %'] = np.where(sonuc['Geçen Yıl'].abs() > 0, (sonuc['Bu Yıl'] / sonuc['Geçen Yıl'] - 1) * 100, np.nan)
+        return sonuc
+
+def satis_gecmisi_olustur(kayitlar, satis_df, ilce_df):
+    if kayitlar is None or kayitlar.empty:
+        return None
+    return SatisGecmisi(kayitlar, satis_df, ilce_df)
@@ -0,0 +1,134 @@
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from analiz import TAHSILAT_KOVALARI, YASLANDIRMA_SINIRLARI
+from disa_aktarim import excel_sayfasi_yaz
+from para_bicimi import EXCEL_TL_BICIMI, tl
+from veri_yukleme import satis_veri_yukle
+
+# --- Toplu Temsilci Raporları ---
+# Ay sonu raporları tek komutla üretilir: satış defteri bir kez okunur (anlık görüntü önbelleği
+# geçerliyse çalışma kitabı hiç açılmaz), temsilcilere bölünür ve her temsilcinin çalışma kitabı
+# bir süreç havuzunda paralel yazılır. Kitaplar xlsxwriter'ın constant_memory kipinde satır satır
+# yazılır (bkz. disa_aktarim.excel_sayfasi_yaz); bellekte kitabın tamamı tutulmaz. Her kitapta
+# üç sayfa vardır:
+#   Bakiye              müşteri bazında pozitif bakiye (rapor.py'deki döküm)
+#   Yaşlandırma         müşteri × yaşlandırma kovası (pozitif tutarlar)
+#   Gecikmiş Alacaklar  vadesi geçmiş satırlar, gecikme gününe göre azalan (Yaşlandırma sayfasının indirmesi)
+# Ayrıca tüm temsilcilerin toplamlarını içeren bir Özet.xlsx yazılır.
+#   python toplu_rapor.py
+#   python toplu_rapor.py --kaynak rapor.xls --cikti raporlar/2025-08 --isci 4
+RAPOR_KLASORU = 'raporlar'
+OZET_DOSYASI = 'Özet.xlsx'
+
+def _dosya_adi(temsilci):
+    # Windows'ta dosya adında kullanılamayan karakterler '_' olur.
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', temsilci).strip(' .') or '_'
+
+def temsilci_tablolari(df, sinirlar=YASLANDIRMA_SINIRLARI):
+    # Tek temsilcinin satırlarından (bakiye, yaşlandırma, gecikmiş alacaklar) tabloları.
+    df = df.assign(Müşteri=df['Müşteri'].astype(str))
+    bakiye = df.groupby('Müşteri', sort=False)['Kalan Tutar Total'].sum()
+    bakiye = bakiye[bakiye > 0].sort_values(ascending=False).rename('Toplam Alacak (TL)').reset_index()
+    # Kova 0 vadesi gelmemiş alacaktır; vadesi geçmişler YASLANDIRMA_SINIRLARI'na göre 1..n.
+    pozitif = df[df['Kalan Tutar Total'] > 0]
+    gun = pozitif['Gün'].fillna(0).to_numpy()
+    kova = np.where(gun > 0, np.searchsorted(sinirlar, gun, side='left') + 1, 0)
+    yaslandirma = (
+        pozitif['Kalan Tutar Total'].groupby([pozitif['Müşteri'].to_numpy(), kova]).sum()
+        .unstack(fill_value=0.0).reindex(columns=range(len(TAHSILAT_KOVALARI)), fill_value=0.0)
+        .set_axis(TAHSILAT_KOVALARI, axis=1).astype(float)
+    )
+    yaslandirma['Toplam'] = yaslandirma.sum(axis=1)
+    yaslandirma = yaslandirma.sort_values('Toplam', ascending=False).rename_axis('Müşteri').reset_index()
+    gecikmis = pozitif.loc[gun > 0, ['Müşteri', 'Kalan Tutar Total', 'Gün']]
+    gecikmis = gecikmis.sort_values('Gün', ascending=False, kind='mergesort').reset_index(drop=True)
+    return bakiye, yaslandirma, gecikmis
+
+def temsilci_raporu_yaz(temsilci, df, klasor):
+    # Alt süreçte çalışır; yazılan dosyanın yolunu ve Özet.xlsx için bir satır döner.
+    bakiye, yaslandirma, gecikmis = temsilci_tablolari(df)
+    dosya_yolu = os.path.join(klasor, f"{_dosya_adi(temsilci)}.xlsx")
+    calisma_kitabi = xlsxwriter.Workbook(dosya_yolu, {'constant_memory': True})
+    tl_bicimi = calisma_kitabi.add_format({'num_format': EXCEL_TL_BICIMI})
+    excel_sayfasi_yaz(calisma_kitabi, 'Bakiye', bakiye, tl_bicimi)
+    excel_sayfasi_yaz(calisma_kitabi, 'Yaşlandırma', yaslandirma, tl_bicimi)
+    excel_sayfasi_yaz(calisma_kitabi, 'Gecikmiş Alacaklar', gecikmis, tl_bicimi)
+    calisma_kitabi.close()
+    # 'Genel Toplam Alacak' rapor.py'deki gibi işaretli toplamdır (alacaklı bakiyeler düşülür);
+    # 'Toplam Alacak' yalnızca pozitif müşteri bakiyelerinin (Bakiye sayfasının) toplamıdır.
+    ozet = {
+        'Temsilci': temsilci, 'Müşteri Sayısı': len(bakiye),
+        'Genel Toplam Alacak (TL)': float(df['Kalan Tutar Total'].sum()),
+        'Toplam Alacak (TL)': float(bakiye['Toplam Alacak (TL)'].sum()),
+    }
+    ozet.update({kova: float(yaslandirma[kova].sum()) for kova in TAHSILAT_KOVALARI})
+    return dosya_yolu, ozet
+
+def temsilcilere_bol(satis_df):
+    # Her temsilcinin satırları; alt süreçlere gönderilirken kategorik sütunlar yalnızca o
+    # temsilcinin kategorilerini taşır, tüm müşteri sözlüğü her işe kopyalanmaz.
+    for temsilci, grup in satis_df.groupby('ST', observed=True, sort=True):
+        yield str(temsilci), grup.assign(
+            ST=grup['ST'].cat.remove_unused_categories(),
+            Müşteri=grup['Müşteri'].cat.remove_unused_categories(),
+        )
+
+def toplu_rapor_uret(kaynak, klasor, isci_sayisi=None, temsilciler=None):
+    # Yazılan dosyaların yollarını ve temsilci özet tablosunu döner. isci_sayisi 1 ise (ya da tek
+    # çekirdek varsa) havuz kurulmaz; raporlar aynı süreçte sırayla yazılır.
+    satis_df = satis_veri_yukle(kaynak)
+    if temsilciler:
+        satis_df = satis_df[satis_df['ST'].isin(temsilciler)]
+    os.makedirs(klasor, exist_ok=True)
+    isler = list(temsilcilere_bol(satis_df))
+    isci_sayisi = min(isci_sayisi or os.cpu_count() or 1, len(isler)) or 1
+    sonuclar = []
+    if isci_sayisi < 2:
+        sonuclar = [temsilci_raporu_yaz(temsilci, df, klasor) for temsilci, df in isler]
+    else:
+        with ProcessPoolExecutor(max_workers=isci_sayisi) as havuz:
+            gelecekler = [havuz.submit(temsilci_raporu_yaz, temsilci, df, klasor) for temsilci, df in isler]
+            # Bellekteki dilimler işler gönderildikten sonra bırakılır.
+            del isler
+            sonuclar = [gelecek.result() for gelecek in as_completed(gelecekler)]
+    ozet = pd.DataFrame([ozet for _, ozet in sonuclar], columns=['Temsilci', 'Müşteri Sayısı', 'Genel Toplam Alacak (TL)', 'Toplam Alacak (TL)'] + TAHSILAT_KOVALARI)
+    ozet = ozet.sort_values('Temsilci', ignore_index=True)
+    calisma_kitabi = xlsxwriter.Workbook(os.path.join(klasor, OZET_DOSYASI), {'constant_memory': True})
+    excel_sayfasi_yaz(calisma_kitabi, 'Özet', ozet, calisma_kitabi.add_format({'num_format': EXCEL_TL_BICIMI}))
+    calisma_kitabi.close()
+    return sorted(yol for yol, _ in sonuclar), ozet
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Her satış temsilcisi için bakiye ve yaşlandırma çalışma kitaplarını toplu üretir.")
+    parser.add_argument('--kaynak', default='rapor.xls', help="Satış defteri (varsayılan: rapor.xls).")
+    parser.add_argument('--cikti', default=None, help=f"Çıktı klasörü (varsayılan: {RAPOR_KLASORU}/<bugün>).")
+    parser.add_argument('--isci', type=int, default=None, help="Paralel süreç sayısı (varsayılan: çekirdek sayısı).")
+    parser.add_argument('--temsilci', nargs='+', default=None, help="Yalnızca bu temsilcilerin raporları üretilir.")
+    args = parser.parse_args(argv)
+
+    klasor = args.cikti or os.path.join(RAPOR_KLASORU, date.today().isoformat())
+    baslangic = time.perf_counter()
+    try:
+        yollar, ozet = toplu_rapor_uret(args.kaynak, klasor, args.isci, args.temsilci)
+    except FileNotFoundError:
+        print(f"HATA: '{args.kaynak}' dosyası bulunamadı.")
+        return 1
+    except ValueError as e:
+        print(f"HATA: '{args.kaynak}' okunamadı: {e}")
+        return 1
+    print(f"{len(yollar)} temsilci raporu '{klasor}' klasörüne yazıldı ({time.perf_counter() - baslangic:.1f} sn).")
+    print(f"GENEL TOPLAM ALACAK: {tl(ozet['Genel Toplam Alacak (TL)'].sum())}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import datetime
+import decimal
+import hashlib
+import json
+import numbers
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import olcum
+
+# --- Anlık Görüntü (Snapshot) Önbelleği ---
+# Excel kaynakları bir kez okunup sıkıştırılmamış Arrow (Feather) dosyasına yazılır.
+# Sonraki yüklemeler bu dosyadan okunur; sayfalar pandas tablosu beklediğinden veri bir kez
+# DataFrame'e kopyalanır (bellek eşlemenin kazancı olmadığından kullanılmaz). Excel yalnızca
+# kaynağın değiştirilme zamanı ve içerik özeti değiştiğinde yeniden ayrıştırılır.
+ONBELLEK_KLASORU = '.veri_onbellek'
+OZET_BLOK_BOYUTU = 1024 * 1024
+
+
+# Dosya özeti, meta okuma/yazma ve atomik yazma satış geçmişi ve defter geçmişi depolarında da
+# kullanılır.
+def dosya_ozeti(dosya_yolu):
+    ozet = hashlib.sha1()
+    with open(dosya_yolu, 'rb') as f:
+        for blok in iter(lambda: f.read(OZET_BLOK_BOYUTU), b''):
+            ozet.update(blok)
+    return ozet.hexdigest()
+
+
+def _onbellek_yollari(dosya_yolu, okuma_ayarlari):
+    # Aynı dosya farklı ayarlarla (ör. header=None) okunabildiği için ayarlar da anahtara girer.
+    ayar_ozeti = hashlib.sha1(json.dumps(okuma_ayarlari, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:8]
+    temel_ad = f"{os.path.basename(dosya_yolu)}.{ayar_ozeti}"
+    klasor = os.path.join(os.path.dirname(os.path.abspath(dosya_yolu)), ONBELLEK_KLASORU)
+    return os.path.join(klasor, temel_ad + '.arrow'), os.path.join(klasor, temel_ad + '.json')
+
+
+def meta_oku(meta_yolu):
+    try:
+        with open(meta_yolu, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def atomik_yaz(hedef_yolu, yazici):
+    gecici_yol = f"{hedef_yolu}.{os.getpid()}.tmp"
+    try:
+        yazici(gecici_yol)
+        os.replace(gecici_yol, hedef_yolu)
+    finally:
+        if os.path.exists(gecici_yol):
+            os.remove(gecici_yol)
+
+
+def meta_yaz(meta_yolu, meta):
+    def yazici(yol):
+        with open(yol, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    atomik_yaz(meta_yolu, yazici)
+
+
+# Karışık sütunlardaki hücre tipleri: kod -> (tip, metinden geri okuyan fonksiyon). Sıra önemlidir:
+# bool bir tamsayı, Timestamp bir datetime, datetime bir date alt sınıfıdır. Kod 0 metin ve
+# None'dır; listede olmayan bir tip TypeError yükseltir ve tablo önbelleğe yazılmaz.
+HUCRE_TURLERI = {
+    1: ((bool, np.bool_), lambda metin: metin == 'True'),
+    2: (numbers.Integral, int),
+    3: (decimal.Decimal, decimal.Decimal),
+    4: (numbers.Real, float),
+    5: (pd.Timestamp, pd.Timestamp),
+    6: (datetime.datetime, datetime.datetime.fromisoformat),
+    7: (datetime.date, datetime.date.fromisoformat),
+    8: (datetime.time, datetime.time.fromisoformat),
+}
+
+
+def _hucre_turu(deger):
+    if deger is None or isinstance(deger, str):
+        return 0
+    if deger is pd.NaT:
+        return 5
+    for kod, (tip, _) in HUCRE_TURLERI.items():
+        if isinstance(deger, tip):
+            return kod
+    raise TypeError(f"Önbelleğe yazılamayan hücre tipi: {type(deger).__name__}")
+
+
+def _hucre_metni(deger):
+    if deger is None or isinstance(deger, str):
+        return deger
+    if isinstance(deger, (datetime.date, datetime.time)) and deger is not pd.NaT:
+        return deger.isoformat()
+    return str(deger)
+
+
+def _arrow_tablosuna_cevir(df):
+    # header=None ile okunan ham sayfalarda metin, sayı, tarih ve bool aynı sütunda karışık
+    # bulunur; Arrow bunları tek tipte tutamadığı için bu sütunlar metne çevrilip meta'da
+    # işaretlenir. Her hücrenin özgün tipi 'tur_<i>' sütununda (HUCRE_TURLERI kodu) saklanır ve
+    # geri yüklemede hücre o tipe döner ('00123' metin, True bool, tarih tarih olarak kalır).
+    df = df.copy()
+    karisik_sutunlar = []
+    turler = {}
+    for i, sutun in enumerate(df.columns):
+        seri = df.iloc[:, i]
+        if seri.dtype == object and pd.api.types.infer_dtype(seri, skipna=True) not in ('string', 'empty'):
+            turler[f"tur_{i}"] = np.fromiter((_hucre_turu(v) for v in seri), dtype=np.int8, count=len(seri))
+            df.iloc[:, i] = seri.map(_hucre_metni)
+            karisik_sutunlar.append(i)
+    df.columns = [str(i) for i in range(df.shape[1])]
+    if turler:
+        df = df.assign(**turler)
+    return pa.Table.from_pandas(df, preserve_index=False), karisik_sutunlar
+
+
+def _karisik_sutunu_geri_yukle(seri, turler):
+    degerler = seri.to_numpy(dtype=object, copy=True)
+    for kod, (_, okuyucu) in HUCRE_TURLERI.items():
+        secili = np.flatnonzero(turler == kod)
+        for j in secili:
+            degerler[j] = okuyucu(degerler[j])
+    return pd.Series(degerler, index=seri.index, name=seri.name, dtype=object)
+
+
+def _pandasa_cevir(tablo, meta):
+    # Tip sütunu olmayan eski anlık görüntülerde KeyError yükselir; önbellek yeniden yazılır.
+    df = tablo.to_pandas()
+    for i in meta.get('karisik_sutunlar', []):
+        df.iloc[:, i] = _karisik_sutunu_geri_yukle(df.iloc[:, i], df.pop(f"tur_{i}").to_numpy())
+    df.columns = meta['sutunlar']
+    return df
+
+
+def _onbellekten_yukle(veri_yolu, meta):
+    return _pandasa_cevir(feather.read_table(veri_yolu), meta)
+
+
+def excel_oku(dosya_yolu, **okuma_ayarlari):
+    return onbellekli_oku(dosya_yolu, lambda yol: pd.read_excel(yol, **okuma_ayarlari), **okuma_ayarlari)
+
+
+def onbellekli_oku(dosya_yolu, okuyucu, **okuma_ayarlari):
+    # okuyucu(dosya_yolu) kaynağı ayrıştırıp DataFrame döner ve yalnızca anlık görüntü geçersizse
+    # çağrılır; okuma_ayarlari önbellek anahtarını belirler. Kaynak yoksa FileNotFoundError
+    # yükselir; çağıranların mevcut hata akışı korunur.
+    durum = os.stat(dosya_yolu)
+    veri_yolu, meta_yolu = _onbellek_yollari(dosya_yolu, okuma_ayarlari)
+    meta = meta_oku(meta_yolu)
+    onbellek_var = meta is not None and os.path.exists(veri_yolu)
+
+    if onbellek_var and meta.get('mtime_ns') == durum.st_mtime_ns and meta.get('boyut') == durum.st_size:
+        try:
+            df = _onbellekten_yukle(veri_yolu, meta)
+            olcum.say('veri_onbellek', 'isabet')
+            return df
+        except (OSError, KeyError, ValueError, pa.ArrowException):
+            pass
+
+    ozet = dosya_ozeti(dosya_yolu)
+    if onbellek_var and meta.get('ozet') == ozet:
+        # Dosyaya dokunulmuş ama içerik aynı: sadece zaman damgası güncellenir.
+        try:
+            df = _onbellekten_yukle(veri_yolu, meta)
+            meta.update(mtime_ns=durum.st_mtime_ns, boyut=durum.st_size)
+            meta_yaz(meta_yolu, meta)
+            olcum.say('veri_onbellek', 'isabet')
+            return df
+        except (OSError, KeyError, ValueError, pa.ArrowException):
+            pass
+
+    olcum.say('veri_onbellek', 'ıskalama')
+    df = okuyucu(dosya_yolu)
+    try:
+        os.makedirs(os.path.dirname(veri_yolu), exist_ok=True)
+        tablo, karisik_sutunlar = _arrow_tablosuna_cevir(df)
+        atomik_yaz(veri_yolu, lambda yol: feather.write_feather(tablo, yol, compression='uncompressed'))
+        meta_yaz(meta_yolu, {
+            'kaynak': os.path.basename(dosya_yolu),
+            'mtime_ns': durum.st_mtime_ns,
+            'boyut': durum.st_size,
+            'ozet': ozet,
+            'sutunlar': list(df.columns),
+            'karisik_sutunlar': karisik_sutunlar,
+        })
+    except (OSError, TypeError, ValueError, pa.ArrowException):
+        # Önbellek yazılamasa da (salt okunur klasör, desteklenmeyen tip) veri yine döner.
+        pass
+    return df
+
+
+# --- Süreçler Arası Aktarım ---
+# Alt süreçte okunan tablolar pickle ile nesne nesne değil, tek bir Arrow IPC arabelleği olarak
+# döner ve ana süreçte sütun sütun açılır. Sütun adları, karışık sütunlar ve df.attrs
+# şema meta verisinde taşınır.
+ARROW_META_ANAHTARI = b'veri_onbellek'
+
+
+def arrow_baytlarina_cevir(df):
+    tablo, karisik_sutunlar = _arrow_tablosuna_cevir(df)
+    meta = {'sutunlar': list(df.columns), 'karisik_sutunlar': karisik_sutunlar, 'attrs': df.attrs}
+    tablo = tablo.replace_schema_metadata({**(tablo.schema.metadata or {}), ARROW_META_ANAHTARI: json.dumps(meta, ensure_ascii=False).encode('utf-8')})
+    hedef = pa.BufferOutputStream()
+    with pa.ipc.new_stream(hedef, tablo.schema) as yazici:
+        yazici.write_table(tablo)
+    return hedef.getvalue().to_pybytes()
+
+
+def arrow_baytlarindan_oku(baytlar):
+    tablo = pa.ipc.open_stream(pa.py_buffer(baytlar)).read_all()
+    meta = json.loads(tablo.schema.metadata[ARROW_META_ANAHTARI])
+    df = _pandasa_cevir(tablo, meta)
+    df.attrs.update(meta.get('attrs', {}))
+    return df
@@ -0,0 +1,556 @@
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import xlrd
+
+from analiz import SatisOzeti, gecikme_indeksi_olustur, ilce_metrikleri_olustur, musteri_analitigi_olustur, senaryo_motoru_olustur, stok_modeli_olustur, tahsilat_simulasyonu_olustur, yaslandirma_kupu_olustur
+from defter_gecmisi import DEFTER_KLASORU, defter_degisiklikleri_olustur
+import olcum
+from isimler import isimleri_normallestir
+from satis_gecmisi import GECMIS_KLASORU, SatisGecmisiDeposu, gecmis_damgasi, satis_gecmisi_olustur
+from veri_onbellek import arrow_baytlarina_cevir, arrow_baytlarindan_oku, excel_oku, onbellekli_oku
+
+def temsilci_satislarini_eslestir(satis_df, satis_hedef_df):
+    # rapor.xls'teki her temsilcinin satis-hedef.xlsx'teki toplam SATIŞ değeri. Eşleştirme
+    # normalleştirilmiş isimler üzerinden, ortak kategorilere sahip iki kategorik sütunla yapılır.
+    if satis_df is None or satis_hedef_df is None or satis_hedef_df.empty:
+        return None
+    temsilciler = pd.DataFrame({'ST': satis_df['ST'].drop_duplicates().to_numpy()})
+    temsilciler['ST_normal'] = isimleri_normallestir(temsilciler['ST'])
+    hedef_satislari = satis_hedef_df.groupby('ST_normal', observed=True)['SATIŞ'].sum().reset_index()
+    ortak = pd.api.types.union_categoricals([temsilciler['ST_normal'], hedef_satislari['ST_normal'].astype('category')]).categories
+    temsilciler['ST_normal'] = temsilciler['ST_normal'].cat.set_categories(ortak)
+    hedef_satislari['ST_normal'] = hedef_satislari['ST_normal'].astype(pd.CategoricalDtype(ortak))
+    eslesen = temsilciler.merge(hedef_satislari, on='ST_normal', how='left')
+    return eslesen.set_index('ST')['SATIŞ'].fillna(0)
+
+# --- VERİ YÜKLEME FONKSİYONLARI ---
+# Bu fonksiyonlar Streamlit'e bağlı değildir; arka plandaki izleyici iş parçacığından
+# çağrılabilmeleri için hataları ekrana basmak yerine yükseltirler.
+# Satış defterinden sayfaların kullandığı sütunlar; diğerleri bellekte tutulmaz.
+SATIS_SUTUNLARI = ['ST', 'Müşteri', 'Gün', 'Kalan Tutar Total']
+# Akışlı okumada bir parçadaki satır sayısı; ham (Python nesnesi) veri en fazla bu kadar tutulur.
+SATIS_PARCA_BOYUTU = 20000
+
+def satis_parcasini_normallestir(df):
+    # ST ve Müşteri kategorik tutulur: satır başına Python metni yerine küçük tamsayı kodları.
+    df = df.dropna(subset=['ST'])
+    return df.assign(
+        ST=df['ST'].astype(str).astype('category'),
+        Müşteri=df['Müşteri'].astype(str).astype('category'),
+        Gün=pd.to_numeric(df['Gün'], errors='coerce'),
+    )
+
+def satis_parcalarini_birlestir(parcalar):
+    # Parçaların kategorileri tek sözlükte birleştirilir, sonra kodlar yeniden eşlenir.
+    # Gün tamsayıya (boş değer varsa float32'ye) küçültülür; tutarlar kuruş hassasiyeti için float64 kalır.
+    if not parcalar:
+        return pd.DataFrame({sutun: pd.Series(dtype='category' if sutun in ('ST', 'Müşteri') else float) for sutun in SATIS_SUTUNLARI})
+    for sutun in ('ST', 'Müşteri'):
+        ortak = pd.api.types.union_categoricals([parca[sutun] for parca in parcalar], sort_categories=True).categories
+        parcalar = [parca.assign(**{sutun: parca[sutun].cat.set_categories(ortak)}) for parca in parcalar]
+    df = pd.concat(parcalar, ignore_index=True)
+    df['Gün'] = pd.to_numeric(df['Gün'], downcast='integer')
+    if df['Gün'].dtype == 'int8':
+        # int8 127 günde taşar; sonradan eklenen ya da aritmetikle büyüyen günler için en az int16.
+        df['Gün'] = df['Gün'].astype('int16')
+    elif df['Gün'].dtype == 'float64':
+        df['Gün'] = df['Gün'].astype('float32')
+    return df
+
+def _calisma_kitabi_satirlari(dosya_yolu):
+    # İlk sayfanın satırları sırayla (değer demetleri olarak) üretilir. .xlsx salt okunur kipte
+    # gerçekten akışlıdır; .xls (BIFF) biçimi bölümlü okunamadığından xlrd sayfayı bir kez çözer,
+    # ama pandas'ın tüm sayfa için kurduğu nesne tablosu hiç oluşmaz.
+    if dosya_yolu.lower().endswith(('.xlsx', '.xlsm')):
+        calisma_kitabi = openpyxl.load_workbook(dosya_yolu, read_only=True, data_only=True)
+        try:
+            yield from calisma_kitabi.worksheets[0].iter_rows(values_only=True)
+        finally:
+            calisma_kitabi.close()
+        return
+    calisma_kitabi = xlrd.open_workbook(dosya_yolu, on_demand=True)
+    try:
+        sayfa = calisma_kitabi.sheet_by_index(0)
+        for i in range(sayfa.nrows):
+            yield sayfa.row_values(i)
+    finally:
+        calisma_kitabi.release_resources()
+
+def satis_parcalari(dosya_yolu, parca_boyutu=SATIS_PARCA_BOYUTU):
+    # Satış defterini en fazla parca_boyutu satırlık, normalleştirilmiş DataFrame'ler halinde üretir.
+    satirlar = _calisma_kitabi_satirlari(dosya_yolu)
+    basliklar = [None if _bos_hucre(h) else str(h).strip() for h in next(satirlar, ())]
+    eksik = [sutun for sutun in SATIS_SUTUNLARI if sutun not in basliklar]
+    if eksik:
+        raise ValueError(f"Başlık satırında eksik sütun(lar): {', '.join(eksik)}")
+    konumlar = [basliklar.index(sutun) for sutun in SATIS_SUTUNLARI]
+    while True:
+        parca = [[satir[k] if k < len(satir) and not _bos_hucre(satir[k]) else None for k in konumlar] for satir in itertools.islice(satirlar, parca_boyutu)]
+        if not parca:
+            return
+        yield satis_parcasini_normallestir(pd.DataFrame(parca, columns=SATIS_SUTUNLARI))
+
+def satis_veri_yukle(dosya_yolu, ilerleme=None, parca_boyutu=SATIS_PARCA_BOYUTU):
+    # Çalışma kitabı parça parça okunur; her parça normalleştirilip özet'e eklenir ve ham hali
+    # bırakılır. ilerleme verilmişse her parçadan sonra o ana kadarki özetin bir kopyasıyla,
+    # en sonda da tam özetle çağrılır. Sonuç anlık görüntü önbelleğine yazılır; geçerli bir
+    # görüntü varsa çalışma kitabı hiç açılmaz ve özet tek seferde hesaplanır.
+    ozet = SatisOzeti()
+    def akisla_oku(yol):
+        parcalar = []
+        for parca in satis_parcalari(yol, parca_boyutu):
+            parcalar.append(parca)
+            ozet.ekle(parca)
+            if ilerleme is not None:
+                ilerleme(ozet.kopya())
+        return satis_parcalarini_birlestir(parcalar)
+    # Biçim adı önbellek anahtarına girer; tablo düzeni değiştiğinde eski görüntüler kullanılmaz.
+    df = onbellekli_oku(dosya_yolu, akisla_oku, bicim='satis_parcali-2')
+    if ozet.satir_sayisi != len(df):
+        ozet = SatisOzeti()
+        ozet.ekle(df)
+    if ilerleme is not None:
+        ilerleme(ozet)
+    return df
+
+def bellek_kullanimi(veri):
+    # DataFrame/Series için gerçek (deep) bellek kullanımı, bayt cinsinden.
+    if isinstance(veri, (pd.DataFrame, pd.Series)):
+        kullanim = veri.memory_usage(deep=True, index=True)
+        return int(kullanim.sum()) if isinstance(kullanim, pd.Series) else int(kullanim)
+    return 0
+
+def stok_veri_yukle(dosya_yolu):
+    df = excel_oku(dosya_yolu)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def solen_borc_excel_oku(dosya_yolu):
+    try:
+        df = excel_oku(dosya_yolu, header=None)
+        deger = df.iloc[:1, :1].values.flatten()[0]
+        if isinstance(deger, (int, float)):
+            return float(deger)
+        else:
+            rakam_str = str(deger).strip().replace('.', '').replace(',', '.')
+            return float(rakam_str)
+    except Exception:
+        return 0.0
+
+def adana_ilce_veri_yukle(dosya_yolu):
+    try:
+        df = excel_oku(dosya_yolu)
+    except FileNotFoundError:
+        return None
+    df.columns = df.columns.str.strip()
+    if 'İlçe' in df.columns:
+        df['İlçe'] = df['İlçe'].str.upper()
+    return df
+
+def satis_gecmisi_yukle(kaynak_klasoru):
+    # Klasördeki yeni veya içeriği değişmiş dönem kitapları depoya eklenir, ardından depo okunur;
+    # daha önce eklenmiş kitaplar yeniden ayrıştırılmaz. Atlanan kitapların açıklamaları
+    # df.attrs['sorunlar'] listesinde döner; depo boş olsa da sorun varsa tablo döner.
+    depo = SatisGecmisiDeposu(os.path.join(kaynak_klasoru, GECMIS_KLASORU))
+    _, sorunlar = depo.tara(kaynak_klasoru)
+    kayitlar = depo.oku()
+    kayitlar.attrs['sorunlar'] = sorunlar
+    return kayitlar if len(kayitlar) or sorunlar else None
+
+# --- Satış/Hedef Çalışma Kitabı Ayrıştırıcısı ---
+# Sayfa tek geçişte satır satır okunur. 'Satış Temsilcisi' ile başlayan her satır yeni bir tablo
+# bloğu açar; bloktan hemen önce gelen ve yalnızca ilk hücresi dolu olan satır grubun başlığıdır.
+# Veri satırları baştan ayrılmış tipli dizilere yazılır ve en sonda tek bir DataFrame kurulur.
+# Hatalı bloklar sessizce atlanmaz; açıklamaları df.attrs['sorunlar'] listesinde döner.
+SATIS_HEDEF_BASLIGI = 'Satış Temsilcisi'
+SATIS_HEDEF_SAYISAL_SUTUNLAR = ['HEDEF', 'SATIŞ', 'KALAN', '%']
+
+def _bos_hucre(deger):
+    if deger is None:
+        return True
+    if isinstance(deger, float):
+        return np.isnan(deger)
+    return isinstance(deger, str) and not deger.strip()
+
+def satis_hedef_satirlarini_ayristir(satirlar, kapasite=1024):
+    kapasite = max(int(kapasite or 0), 16)
+    isimler = np.empty(kapasite, dtype=object)
+    gruplar = np.empty(kapasite, dtype=object)
+    sayilar = np.zeros((kapasite, len(SATIS_HEDEF_SAYISAL_SUTUNLAR)))
+    adet = 0
+    sorunlar = []
+    konumlar = None
+    grup = None
+    grup_sayaci = 0
+    blok_satiri = 0
+    bekleyen_baslik = None
+
+    def satir_ekle(isim, hucreler, satir_no):
+        nonlocal isimler, gruplar, sayilar, adet, blok_satiri
+        if adet == len(isimler):
+            isimler = np.concatenate((isimler, np.empty(adet, dtype=object)))
+            gruplar = np.concatenate((gruplar, np.empty(adet, dtype=object)))
+            sayilar = np.concatenate((sayilar, np.zeros_like(sayilar)))
+        isimler[adet] = isim
+        gruplar[adet] = grup
+        for j, konum in enumerate(konumlar):
+            deger = hucreler[konum] if konum is not None and konum < len(hucreler) else None
+            if deger is None:
+                continue
+            try:
+                sayilar[adet, j] = float(deger)
+            except (TypeError, ValueError):
+                sorunlar.append(f"{satir_no}. satır: '{SATIS_HEDEF_SAYISAL_SUTUNLAR[j]}' değeri sayı değil ({deger!r}); 0 kabul edildi.")
+        adet += 1
+        blok_satiri += 1
+
+    def blok_kapat():
+        if konumlar is not None and blok_satiri == 0:
+            sorunlar.append(f"'{grup}' grubunda başlık satırı var ama veri satırı yok.")
+
+    for satir_no, satir in enumerate(satirlar, start=1):
+        hucreler = [None if _bos_hucre(h) else h for h in satir]
+        dolu = [i for i, h in enumerate(hucreler) if h is not None]
+        if not dolu:
+            continue
+        ilk = hucreler[0]
+        if isinstance(ilk, str) and ilk.strip() == SATIS_HEDEF_BASLIGI:
+            blok_kapat()
+            basliklar = {str(h).strip(): i for i, h in enumerate(hucreler) if h is not None}
+            eksik = [sutun for sutun in SATIS_HEDEF_SAYISAL_SUTUNLAR if sutun not in basliklar]
+            if eksik:
+                sorunlar.append(f"{satir_no}. satırdaki başlıkta eksik sütun(lar): {', '.join(eksik)}; değerleri 0 kabul edildi.")
+            konumlar = [basliklar.get(sutun) for sutun in SATIS_HEDEF_SAYISAL_SUTUNLAR]
+            grup_sayaci += 1
+            grup = bekleyen_baslik if bekleyen_baslik is not None else f"Grup {grup_sayaci}"
+            bekleyen_baslik, blok_satiri = None, 0
+            continue
+        if bekleyen_baslik is not None:
+            # Başlık adayının ardından tablo başlığı gelmedi: sayıları boş bir veri satırıdır.
+            satir_ekle(bekleyen_baslik, [], satir_no)
+            bekleyen_baslik = None
+        if dolu == [0]:
+            bekleyen_baslik = str(ilk).strip()
+            continue
+        if konumlar is None:
+            sorunlar.append(f"{satir_no}. satır herhangi bir '{SATIS_HEDEF_BASLIGI}' başlığından önce geliyor; atlandı.")
+            continue
+        satir_ekle(None if ilk is None else str(ilk), hucreler, satir_no)
+    if bekleyen_baslik is not None and konumlar is not None:
+        satir_ekle(bekleyen_baslik, [], None)
+    blok_kapat()
+
+    if grup_sayaci == 0:
+        sorunlar.append(f"Dosyada '{SATIS_HEDEF_BASLIGI}' başlık satırı bulunamadı.")
+    final_df = pd.DataFrame({SATIS_HEDEF_BASLIGI: isimler[:adet]})
+    for j, sutun in enumerate(SATIS_HEDEF_SAYISAL_SUTUNLAR):
+        final_df[sutun] = sayilar[:adet, j]
+    final_df['Grup'] = gruplar[:adet]
+    if adet == 0:
+        final_df = pd.DataFrame()
+    else:
+        final_df['ST_normal'] = isimleri_normallestir(final_df[SATIS_HEDEF_BASLIGI])
+    final_df.attrs['sorunlar'] = sorunlar
+    return final_df
+
+def satis_hedef_veri_yukle(dosya_yolu):
+    # .xlsx dosyaları openpyxl'in salt okunur (akışlı) kipiyle okunur; diğer biçimler için
+    # anlık görüntü önbelleğindeki ham sayfa satır satır ayrıştırıcıya verilir.
+    if not dosya_yolu.lower().endswith(('.xlsx', '.xlsm')):
+        df_raw = excel_oku(dosya_yolu, header=None)
+        return satis_hedef_satirlarini_ayristir(df_raw.itertuples(index=False, name=None), kapasite=len(df_raw))
+    calisma_kitabi = openpyxl.load_workbook(dosya_yolu, read_only=True, data_only=True)
+    try:
+        sayfa = calisma_kitabi.worksheets[0]
+        return satis_hedef_satirlarini_ayristir(sayfa.iter_rows(values_only=True), kapasite=sayfa.max_row)
+    finally:
+        calisma_kitabi.close()
+
+# --- Kaynak Tanımları ---
+# anahtar: (dosya yolu, yükleyici, hata mesajındaki etiket)
+KAYNAKLAR = {
+    'satis': ('rapor.xls', satis_veri_yukle, "Satış verisi"),
+    'stok': ('stok.xls', stok_veri_yukle, "Stok verisi"),
+    'satis_hedef': ('satis-hedef.xlsx', satis_hedef_veri_yukle, "Satış/Hedef verisi"),
+    'solen_borcu': ('solen_borc.xlsx', solen_borc_excel_oku, "Şölen borç verisi"),
+    'ilce': ('adana_ilce_ciro.xlsx', adana_ilce_veri_yukle, "Adana ilçe verisi"),
+    'satis_gecmisi': ('.', satis_gecmisi_yukle, "Satış geçmişi"),
+}
+
+# Değişikliği dosyanın kendi damgasıyla (değiştirilme zamanı, boyut) anlaşılamayan kaynaklar:
+# anahtar -> dosya yolundan damga üreten fonksiyon. Satış geçmişi bir klasördür; klasörün
+# değiştirilme zamanı yerine yalnızca dönem kitaplarının damgalarına bakılır.
+KAYNAK_DAMGALARI = {
+    'satis_gecmisi': gecmis_damgasi,
+}
+
+# Başka verilerden türetilen veriler: anahtar -> (bağlı olduğu veri(ler), dönüştürücü).
+# Sıra önemlidir; türetilmiş bir veri kendinden önce tanımlanan türetilmiş verilere bağlanabilir.
+# Tablo her izleyici için kendi kaynaklarıyla kurulur: defter geçmişi, izleyicinin okuduğu satış
+# defterinin klasörüne yazılır (çalışma dizinine değil). Yazma hataları izleyicide türetilmiş
+# veri hatası olarak yakalanır (bkz. VeriIzleyici._yukle).
+def turetilmis_verileri_olustur(kaynaklar=None):
+    satis_yolu = (kaynaklar or KAYNAKLAR).get('satis', KAYNAKLAR['satis'])[0]
+    defter_klasoru = os.path.join(os.path.dirname(os.path.abspath(satis_yolu)), DEFTER_KLASORU)
+    return {
+        'temsilci_satislari': (('satis', 'satis_hedef'), temsilci_satislarini_eslestir),
+        'yaslandirma_kupu': ('satis', yaslandirma_kupu_olustur),
+        'gecikme_indeksi': ('satis', gecikme_indeksi_olustur),
+        'ilce_metrikleri': ('ilce', ilce_metrikleri_olustur),
+        'musteri_analitigi': (('satis', 'ilce'), musteri_analitigi_olustur),
+        'stok_modeli': ('stok', stok_modeli_olustur),
+        'senaryo_motoru': (('satis', 'stok', 'satis_hedef', 'yaslandirma_kupu', 'temsilci_satislari'), senaryo_motoru_olustur),
+        'tahsilat_simulasyonu': ('satis', tahsilat_simulasyonu_olustur),
+        'gecmis_toplamlari': (('satis_gecmisi', 'satis', 'ilce'), satis_gecmisi_olustur),
+        # rapor.xls her değiştiğinde defter görüntü deposuna eklenir (bkz. defter_gecmisi).
+        'defter_degisiklikleri': ('satis', functools.partial(defter_degisiklikleri_olustur, klasor=defter_klasoru)),
+    }
+
+# Parça parça okunan kaynaklar: anahtar -> okunurken biriken özetin yayınlandığı anahtar.
+# Bu kaynakların yükleyicileri ilerleme=... parametresini kabul eder.
+AKISLI_KAYNAKLAR = {
+    'satis': 'satis_ozeti',
+}
+
+# Birden fazla çalışma kitabı birlikte okunacaksa (ilk açılış, toplu güncelleme) akışlı olmayanlar
+# bir süreç havuzunda paralel ayrıştırılır. Havuzun başlatma maliyeti (her alt süreç pandas'ı
+# yeniden içe aktarır) küçük dosyalarda kazancı aştığından havuz yalnızca dosyaların toplam
+# boyutu bu eşiği geçtiğinde ve birden fazla çekirdek varsa kullanılır.
+PARALEL_YUKLEME_ESIGI = 16 * 1024 * 1024
+
+def _havuzda_yukle(yukleyici, dosya_yolu):
+    # Alt süreçte çalışır: tablo sonuçları Arrow IPC baytları olarak, diğerleri olduğu gibi döner.
+    baslangic = time.perf_counter()
+    sonuc = yukleyici(dosya_yolu)
+    sure = time.perf_counter() - baslangic
+    if isinstance(sonuc, pd.DataFrame):
+        try:
+            return arrow_baytlarina_cevir(sonuc), True, sure
+        except (TypeError, ValueError, pa.ArrowException):
+            pass
+    return sonuc, False, sure
+
+# --- Veri Görüntüsü ---
+# Yayınlandıktan sonra hiç değiştirilmez. Bir sayfa çalışması başında alınan görüntü,
+# izleyici arka planda yeni veriyi devreye alsa bile çalışma sonuna kadar tutarlı kalır.
+class VeriGoruntusu:
+    def __init__(self, veriler, surumler, hatalar, yukleniyor=None, sureler=None):
+        self.veriler = veriler
+        self.surumler = surumler
+        self.hatalar = hatalar
+        # İlk yüklemesi sürmekte olan kaynaklar: anahtar -> o ana kadar okunan satır sayısı
+        # (akışlı olmayan kaynaklar için None).
+        self.yukleniyor = yukleniyor or {}
+        # Son yüklemenin ölçümleri: anahtar -> (yöntem, ayrıştırma süresi, toplam süre), saniye.
+        self.sureler = sureler or {}
+
+    def __getitem__(self, anahtar):
+        return self.veriler.get(anahtar)
+
+    def bellek_raporu(self):
+        # Tablo biçimindeki her verinin satır sayısı ve bellekteki boyutu.
+        return pd.DataFrame(
+            [(anahtar, len(df), bellek_kullanimi(df) / (1024 * 1024)) for anahtar, df in self.veriler.items() if isinstance(df, pd.DataFrame)],
+            columns=['Veri', 'Satır Sayısı', 'Bellek (MB)'],
+        )
+
+    def yukleme_raporu(self):
+        # Ayrıştırma süresi dosyanın okunduğu yerde (alt süreç ya da izleyici) ölçülür; toplam süre
+        # kuyrukta bekleme ve ana sürece aktarım dahil, yüklemenin başından sonucun alınmasına kadardır.
+        return pd.DataFrame(
+            [(anahtar, yontem, ayristirma, toplam) for anahtar, (yontem, ayristirma, toplam) in self.sureler.items()],
+            columns=['Veri', 'Yöntem', 'Ayrıştırma (sn)', 'Toplam (sn)'],
+        )
+
+# --- Arka Plan Dosya İzleyicisi ---
+class VeriIzleyici:
+    def __init__(self, kaynaklar=None, turetilmis=None, akisli=None, aralik=2.0, paralel_esik=PARALEL_YUKLEME_ESIGI, damgalar=None):
+        self.kaynaklar = kaynaklar or KAYNAKLAR
+        self.kaynak_damgalari = KAYNAK_DAMGALARI if damgalar is None else damgalar
+        self.turetilmis = turetilmis or turetilmis_verileri_olustur(self.kaynaklar)
+        self.akisli = AKISLI_KAYNAKLAR if akisli is None else akisli
+        self.aralik = aralik
+        self.paralel_esik = paralel_esik
+        self._damgalar = {}
+        self._durdur = threading.Event()
+        # İlk yükleme de arka planda yapılır; sayfalar bu sırada hazır olan verileri ve akışlı
+        # kaynakların ara özetlerini gösterir.
+        self._goruntu = VeriGoruntusu({anahtar: None for anahtar in self.kaynaklar}, {}, {}, self._bekleyenler(self.kaynaklar))
+        self._is_parcacigi = threading.Thread(target=self._izle, name="veri-izleyici", daemon=True)
+        self._is_parcacigi.start()
+
+    def goruntu(self):
+        return self._goruntu
+
+    def durdur(self):
+        self._durdur.set()
+
+    def _bekleyenler(self, anahtarlar):
+        return {anahtar: 0 if anahtar in self.akisli else None for anahtar in anahtarlar}
+
+    def _damga(self, dosya_yolu):
+        try:
+            durum = os.stat(dosya_yolu)
+            return (durum.st_mtime_ns, durum.st_size)
+        except OSError:
+            return None
+
+    def _kaynak_damgasi(self, anahtar):
+        dosya_yolu = self.kaynaklar[anahtar][0]
+        return self.kaynak_damgalari.get(anahtar, self._damga)(dosya_yolu)
+
+    def _degisen_kaynaklar(self):
+        return [anahtar for anahtar in self.kaynaklar if self._kaynak_damgasi(anahtar) != self._damgalar.get(anahtar)]
+
+    def _havuz_kullanilsin_mi(self, anahtarlar):
+        if len(anahtarlar) < 2 or (os.cpu_count() or 1) < 2:
+            return False
+        toplam_boyut = sum((self._damga(self.kaynaklar[anahtar][0]) or (0, 0))[1] for anahtar in anahtarlar)
+        return toplam_boyut >= self.paralel_esik
+
+    def _yukle(self, anahtarlar, ilk_yukleme=False):
+        eski = self._goruntu
+        veriler, surumler, hatalar, sureler = dict(eski.veriler), dict(eski.surumler), dict(eski.hatalar), dict(eski.sureler)
+        bekleyen = {anahtar: satir for anahtar, satir in eski.yukleniyor.items() if anahtar in anahtarlar}
+        yenilenen = []
+        kurulan = set()
+        baslangic = time.perf_counter()
+
+        def turetilmisleri_kur():
+            # Bağımlılıklarından biri yenilenen ve hiçbiri hâlâ okunmakta olmayan türetilmiş veriler
+            # kurulur; her biri bir yüklemede en fazla bir kez.
+            bekleyen_turetilmis = set()
+            for anahtar, (kaynak, donusturucu) in self.turetilmis.items():
+                bagimliliklar = kaynak if isinstance(kaynak, tuple) else (kaynak,)
+                if any(bagimlilik in bekleyen or bagimlilik in bekleyen_turetilmis for bagimlilik in bagimliliklar):
+                    bekleyen_turetilmis.add(anahtar)
+                    continue
+                if anahtar in kurulan or not any(bagimlilik in yenilenen for bagimlilik in bagimliliklar):
+                    continue
+                kurulan.add(anahtar)
+                an = time.perf_counter()
+                try:
+                    veriler[anahtar] = donusturucu(*(veriler.get(bagimlilik) for bagimlilik in bagimliliklar))
+                except Exception as e:
+                    # Kaynak okuma hatalarında olduğu gibi önceki değer korunur ve hata sayfada gösterilir.
+                    hatalar[anahtar] = f"'{anahtar}' verisi hesaplanırken bir hata oluştu: {e}"
+                    continue
+                olcum.kaydet('türetilmiş', anahtar, time.perf_counter() - an)
+                hatalar.pop(anahtar, None)
+                surumler[anahtar] = surumler.get(anahtar, 0) + 1
+                yenilenen.append(anahtar)
+
+        def yayinla():
+            # İlk yüklemede her tamamlanan dosya, ondan türetilen veriler kurulduktan sonra hemen
+            # yayınlanır; bir sayfa kaynağını türetilmiş nesneleri olmadan görmez. Sıcak yenilemede
+            # eski veri, tüm dosyalar bitene kadar tutarlı biçimde gösterilmeye devam eder.
+            if ilk_yukleme:
+                turetilmisleri_kur()
+                self._goruntu = VeriGoruntusu(dict(veriler), dict(surumler), dict(hatalar), dict(bekleyen), dict(sureler))
+
+        def sonucu_isle(anahtar, damga, yukleme):
+            # yukleme() sonucu (veri, yöntem, ayrıştırma süresi) döner ya da hatayı yükseltir.
+            dosya_yolu, _, etiket = self.kaynaklar[anahtar]
+            try:
+                veriler[anahtar], yontem, ayristirma = yukleme()
+                hatalar.pop(anahtar, None)
+                sureler[anahtar] = (yontem, ayristirma, time.perf_counter() - baslangic)
+                olcum.kaydet('yükleyici', anahtar, ayristirma, satir=len(veriler[anahtar]) if isinstance(veriler[anahtar], pd.DataFrame) else None)
+            except Exception as e:
+                # Sıcak yenilemede dosya henüz yazılıyor olabilir: eski veri korunur, yazma
+                # bittiğinde değişen damga sayesinde dosya yeniden okunur.
+                hatalar[anahtar] = f"{etiket} ('{dosya_yolu}') okunurken bir hata oluştu: {e}"
+                if anahtar in self.akisli:
+                    # Yarıda kalan okumanın özeti yayınlanmaz.
+                    ozet_anahtari = self.akisli[anahtar]
+                    veriler[ozet_anahtari] = None if ilk_yukleme else eski.veriler.get(ozet_anahtari)
+                    surumler[ozet_anahtari] = surumler.get(ozet_anahtari, 0) + 1
+                if not ilk_yukleme:
+                    self._damgalar[anahtar] = damga
+                    bekleyen.pop(anahtar, None)
+                    return
+                veriler[anahtar] = None
+            self._damgalar[anahtar] = damga
+            surumler[anahtar] = surumler.get(anahtar, 0) + 1
+            yenilenen.append(anahtar)
+            bekleyen.pop(anahtar, None)
+            yayinla()
+
+        def izleyicide_yukle(anahtar, **ayarlar):
+            dosya_yolu, yukleyici, _ = self.kaynaklar[anahtar]
+            def yukleme():
+                an = time.perf_counter()
+                return yukleyici(dosya_yolu, **ayarlar), 'akışlı' if anahtar in self.akisli else 'iş parçacığı', time.perf_counter() - an
+            sonucu_isle(anahtar, self._kaynak_damgasi(anahtar), yukleme)
+
+        def havuzdan_al(anahtar, damga, is_):
+            def yukleme():
+                try:
+                    sonuc, arrow, ayristirma = is_.result()
+                except BrokenProcessPool:
+                    # Alt süreç başlatılamadıysa dosya izleyicinin kendisinde okunur.
+                    dosya_yolu, yukleyici, _ = self.kaynaklar[anahtar]
+                    an = time.perf_counter()
+                    return yukleyici(dosya_yolu), 'iş parçacığı', time.perf_counter() - an
+                return arrow_baytlarindan_oku(sonuc) if arrow else sonuc, 'süreç havuzu', ayristirma
+            sonucu_isle(anahtar, damga, yukleme)
+
+        def hazir_isleri_al():
+            for is_ in [is_ for is_ in isler if is_.done()]:
+                havuzdan_al(*isler.pop(is_), is_)
+
+        def ilerleme_yayinlayici(anahtar):
+            ozet_anahtari = self.akisli[anahtar]
+            def ilerleme(ozet):
+                veriler[ozet_anahtari] = ozet
+                surumler[ozet_anahtari] = surumler.get(ozet_anahtari, 0) + 1
+                bekleyen[anahtar] = ozet.satir_sayisi
+                # Akış sürerken havuzda biten dosyalar da beklemeden devreye alınır.
+                hazir_isleri_al()
+                yayinla()
+            return ilerleme
+
+        paralel = [anahtar for anahtar in anahtarlar if anahtar not in self.akisli]
+        akisli = [anahtar for anahtar in anahtarlar if anahtar in self.akisli]
+        isler = {}
+        havuz = None
+        if self._havuz_kullanilsin_mi(paralel):
+            # 'spawn': izleyici iş parçacıklı bir süreçte çalıştığından fork güvenli değildir.
+            havuz = ProcessPoolExecutor(max_workers=min(len(paralel), os.cpu_count()), mp_context=multiprocessing.get_context('spawn'))
+            for anahtar in paralel:
+                dosya_yolu, yukleyici, _ = self.kaynaklar[anahtar]
+                isler[havuz.submit(_havuzda_yukle, yukleyici, dosya_yolu)] = (anahtar, self._kaynak_damgasi(anahtar))
+        else:
+            for anahtar in paralel:
+                izleyicide_yukle(anahtar)
+        try:
+            for anahtar in akisli:
+                izleyicide_yukle(anahtar, ilerleme=ilerleme_yayinlayici(anahtar))
+            for is_ in as_completed(list(isler)):
+                havuzdan_al(*isler.pop(is_), is_)
+        finally:
+            if havuz is not None:
+                havuz.shutdown(wait=False, cancel_futures=True)
+
+        turetilmisleri_kur()
+        # Tek bir atama ile yeni görüntü devreye alınır.
+        self._goruntu = VeriGoruntusu(veriler, surumler, hatalar, {}, sureler)
+
+    def _izle(self):
+        self._yukle(list(self.kaynaklar), ilk_yukleme=True)
+        while not self._durdur.wait(self.aralik):
+            degisenler = self._degisen_kaynaklar()
+            if degisenler:
+                self._yukle(degisenler)